@@ -67,7 +67,8 @@ def init(kv_store_connector=None,
          ray_init_kwargs={"object_store_memory": int(1e8)},
          gc_window_seconds=3600,
          queueing_policy=RoutePolicy.Random,
-         policy_kwargs={}):
+         policy_kwargs={},
+         num_router_shards=1):
     """Initialize a serve cluster.
 
     If serve cluster has already initialized, this function will just return.
@@ -93,6 +94,11 @@ def init(kv_store_connector=None,
         queueing_policy(RoutePolicy): Define the queueing policy for selecting
             the backend for a service. (Default: RoutePolicy.Random)
         policy_kwargs: Arguments required to instantiate a queueing policy
+        num_router_shards(int): The number of router actors. Services are
+            partitioned across the routers by a hash of their name, and
+            every replica fetches queries from all routers. Use more than
+            one router when a single router actor becomes the bottleneck.
+            (Default: 1)
     """
     global global_state
     # Noop if global_state is no longer None
@@ -120,11 +126,12 @@ def init(kv_store_connector=None,
     def kv_store_connector(namespace):
         return SQLiteKVStore(namespace, db_path=kv_store_path)
 
-    nursery = start_initial_state(kv_store_connector)
+    assert num_router_shards >= 1, "num_router_shards must be positive."
+    nursery = start_initial_state(kv_store_connector, num_router_shards)
 
     global_state = GlobalState(nursery)
     global_state.init_or_get_http_server(host=http_host, port=http_port)
-    global_state.init_or_get_router(
+    global_state.init_or_get_routers(
         queueing_policy=queueing_policy, policy_kwargs=policy_kwargs)
     global_state.init_or_get_metric_monitor(
         gc_window_seconds=gc_window_seconds)
@@ -166,10 +173,12 @@ def set_backend_config(backend_tag, backend_config):
     old_backend_config_dict = global_state.backend_table.get_info(backend_tag)
     global_state.backend_table.register_info(backend_tag, backend_config_dict)
 
-    # inform the router about change in configuration
+    # inform the routers about change in configuration
     # particularly for setting max_batch_size
-    ray.get(global_state.init_or_get_router().set_backend_config.remote(
-        backend_tag, backend_config_dict))
+    ray.get([
+        router.set_backend_config.remote(backend_tag, backend_config_dict)
+        for router in global_state.init_or_get_routers()
+    ])
 
     # checking if replicas need to be restarted
     # Replicas are restarted if there is any change in the backend config
@@ -267,10 +276,12 @@ def create_backend(func_or_class,
     # save the initial arguments needed by replicas
     global_state.backend_table.save_init_args(backend_tag, arg_list)
 
-    # set the backend config inside the router
+    # set the backend config inside the routers
     # particularly for max-batch-size
-    ray.get(global_state.init_or_get_router().set_backend_config.remote(
-        backend_tag, backend_config_dict))
+    ray.get([
+        router.set_backend_config.remote(backend_tag, backend_config_dict)
+        for router in global_state.init_or_get_routers()
+    ])
     scale(backend_tag, backend_config_dict["num_replicas"])
 
 
@@ -297,8 +308,9 @@ def _start_replica(backend_tag):
     # Setup the worker
     ray.get(
         runner_handle._ray_serve_setup.remote(
-            backend_tag, global_state.init_or_get_router(), runner_handle))
-    runner_handle._ray_serve_fetch.remote()
+            backend_tag, global_state.init_or_get_routers(), runner_handle))
+    runner_handle._ray_serve_fetch.remote(
+        num_credits=backend_config.max_inflight_queries)
 
     # Register the worker in config tables as well as metric monitor
     global_state.backend_table.add_replica(backend_tag, replica_tag)
@@ -324,10 +336,15 @@ def _remove_replica(backend_tag):
     ray.get(
         global_state.actor_nursery_handle.remove_handle.remote(replica_tag))
 
-    # Remove the replica from router.
-    # This will also destory the actor handle.
-    ray.get(global_state.init_or_get_router()
-            .remove_and_destory_replica.remote(backend_tag, replica_handle))
+    # Remove the replica from all routers.
+    # The last one will also destory the actor handle.
+    routers = global_state.init_or_get_routers()
+    ray.get([
+        router.remove_replica.remote(backend_tag, replica_handle)
+        for router in routers[:-1]
+    ])
+    ray.get(routers[-1].remove_and_destory_replica.remote(
+        backend_tag, replica_handle))
 
 
 @_ensure_connected
@@ -403,7 +420,7 @@ def split(endpoint_name, traffic_policy_dictionary):
 
     global_state.policy_table.register_traffic_policy(
         endpoint_name, traffic_policy_dictionary)
-    global_state.init_or_get_router().set_traffic.remote(
+    global_state.init_or_get_router(service=endpoint_name).set_traffic.remote(
         endpoint_name, traffic_policy_dictionary)
 
 
@@ -422,7 +439,8 @@ def get_handle(endpoint_name):
     # Delay import due to it's dependency on global_state
     from ray.experimental.serve.handle import RayServeHandle
 
-    return RayServeHandle(global_state.init_or_get_router(), endpoint_name)
+    return RayServeHandle(
+        global_state.init_or_get_router(service=endpoint_name), endpoint_name)
 
 
 @_ensure_connected
@@ -4,11 +4,16 @@ from copy import deepcopy
 class BackendConfig:
     # configs not needed for actor creation when
     # instantiating a replica
-    _serve_configs = ["_num_replicas", "max_batch_size"]
+    _serve_configs = [
+        "_num_replicas", "max_batch_size", "batch_wait_timeout_ms",
+        "adaptive_batching", "max_inflight_queries"
+    ]
 
     # configs which when changed leads to restarting
     # the existing replicas.
-    restart_on_change_fields = ["resources", "num_cpus", "num_gpus"]
+    restart_on_change_fields = [
+        "resources", "num_cpus", "num_gpus", "max_inflight_queries"
+    ]
 
     def __init__(self,
                  num_replicas=1,
@@ -17,14 +22,36 @@ class BackendConfig:
                  num_cpus=None,
                  num_gpus=None,
                  memory=None,
-                 object_store_memory=None):
+                 object_store_memory=None,
+                 batch_wait_timeout_ms=0,
+                 adaptive_batching=False,
+                 max_inflight_queries=1):
         """
         Class for defining backend configuration.
+
+        Args:
+            max_batch_size (int): The maximum number of queries passed to
+                the backend in one call.
+            batch_wait_timeout_ms (float): How long the router may hold a
+                partial batch to fill it, as long as no query misses its
+                SLO because of the wait.
+            adaptive_batching (bool): Size batches from the backend latency
+                measured by the replicas so that the most urgent query of a
+                batch meets its SLO.
+            max_inflight_queries (int): How many queries (or batches) the
+                router may push to a replica before the replica completes
+                the first one. With more than one, a replica does not idle
+                while it asks the router for more work. The limit is split
+                across the router shards, with at least one query per
+                shard.
         """
 
         # serve configs
         self.num_replicas = num_replicas
         self.max_batch_size = max_batch_size
+        self.batch_wait_timeout_ms = batch_wait_timeout_ms
+        self.adaptive_batching = adaptive_batching
+        self.max_inflight_queries = max_inflight_queries
 
         # ray actor configs
         self.resources = resources
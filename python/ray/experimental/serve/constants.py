@@ -15,3 +15,6 @@ DEFAULT_HTTP_HOST = "0.0.0.0"
 
 #: HTTP Port
 DEFAULT_HTTP_PORT = 8000
+
+#: Number of router shards key in bootstrap config
+BOOTSTRAP_NUM_ROUTER_SHARDS_KEY = "num_router_shards"
@@ -1,7 +1,7 @@
 import ray
 from ray.experimental.serve.constants import (
-    BOOTSTRAP_KV_STORE_CONN_KEY, DEFAULT_HTTP_HOST, DEFAULT_HTTP_PORT,
-    SERVE_NURSERY_NAME)
+    BOOTSTRAP_KV_STORE_CONN_KEY, BOOTSTRAP_NUM_ROUTER_SHARDS_KEY,
+    DEFAULT_HTTP_HOST, DEFAULT_HTTP_PORT, SERVE_NURSERY_NAME)
 from ray.experimental.serve.kv_store_service import (
     BackendTable, RoutingTable, TrafficPolicyTable)
 from ray.experimental.serve.metric import (MetricMonitor,
@@ -9,15 +9,19 @@ from ray.experimental.serve.metric import (MetricMonitor,
 
 from ray.experimental.serve.policy import RoutePolicy
 from ray.experimental.serve.server import HTTPActor
+from ray.experimental.serve.utils import get_router_shard
 
 
-def start_initial_state(kv_store_connector):
+def start_initial_state(kv_store_connector, num_router_shards=1):
     nursery_handle = ActorNursery.remote()
     ray.experimental.register_actor(SERVE_NURSERY_NAME, nursery_handle)
 
-    ray.get(
+    ray.get([
         nursery_handle.store_bootstrap_state.remote(
-            BOOTSTRAP_KV_STORE_CONN_KEY, kv_store_connector))
+            BOOTSTRAP_KV_STORE_CONN_KEY, kv_store_connector),
+        nursery_handle.store_bootstrap_state.remote(
+            BOOTSTRAP_NUM_ROUTER_SHARDS_KEY, num_router_shards)
+    ])
     return nursery_handle
 
 
@@ -95,6 +99,11 @@ class GlobalState:
         self.backend_table = BackendTable(kv_store_connector)
         self.policy_table = TrafficPolicyTable(kv_store_connector)
 
+        # Services are partitioned across the router shards, see
+        # init_or_get_router.
+        self.num_router_shards = bootstrap_config.get(
+            BOOTSTRAP_NUM_ROUTER_SHARDS_KEY, 1)
+
         self.refresh_actor_handle_cache()
 
     def refresh_actor_handle_cache(self):
@@ -125,23 +134,55 @@ class GlobalState:
                 break
         return return_policy
 
-    def init_or_get_router(self,
-                           queueing_policy=RoutePolicy.Random,
-                           policy_kwargs={}):
+    def _get_router_tag(self, shard_index):
+        queue_actor_tag = "queue_actor::" + self.queueing_policy.name
+        if shard_index > 0:
+            queue_actor_tag += "::{}".format(shard_index)
+        return queue_actor_tag
+
+    def init_or_get_routers(self,
+                            queueing_policy=RoutePolicy.Random,
+                            policy_kwargs={}):
+        """Returns the handles of all router shards."""
         # get queueing policy
         self.queueing_policy = self._get_queueing_policy(
             default_policy=queueing_policy)
-        queue_actor_tag = "queue_actor::" + self.queueing_policy.name
-        if queue_actor_tag not in self.actor_handle_cache:
-            [handle] = ray.get(
-                self.actor_nursery_handle.start_actor.remote(
-                    self.queueing_policy.value,
-                    init_kwargs=policy_kwargs,
-                    tag=queue_actor_tag))
-            handle.register_self_handle.remote(handle)
+        is_sharded = self.num_router_shards > 1
+        started_router = False
+        for shard_index in range(self.num_router_shards):
+            queue_actor_tag = self._get_router_tag(shard_index)
+            if queue_actor_tag not in self.actor_handle_cache:
+                [handle] = ray.get(
+                    self.actor_nursery_handle.start_actor.remote(
+                        self.queueing_policy.value,
+                        init_kwargs=policy_kwargs,
+                        tag=queue_actor_tag))
+                handle.register_self_handle.remote(
+                    handle, shard_index if is_sharded else None)
+                started_router = True
+        if started_router:
             self.refresh_actor_handle_cache()
 
-        return self.actor_handle_cache[queue_actor_tag]
+        return [
+            self.actor_handle_cache[self._get_router_tag(shard_index)]
+            for shard_index in range(self.num_router_shards)
+        ]
+
+    def init_or_get_router(self,
+                           queueing_policy=RoutePolicy.Random,
+                           policy_kwargs={},
+                           service=None):
+        """Returns the handle of the router shard that owns the service.
+
+        Every service is owned by exactly one shard, which holds its
+        request queue and traffic policy. Without a service, the first
+        shard is returned.
+        """
+        routers = self.init_or_get_routers(
+            queueing_policy=queueing_policy, policy_kwargs=policy_kwargs)
+        if service is None:
+            return routers[0]
+        return routers[get_router_shard(service, len(routers))]
 
     def init_or_get_metric_monitor(self, gc_window_seconds=3600):
         if "metric_monitor" not in self.actor_handle_cache:
@@ -1,27 +1,147 @@
+from collections import defaultdict
+import math
 import time
 
 import numpy as np
-import pandas as pd
 
 import ray
 
 
+class QuantileSketch:
+    """A mergeable sketch of a distribution of values.
+
+    The sketch keeps the exact values until it holds more than
+    `max_exact_values` of them. After that, values are counted in
+    logarithmically sized bins, so the size of the sketch is bounded by the
+    number of bins while percentiles keep a relative error of at most
+    `relative_accuracy`.
+
+    Args:
+        relative_accuracy (float): The relative error of the percentiles
+            once the values are binned.
+        max_exact_values (int): The number of values kept exactly.
+    """
+
+    def __init__(self, relative_accuracy=0.01, max_exact_values=256):
+        self.relative_accuracy = relative_accuracy
+        self.max_exact_values = max_exact_values
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+
+        self.count = 0
+        # The exact values, or None once the values are binned
+        self.values = []
+        # bin index -> count of positive (or negative) values
+        self.positive_bins = defaultdict(int)
+        self.negative_bins = defaultdict(int)
+        self.zero_count = 0
+
+    def add(self, value):
+        self.count += 1
+        if self.values is not None:
+            self.values.append(value)
+            if len(self.values) > self.max_exact_values:
+                self._to_bins()
+        else:
+            self._add_to_bin(value, 1)
+
+    def merge(self, other):
+        """Adds all values of another sketch with the same accuracy."""
+        assert self.gamma == other.gamma
+        if (self.values is not None and other.values is not None
+                and len(self.values) + len(other.values) <=
+                self.max_exact_values):
+            self.values.extend(other.values)
+            self.count += other.count
+            return
+
+        self._to_bins()
+        self.count += other.count
+        if other.values is not None:
+            for value in other.values:
+                self._add_to_bin(value, 1)
+        else:
+            for index, count in other.positive_bins.items():
+                self.positive_bins[index] += count
+            for index, count in other.negative_bins.items():
+                self.negative_bins[index] += count
+            self.zero_count += other.zero_count
+
+    def percentile(self, percentiles):
+        """Returns the values at the given percentiles (from 0 to 100),
+        like `np.percentile`."""
+        if self.count == 0:
+            return [np.nan for _ in percentiles]
+        if self.values is not None:
+            return np.percentile(self.values, percentiles).tolist()
+
+        # (representative value, count) pairs in ascending order
+        bins = [(-self._bin_value(index), count)
+                for index, count in sorted(
+                    self.negative_bins.items(), reverse=True)]
+        if self.zero_count:
+            bins.append((0.0, self.zero_count))
+        bins.extend((self._bin_value(index), count)
+                    for index, count in sorted(self.positive_bins.items()))
+        values = np.array([value for value, _ in bins])
+        cumulative_counts = np.cumsum([count for _, count in bins])
+
+        ranks = np.asarray(percentiles) / 100 * (self.count - 1)
+        positions = np.searchsorted(cumulative_counts, ranks, side="right")
+        return values[np.minimum(positions, len(values) - 1)].tolist()
+
+    def _to_bins(self):
+        if self.values is None:
+            return
+        values, self.values = self.values, None
+        for value in values:
+            self._add_to_bin(value, 1)
+
+    def _add_to_bin(self, value, count):
+        if value > 0:
+            self.positive_bins[self._bin_index(value)] += count
+        elif value < 0:
+            self.negative_bins[self._bin_index(-value)] += count
+        else:
+            self.zero_count += count
+
+    def _bin_index(self, value):
+        return int(math.ceil(math.log(value) / self.log_gamma))
+
+    # The value in the middle of the bin, with respect to relative error
+    def _bin_value(self, index):
+        return 2 * self.gamma**index / (self.gamma + 1)
+
+
 @ray.remote(num_cpus=0)
 class MetricMonitor:
-    def __init__(self, gc_window_seconds=3600):
+    def __init__(self, gc_window_seconds=3600, bucket_seconds=5):
         """Metric monitor scrapes metrics from ray serve actors
         and allow windowed query operations.
 
+        Values of `list` metrics are aggregated into one QuantileSketch per
+        metric and time bucket, so the memory usage of the monitor does not
+        grow with the number of requests, and a windowed percentile merges
+        one sketch per bucket in the window.
+
         Args:
             gc_window_seconds(int): How long will we keep the metric data in
                 memory. Data older than the gc_window will be deleted.
+            bucket_seconds(int): The time resolution of the aggregation
+                windows.
         """
         #: Mapping actor ID (hex) -> actor handle
         self.actor_handles = dict()
 
-        self.data_entries = []
+        #: Mapping metric name -> metric type
+        self.metric_types = dict()
+        #: Mapping counter name -> latest value
+        self.counters = dict()
+        #: Mapping list metric name -> {bucket index -> QuantileSketch}
+        self.sketches = defaultdict(dict)
 
         self.gc_window_seconds = gc_window_seconds
+        self.bucket_seconds = bucket_seconds
         self.latest_gc_time = time.time()
 
     def is_ready(self):
@@ -43,6 +163,7 @@ class MetricMonitor:
             self.latest_gc_time = time.time()
 
         curr_time = time.time()
+        bucket = int(curr_time // self.bucket_seconds)
         result = [
             handle._serve_metric.remote()
             for handle in self.actor_handles.values()
@@ -50,36 +171,36 @@ class MetricMonitor:
         # TODO(simon): handle the possibility that an actor_handle is removed
         for handle_result in ray.get(result):
             for metric_name, metric_info in handle_result.items():
-                data_entry = {
-                    "retrieved_at": curr_time,
-                    "name": metric_name,
-                    "type": metric_info["type"],
-                }
+                self.metric_types[metric_name] = metric_info["type"]
 
                 if metric_info["type"] == "counter":
-                    data_entry["value"] = metric_info["value"]
-                    self.data_entries.append(data_entry)
+                    self.counters[metric_name] = metric_info["value"]
 
                 elif metric_info["type"] == "list":
+                    metric_buckets = self.sketches[metric_name]
+                    if bucket not in metric_buckets:
+                        metric_buckets[bucket] = QuantileSketch()
+                    sketch = metric_buckets[bucket]
                     for metric_value in metric_info["value"]:
-                        new_entry = data_entry.copy()
-                        new_entry["value"] = metric_value
-                        self.data_entries.append(new_entry)
+                        sketch.add(metric_value)
 
     def _perform_gc(self):
         curr_time = time.time()
         earliest_time_allowed = curr_time - self.gc_window_seconds
 
-        # If we don"t have any data at hand, no need to gc.
-        if len(self.data_entries) == 0:
-            return
+        for metric_buckets in self.sketches.values():
+            expired = [
+                bucket for bucket in metric_buckets
+                if (bucket + 1) * self.bucket_seconds < earliest_time_allowed
+            ]
+            for bucket in expired:
+                del metric_buckets[bucket]
 
-        df = pd.DataFrame(self.data_entries)
-        df = df[df["retrieved_at"] >= earliest_time_allowed]
-        self.data_entries = df.to_dict(orient="record")
-
-    def _get_dataframe(self):
-        return pd.DataFrame(self.data_entries)
+    def _get_num_values(self):
+        """Returns the number of list metric values in memory."""
+        return sum(
+            sketch.count for metric_buckets in self.sketches.values()
+            for sketch in metric_buckets.values())
 
     def collect(self,
                 percentiles=[50, 90, 95],
@@ -94,19 +215,10 @@ class MetricMonitor:
                 gc_window_seconds.
         """
         result = {}
-        df = pd.DataFrame(self.data_entries)
-
-        if len(df) == 0:  # no metric to report
-            return {}
-
-        # Retrieve the {metric_name -> metric_type} mapping
-        metric_types = df[["name",
-                           "type"]].set_index("name").squeeze().to_dict()
 
-        for metric_name, metric_type in metric_types.items():
+        for metric_name, metric_type in self.metric_types.items():
             if metric_type == "counter":
-                result[metric_name] = df.loc[df["name"] == metric_name,
-                                             "value"].tolist()[-1]
+                result[metric_name] = self.counters[metric_name]
             if metric_type == "list":
                 result.update(
                     self._aggregate(metric_name, percentiles,
@@ -123,25 +235,20 @@ class MetricMonitor:
             "Aggregation window exceeds gc window. You should set a longer gc "
             "window or shorter aggregation window.")
 
-        curr_time = time.time()
-        df = pd.DataFrame(self.data_entries)
-        filtered_df = df[df["name"] == metric_name]
-        if len(filtered_df) == 0:
+        metric_buckets = self.sketches[metric_name]
+        if len(metric_buckets) == 0:
             return dict()
 
-        data_types = filtered_df["type"].unique().tolist()
-        assert data_types == [
-            "list"
-        ], ("Can't aggreagte over non-list type. {} has type {}".format(
-            metric_name, data_types))
-
+        curr_time = time.time()
         aggregated_metric = {}
         for window in agg_windows_seconds:
             earliest_time = curr_time - window
-            windowed_df = filtered_df[
-                filtered_df["retrieved_at"] > earliest_time]
-            percentile_values = np.percentile(windowed_df["value"],
-                                              percentiles)
+            windowed_sketch = QuantileSketch()
+            for bucket, sketch in metric_buckets.items():
+                # Include every bucket that overlaps with the window
+                if (bucket + 1) * self.bucket_seconds > earliest_time:
+                    windowed_sketch.merge(sketch)
+            percentile_values = windowed_sketch.percentile(percentiles)
             for percentile, value in zip(percentiles, percentile_values):
                 result_key = "{name}_{perc}th_perc_{window}_window".format(
                     name=metric_name, perc=percentile, window=window)
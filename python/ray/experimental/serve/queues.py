@@ -1,4 +1,5 @@
 from collections import defaultdict, deque
+import threading
 
 import numpy as np
 
@@ -40,6 +41,56 @@ class WorkIntent:
         self.replica_handle = replica_handle
 
 
+class BatchLatencyModel:
+    """Predicts the latency of a backend as a function of the batch size.
+
+    The model fits `latency = fixed_cost + per_query_cost * batch_size`
+    with exponentially weighted least squares over the (batch size, latency)
+    pairs reported by the replicas, so it follows changes in the backend's
+    behavior.
+
+    Args:
+        decay (float): The weight of the previous observations when a new
+            observation is added.
+    """
+
+    def __init__(self, decay=0.95):
+        self.decay = decay
+        self.num_observations = 0
+        self._weight = 0.0
+        self._sum_x = 0.0
+        self._sum_y = 0.0
+        self._sum_xx = 0.0
+        self._sum_xy = 0.0
+
+    def observe(self, batch_size, latency_s):
+        latency_ms = latency_s * 1000
+        self._weight = self.decay * self._weight + 1
+        self._sum_x = self.decay * self._sum_x + batch_size
+        self._sum_y = self.decay * self._sum_y + latency_ms
+        self._sum_xx = self.decay * self._sum_xx + batch_size**2
+        self._sum_xy = self.decay * self._sum_xy + batch_size * latency_ms
+        self.num_observations += 1
+
+    def predict_ms(self, batch_size):
+        """Returns the predicted latency in milliseconds, or None if no
+        latency has been observed yet."""
+        if self.num_observations == 0:
+            return None
+        mean_x = self._sum_x / self._weight
+        mean_y = self._sum_y / self._weight
+        variance = self._sum_xx / self._weight - mean_x**2
+        if variance <= 1e-9:
+            # All batches had the same size: assume the latency is
+            # proportional to the batch size, which is conservative for
+            # larger batches.
+            return mean_y * batch_size / mean_x
+        per_query_cost = max(
+            0.0, (self._sum_xy / self._weight - mean_x * mean_y) / variance)
+        fixed_cost = max(0.0, mean_y - per_query_cost * mean_x)
+        return fixed_cost + per_query_cost * batch_size
+
+
 class CentralizedQueues:
     """A router that routes request to available workers.
 
@@ -99,6 +150,19 @@ class CentralizedQueues:
         # 3. The blist implementation is fast and uses C extensions.
         self.buffer_queues = defaultdict(sortedlist)
 
+        # backend_name -> latency model learned from replica reports
+        self.latency_models = defaultdict(BatchLatencyModel)
+
+        # backend_name -> time (ms) since which a partial batch is held
+        self.batch_wait_start_ms = dict()
+
+        # time (ms) at which a held partial batch is due, if any
+        self.scheduled_flush_ms = None
+
+        # index of this router among the router shards, None if the
+        # router is not sharded
+        self.shard_index = None
+
     def is_ready(self):
         return True
 
@@ -132,12 +196,24 @@ class CentralizedQueues:
         self.flush()
         return query.result_object_id.binary()
 
-    def dequeue_request(self, backend, replica_handle):
-        intention = WorkIntent(replica_handle)
-        self.workers[backend].append(intention)
+    def dequeue_request(self,
+                        backend,
+                        replica_handle,
+                        last_batch_size=None,
+                        last_latency_s=None,
+                        num_credits=1):
+        # each credit allows the router to push one more query (or batch)
+        # to the replica before it completes the previous ones.
+        # replicas report the size and latency of the batch they just
+        # processed, which feeds the backend's latency model
+        if last_batch_size is not None and last_latency_s is not None:
+            self.latency_models[backend].observe(last_batch_size,
+                                                 last_latency_s)
+        for _ in range(num_credits):
+            self.workers[backend].append(WorkIntent(replica_handle))
         self.flush()
 
-    def remove_and_destory_replica(self, backend, replica_handle):
+    def remove_replica(self, backend, replica_handle):
         # NOTE: this function scale by O(#replicas for the backend)
         new_queue = deque()
         target_id = replica_handle._actor_id
@@ -148,6 +224,8 @@ class CentralizedQueues:
 
         self.workers[backend] = new_queue
 
+    def remove_and_destory_replica(self, backend, replica_handle):
+        self.remove_replica(backend, replica_handle)
         replica_handle.__ray_terminate__.remote()
 
     def link(self, service, backend):
@@ -198,18 +276,76 @@ class CentralizedQueues:
                         "max_batch_size"]
 
                 while len(buffer_queue) and len(work_queue):
-                    # get the work from work intent queue
-                    work = work_queue.popleft()
                     # see if backend accepts batched queries
                     if max_batch_size is not None:
-                        pop_size = min(len(buffer_queue), max_batch_size)
+                        pop_size = self._get_batch_size(
+                            backend, buffer_queue, max_batch_size)
+                        if pop_size == 0:
+                            # wait for more queries to fill the batch
+                            break
                         request = [
                             buffer_queue.pop(0) for _ in range(pop_size)
                         ]
                     else:
                         request = buffer_queue.pop(0)
 
-                    work.replica_handle._ray_serve_call.remote(request)
+                    # get the work from work intent queue
+                    work = work_queue.popleft()
+                    if self.shard_index is None:
+                        work.replica_handle._ray_serve_call.remote(request)
+                    else:
+                        # the replica fetches its next query from the
+                        # shard that dispatched this one
+                        work.replica_handle._ray_serve_call.remote(
+                            request, self.shard_index)
+
+    def _get_batch_size(self, backend, buffer_queue, max_batch_size):
+        """Returns the number of queries to dispatch to a replica, or 0 if
+        the router should wait for more queries to fill the batch.
+
+        With `adaptive_batching`, the batch size is the largest size whose
+        predicted latency still meets the most urgent deadline in the buffer.
+        With `batch_wait_timeout_ms`, a partial batch is held up to that long,
+        unless holding it would make the most urgent query miss its SLO.
+        """
+        config = self.backend_info.get(backend, {})
+        model = self.latency_models[backend]
+        now_ms = time.time() * 1000
+        # the buffer is sorted by deadline
+        earliest_deadline_ms = buffer_queue[0].request_slo_ms
+
+        target_size = max_batch_size
+        if (config.get("adaptive_batching")
+                and model.num_observations > 0):
+            while (target_size > 1 and now_ms + model.predict_ms(target_size)
+                   > earliest_deadline_ms):
+                target_size -= 1
+        batch_size = min(len(buffer_queue), target_size)
+
+        wait_timeout_ms = config.get("batch_wait_timeout_ms") or 0
+        if wait_timeout_ms > 0 and batch_size < target_size:
+            wait_start_ms = self.batch_wait_start_ms.setdefault(
+                backend, now_ms)
+            remaining_ms = wait_start_ms + wait_timeout_ms - now_ms
+            predicted_ms = model.predict_ms(target_size) or 0
+            if (remaining_ms > 0 and now_ms + remaining_ms + predicted_ms <=
+                    earliest_deadline_ms):
+                self._schedule_flush(now_ms + remaining_ms)
+                return 0
+        self.batch_wait_start_ms.pop(backend, None)
+        return batch_size
+
+    def _schedule_flush(self, flush_time_ms):
+        """Records that a flush is due at the given time (in ms since the
+        epoch), unless an earlier flush is already due.
+
+        The deadline is checked by every flush, i.e. on each enqueue and
+        dequeue. The actor also submits a flush once it is due (see:
+        CentralizedQueuesActor).
+        """
+        if (self.scheduled_flush_ms is None
+                or flush_time_ms < self.scheduled_flush_ms):
+            self.scheduled_flush_ms = flush_time_ms
 
     # selects the backend and puts the service queue query to the buffer
     # different policies will implement different backend selection policies
@@ -229,6 +365,8 @@ class CentralizedQueues:
 
     # _flush function has to flush the service and buffer queues.
     def _flush(self):
+        # partial batches that are still held schedule a new flush
+        self.scheduled_flush_ms = None
         self._flush_service_queue()
         self._flush_buffer()
 
@@ -237,11 +375,33 @@ class CentralizedQueuesActor(CentralizedQueues):
     """
     A wrapper class for converting wrapper policy classes to ray
     actors. This is needed to make `flush` call asynchronous.
+
+    A ticker thread submits a flush to the actor once a held partial batch
+    is due. It never touches the queues itself, so that they are only
+    accessed from the actor's method calls.
     """
     self_handle = None
 
-    def register_self_handle(self, handle_to_this_actor):
+    # how often the ticker checks whether a flush is due
+    flush_tick_s = 0.005
+
+    def register_self_handle(self, handle_to_this_actor, shard_index=None):
         self.self_handle = handle_to_this_actor
+        self.shard_index = shard_index
+        ticker = threading.Thread(target=self._run_flush_ticker)
+        ticker.daemon = True
+        ticker.start()
+
+    def _run_flush_ticker(self):
+        submitted_flush_ms = None
+        while True:
+            time.sleep(self.flush_tick_s)
+            flush_time_ms = self.scheduled_flush_ms
+            if (flush_time_ms is not None
+                    and flush_time_ms != submitted_flush_ms
+                    and flush_time_ms <= time.time() * 1000):
+                self.self_handle._flush.remote()
+                submitted_flush_ms = flush_time_ms
 
     def flush(self):
         if self.self_handle:
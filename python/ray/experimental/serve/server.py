@@ -63,6 +63,8 @@ class HTTPProxy:
         from ray.experimental.serve.global_state import GlobalState
         self.serve_global_state = GlobalState()
         self.route_table_cache = dict()
+        # endpoint_name -> handle of the router shard that owns it
+        self.router_handle_cache = dict()
 
         self.route_checker_should_shutdown = False
 
@@ -76,6 +78,15 @@ class HTTPProxy:
 
             await asyncio.sleep(interval)
 
+    def get_router(self, endpoint_name):
+        # Looking up the router shard is done once per endpoint instead of
+        # once per request.
+        if endpoint_name not in self.router_handle_cache:
+            self.router_handle_cache[endpoint_name] = (
+                self.serve_global_state.init_or_get_router(
+                    service=endpoint_name))
+        return self.router_handle_cache[endpoint_name]
+
     async def handle_lifespan_message(self, scope, receive, send):
         assert scope["type"] == "lifespan"
 
@@ -149,8 +160,7 @@ class HTTPProxy:
                 return
 
         result_object_id_bytes = await (
-            self.serve_global_state.init_or_get_router()
-            .enqueue_request.remote(
+            self.get_router(endpoint_name).enqueue_request.remote(
                 service=endpoint_name,
                 request_args=(scope, http_body_bytes),
                 request_kwargs=dict(),
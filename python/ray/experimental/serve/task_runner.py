@@ -50,7 +50,9 @@ class RayServeMixin:
                 pass
     """
     _ray_serve_self_handle = None
-    _ray_serve_router_handle = None
+    # One handle per router shard. The replica keeps one pending work
+    # intent at every shard, so it can serve every service.
+    _ray_serve_router_handles = []
     _ray_serve_setup_completed = False
     _ray_serve_dequeue_requester_name = None
 
@@ -63,6 +65,10 @@ class RayServeMixin:
     _serve_metric_error_counter = 0
     _serve_metric_latency_list = []
 
+    # (batch size, latency in seconds) of the last processed request,
+    # reported to the router to learn the latency of the backend.
+    _ray_serve_last_batch = (None, None)
+
     def _serve_metric(self):
         # Make a copy of the latency list and clear current list
         latency_lst = self._serve_metric_latency_list[:]
@@ -82,17 +88,57 @@ class RayServeMixin:
         }
 
     def _ray_serve_setup(self, my_name, router_handle, my_handle):
+        """Setup the replica.
+
+        Args:
+            my_name (str): The backend tag of the replica.
+            router_handle: The router actor handle, or a list of handles
+                if the router is sharded.
+            my_handle: The actor handle of the replica itself.
+        """
         self._ray_serve_dequeue_requester_name = my_name
-        self._ray_serve_router_handle = router_handle
+        if not isinstance(router_handle, list):
+            router_handle = [router_handle]
+        self._ray_serve_router_handles = router_handle
         self._ray_serve_self_handle = my_handle
         self._ray_serve_setup_completed = True
 
-    def _ray_serve_fetch(self):
+    def _ray_serve_fetch(self, router_index=None, num_credits=1):
+        """Ask for the next query from the router shard with the given
+        index, or from all shards if no index is given.
+
+        Args:
+            router_index (int, optional): The index of the router shard.
+            num_credits (int): The number of queries the routers may push
+                to this replica. A replica that is given several credits
+                when it starts keeps that many queries in flight, because
+                it returns one credit per completed query. When fetching
+                from all shards, the credits are split across the shards,
+                but every shard gets at least one so that the replica
+                serves the services of all shards.
+        """
         assert self._ray_serve_setup_completed
 
-        self._ray_serve_router_handle.dequeue_request.remote(
-            self._ray_serve_dequeue_requester_name,
-            self._ray_serve_self_handle)
+        if router_index is None:
+            router_handles = self._ray_serve_router_handles
+            base, extra = divmod(num_credits, len(router_handles))
+            shard_credits = [
+                max(1, base + (1 if i < extra else 0))
+                for i in range(len(router_handles))
+            ]
+        else:
+            router_handles = [self._ray_serve_router_handles[router_index]]
+            shard_credits = [num_credits]
+
+        last_batch_size, last_latency_s = self._ray_serve_last_batch
+        self._ray_serve_last_batch = (None, None)
+        for router_handle, credits in zip(router_handles, shard_credits):
+            router_handle.dequeue_request.remote(
+                self._ray_serve_dequeue_requester_name,
+                self._ray_serve_self_handle,
+                last_batch_size,
+                last_latency_s,
+                num_credits=credits)
 
     def invoke_single(self, request_item):
         args, kwargs, is_web_context, result_object_id = parse_request_item(
@@ -107,7 +153,9 @@ class RayServeMixin:
             self._serve_metric_error_counter += 1
             ray.worker.global_worker.put_object(wrapped_exception,
                                                 result_object_id)
-        self._serve_metric_latency_list.append(time.time() - start_timestamp)
+        latency_s = time.time() - start_timestamp
+        self._serve_metric_latency_list.append(latency_s)
+        self._ray_serve_last_batch = (1, latency_s)
 
     def invoke_batch(self, request_item_list):
         # TODO(alind) : create no-http services. The enqueues
@@ -173,8 +221,9 @@ class RayServeMixin:
             for result, result_object_id in zip(result_list,
                                                 result_object_ids):
                 ray.worker.global_worker.put_object(result, result_object_id)
-            self._serve_metric_latency_list.append(time.time() -
-                                                   start_timestamp)
+            latency_s = time.time() - start_timestamp
+            self._serve_metric_latency_list.append(latency_s)
+            self._ray_serve_last_batch = (curr_batch_size, latency_s)
         except Exception as e:
             wrapped_exception = wrap_to_ray_error(e)
             self._serve_metric_error_counter += len(result_object_ids)
@@ -182,7 +231,7 @@ class RayServeMixin:
                 ray.worker.global_worker.put_object(wrapped_exception,
                                                     result_object_id)
 
-    def _ray_serve_call(self, request):
+    def _ray_serve_call(self, request, router_index=0):
         work_item = request
         # check if work_item is a list or not
         # if it is list: then batching supported
@@ -194,7 +243,7 @@ class RayServeMixin:
         # re-assign to default values
         serve_context.web = False
         serve_context.batch_size = None
-        self._ray_serve_fetch()
+        self._ray_serve_fetch(router_index)
 
 
 class TaskRunnerBackend(TaskRunner, RayServeMixin):
@@ -1,8 +1,10 @@
+import time
+
 import numpy as np
 import pytest
 
 import ray
-from ray.experimental.serve.metric import MetricMonitor
+from ray.experimental.serve.metric import MetricMonitor, QuantileSketch
 
 
 @pytest.fixture(scope="session")
@@ -36,17 +38,41 @@ def start_target_actor(ray_instance):
 def test_metric_gc(ray_instance, start_target_actor):
     target_actor = start_target_actor
     # this means when new scrapes are invoked, the
-    metric_monitor = MetricMonitor.remote(gc_window_seconds=0)
+    metric_monitor = MetricMonitor.remote(
+        gc_window_seconds=0, bucket_seconds=0.001)
     ray.get(metric_monitor.add_target.remote(target_actor))
 
     ray.get(metric_monitor.scrape.remote())
-    df = ray.get(metric_monitor._get_dataframe.remote())
-    assert len(df) == 102
+    num_values = ray.get(metric_monitor._get_num_values.remote())
+    assert num_values == 101
 
-    # Old metric sould be cleared. So only 1 counter + 101 list values left.
+    # Old metric sould be cleared. So only 101 list values left.
+    time.sleep(0.01)
     ray.get(metric_monitor.scrape.remote())
-    df = ray.get(metric_monitor._get_dataframe.remote())
-    assert len(df) == 102
+    num_values = ray.get(metric_monitor._get_num_values.remote())
+    assert num_values == 101
+
+
+def test_quantile_sketch():
+    values = np.random.RandomState(0).lognormal(size=10000)
+    sketch = QuantileSketch(relative_accuracy=0.01, max_exact_values=100)
+    other_sketch = QuantileSketch(relative_accuracy=0.01, max_exact_values=100)
+    for value in values[:5000]:
+        sketch.add(value)
+    for value in values[5000:]:
+        other_sketch.add(value)
+    sketch.merge(other_sketch)
+
+    # Values are binned, the size of the sketch does not grow with the
+    # number of values.
+    assert sketch.count == 10000
+    assert sketch.values is None
+    assert len(sketch.positive_bins) < 1000
+
+    percentiles = [50, 90, 99]
+    expected = np.percentile(values, percentiles)
+    estimated = sketch.percentile(percentiles)
+    assert np.allclose(estimated, expected, rtol=0.02)
 
 
 def test_metric_system(ray_instance, start_target_actor):
@@ -1,6 +1,9 @@
+import time
+
 import pytest
 import ray
-from ray.experimental.serve.queues import RandomPolicyQueue
+from ray.experimental.serve.queues import BatchLatencyModel, RandomPolicyQueue
+from ray.experimental.serve.queues import RandomPolicyQueueActor
 from ray.experimental.serve.queues import (RoundRobinPolicyQueue,
                                            FixedPackingPolicyQueue)
 
@@ -133,3 +136,96 @@ def test_queue_remove_replicas(serve_instance, task_runner_mock_actor):
     q.dequeue_request("backend", task_runner_mock_actor)
     q.remove_and_destory_replica("backend", task_runner_mock_actor)
     assert len(q.workers["backend"]) == 0
+
+
+def test_batch_latency_model():
+    model = BatchLatencyModel()
+    assert model.predict_ms(4) is None
+    for batch_size in [1, 2, 4, 8] * 5:
+        model.observe(batch_size, (10 + 5 * batch_size) / 1000)
+    assert model.predict_ms(1) == pytest.approx(15)
+    assert model.predict_ms(16) == pytest.approx(90)
+
+    # A single observed batch size scales linearly
+    model = BatchLatencyModel()
+    model.observe(2, 0.01)
+    assert model.predict_ms(4) == pytest.approx(20)
+
+
+def test_adaptive_batch_size(serve_instance, task_runner_mock_actor):
+    q = RandomPolicyQueue()
+    q.set_backend_config("backend", {
+        "max_batch_size": 10,
+        "adaptive_batching": True
+    })
+    q.link("svc", "backend")
+    # Each query takes 100ms, so only 5 queries fit in a 500ms SLO
+    for batch_size in [1, 2, 4]:
+        q.latency_models["backend"].observe(batch_size, batch_size * 0.1)
+    for i in range(10):
+        q.enqueue_request("svc", i, "kwargs", None, request_slo_ms=550)
+    q.dequeue_request("backend", task_runner_mock_actor)
+    got_work = ray.get(task_runner_mock_actor.get_recent_call.remote())
+    assert len(got_work) == 5
+
+
+def test_batch_wait_timeout(serve_instance, task_runner_mock_actor):
+    q = RandomPolicyQueue()
+    q.set_backend_config("backend", {
+        "max_batch_size": 10,
+        "batch_wait_timeout_ms": 200
+    })
+    q.link("svc", "backend")
+    ray.get(task_runner_mock_actor._ray_serve_call.remote(None))
+    q.enqueue_request("svc", 0, "kwargs", None)
+    q.dequeue_request("backend", task_runner_mock_actor)
+    # The partial batch is held until the timeout expires
+    assert len(q.buffer_queues["backend"]) == 1
+    q.enqueue_request("svc", 1, "kwargs", None)
+    time.sleep(0.5)
+    # The expired batch is dispatched by the next flush
+    q.flush()
+    got_work = ray.get(task_runner_mock_actor.get_recent_call.remote())
+    assert [query.request_args for query in got_work] == [0, 1]
+
+    # A query whose SLO would be missed by waiting is not held
+    q.enqueue_request("svc", 2, "kwargs", None, request_slo_ms=100)
+    q.dequeue_request("backend", task_runner_mock_actor)
+    got_work = ray.get(task_runner_mock_actor.get_recent_call.remote())
+    assert [query.request_args for query in got_work] == [2]
+
+
+def test_batch_wait_timeout_actor(serve_instance, task_runner_mock_actor):
+    q = RandomPolicyQueueActor.remote()
+    q.register_self_handle.remote(q)
+    q.set_backend_config.remote("backend", {
+        "max_batch_size": 10,
+        "batch_wait_timeout_ms": 200
+    })
+    q.link.remote("svc", "backend")
+    ray.get(task_runner_mock_actor._ray_serve_call.remote(None))
+    q.enqueue_request.remote("svc", 0, "kwargs", None)
+    ray.get(q.dequeue_request.remote("backend", task_runner_mock_actor))
+    # The router flushes the held batch on its own once it expires
+    time.sleep(0.5)
+    got_work = ray.get(task_runner_mock_actor.get_recent_call.remote())
+    assert [query.request_args for query in got_work] == [0]
+
+
+def test_credits(serve_instance, task_runner_mock_actor):
+    q = RandomPolicyQueue()
+    q.link("svc", "backend")
+    q.dequeue_request("backend", task_runner_mock_actor, num_credits=2)
+    assert len(q.workers["backend"]) == 2
+
+    # Queries are pushed ahead while the replica has credits left
+    for i in range(3):
+        q.enqueue_request("svc", i, "kwargs", None)
+    assert len(q.workers["backend"]) == 0
+    assert len(q.buffer_queues["backend"]) == 1
+
+    # A completion returns one credit
+    q.dequeue_request("backend", task_runner_mock_actor)
+    assert len(q.buffer_queues["backend"]) == 0
+    got_work = ray.get(task_runner_mock_actor.get_recent_call.remote())
+    assert got_work.request_args == 2
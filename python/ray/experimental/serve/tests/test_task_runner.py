@@ -1,3 +1,5 @@
+import time
+
 import pytest
 
 import ray
@@ -47,6 +49,43 @@ def test_runner_actor(serve_instance):
         assert ray.get(result_token) == query
 
 
+def test_credits_split_across_shards(serve_instance):
+    @ray.remote
+    class RouterMock:
+        def __init__(self):
+            self.credits = 0
+
+        def dequeue_request(self,
+                            backend,
+                            replica_handle,
+                            last_batch_size=None,
+                            last_latency_s=None,
+                            num_credits=1):
+            self.credits += num_credits
+
+        def get_credits(self):
+            return self.credits
+
+    routers = [RouterMock.remote() for _ in range(3)]
+    runner = TaskRunnerActor.remote(lambda flask_request: None)
+    ray.get(runner._ray_serve_setup.remote("runner", routers, runner))
+
+    def wait_for_credits(expected):
+        # the routers receive the credits asynchronously from the replica
+        for _ in range(100):
+            credits = ray.get([r.get_credits.remote() for r in routers])
+            if credits == expected:
+                break
+            time.sleep(0.05)
+        assert credits == expected
+
+    ray.get(runner._ray_serve_fetch.remote(num_credits=4))
+    wait_for_credits([2, 1, 1])
+    # Every shard gets a credit even if there are fewer credits than shards
+    ray.get(runner._ray_serve_fetch.remote(num_credits=1))
+    wait_for_credits([3, 2, 2])
+
+
 def test_ray_serve_mixin(serve_instance):
     q = RoundRobinPolicyQueueActor.remote()
 
@@ -1,9 +1,20 @@
 import json
 
-from ray.experimental.serve.utils import BytesEncoder
+from ray.experimental.serve.utils import BytesEncoder, get_router_shard
 
 
 def test_bytes_encoder():
     data_before = {"inp": {"nest": b"bytes"}}
     data_after = {"inp": {"nest": "bytes"}}
     assert json.loads(json.dumps(data_before, cls=BytesEncoder)) == data_after
+
+
+def test_get_router_shard():
+    services = ["svc-{}".format(i) for i in range(100)]
+    shards = [get_router_shard(service, 4) for service in services]
+    assert all(0 <= shard < 4 for shard in shards)
+    # Services are spread over all shards
+    assert set(shards) == {0, 1, 2, 3}
+    # The shard of a service does not change
+    assert shards == [get_router_shard(service, 4) for service in services]
+    assert get_router_shard("svc", 1) == 0
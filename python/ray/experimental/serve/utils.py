@@ -4,6 +4,7 @@ import random
 import string
 import time
 import io
+import zlib
 
 import requests
 from pygments import formatters, highlight, lexers
@@ -53,6 +54,16 @@ class BytesEncoder(json.JSONEncoder):
         return super().default(o)
 
 
+def get_router_shard(service, num_shards):
+    """Returns the index of the router shard that owns the service.
+
+    The built-in hash of strings is randomized per process, so a stable
+    checksum is used to make the HTTP proxy, the handles and the API agree
+    on the owner of a service.
+    """
+    return zlib.crc32(service.encode("utf-8")) % num_shards
+
+
 def pformat_color_json(d):
     """Use pygments to pretty format and colroize dictionary"""
     formatted_json = json.dumps(d, sort_keys=True, indent=4)
@@ -10,7 +10,8 @@ except ImportError:
 from ray.tune.checkpoint_manager import Checkpoint
 from ray.tune.error import TuneError
 from ray.tune.result import EXPR_PROGRESS_FILE, EXPR_PARAM_FILE,\
-    CONFIG_PREFIX, TRAINING_ITERATION
+    EXPR_RESULTS_DB_FILE, CONFIG_PREFIX, TRAINING_ITERATION
+from ray.tune.results_store import get_results_store
 from ray.tune.trial import Trial
 from ray.tune.trainable import TrainableUtil
 
@@ -18,7 +19,12 @@ logger = logging.getLogger(__name__)
 
 
 class Analysis:
-    """Analyze all results from a directory of experiments."""
+    """Analyze all results from a directory of experiments.
+
+    If the experiment was logged with the SQLiteLogger, configs and best
+    results are queried from its results.db, and the dataframes of the trials
+    are only loaded when accessed.
+    """
 
     def __init__(self, experiment_dir):
         experiment_dir = os.path.expanduser(experiment_dir)
@@ -28,12 +34,16 @@ class Analysis:
         self._experiment_dir = experiment_dir
         self._configs = {}
         self._trial_dataframes = {}
+        self._store = None
 
+        db_file = os.path.join(experiment_dir, EXPR_RESULTS_DB_FILE)
+        if os.path.exists(db_file):
+            self._store = get_results_store(db_file)
         if not pd:
             logger.warning(
                 "pandas not installed. Run `pip install pandas` for "
                 "Analysis utilities.")
-        else:
+        elif not self._store:
             self.fetch_trial_dataframes()
 
     def dataframe(self, metric=None, mode=None):
@@ -61,6 +71,9 @@ class Analysis:
             mode (str): One of [min, max].
 
         """
+        if self._store:
+            best = self._store.get_best_trial(metric, mode)
+            return best[1] if best else None
         rows = self._retrieve_rows(metric=metric, mode=mode)
         all_configs = self.get_all_configs()
         compare_op = max if mode == "max" else min
@@ -75,6 +88,9 @@ class Analysis:
             mode (str): One of [min, max].
 
         """
+        if self._store:
+            best = self._store.get_best_trial(metric, mode)
+            return self._trial_path(best[0]) if best else None
         df = self.dataframe(metric=metric, mode=mode)
         if mode == "max":
             return df.iloc[df[metric].idxmax()].logdir
@@ -82,6 +98,11 @@ class Analysis:
             return df.iloc[df[metric].idxmin()].logdir
 
     def fetch_trial_dataframes(self):
+        if self._store:
+            for logdir in self._store.get_logdirs():
+                self._get_trial_dataframe(self._trial_path(logdir))
+            return self._trial_dataframes
+
         fail_count = 0
         for path in self._get_trial_paths():
             try:
@@ -102,6 +123,14 @@ class Analysis:
             prefix (bool): If True, flattens the config dict
                 and prepends `config/`.
         """
+        if self._store:
+            for logdir, config in self._store.get_configs().items():
+                if prefix:
+                    for k in list(config):
+                        config[CONFIG_PREFIX + k] = config.pop(k)
+                self._configs[self._trial_path(logdir)] = config
+            return self._configs
+
         fail_count = 0
         for path in self._get_trial_paths():
             try:
@@ -136,7 +165,7 @@ class Analysis:
             chkpt_df = TrainableUtil.get_checkpoints_paths(trial_dir)
 
             # join with trial dataframe to get metrics
-            trial_df = self.trial_dataframes[trial_dir]
+            trial_df = self._get_trial_dataframe(trial_dir)
             path_metric_df = chkpt_df.merge(
                 trial_df, on="training_iteration", how="inner")
             return path_metric_df[["chkpt_path", metric]].values.tolist()
@@ -151,6 +180,12 @@ class Analysis:
 
     def _retrieve_rows(self, metric=None, mode=None):
         assert mode is None or mode in ["max", "min"]
+        if self._store:
+            return {
+                self._trial_path(logdir): row
+                for logdir, row in self._store.get_rows(
+                    metric=metric, mode=mode).items()
+            }
         rows = {}
         for path, df in self.trial_dataframes.items():
             if mode == "max":
@@ -174,9 +209,24 @@ class Analysis:
                 self._experiment_dir))
         return _trial_paths
 
+    # The store keeps the logdirs relative to the experiment dir
+    def _trial_path(self, logdir):
+        return os.path.join(self._experiment_dir, logdir)
+
+    def _get_trial_dataframe(self, path):
+        if self._store:
+            logdir = os.path.relpath(path, self._experiment_dir)
+            path = self._trial_path(logdir)
+            if path not in self._trial_dataframes:
+                self._trial_dataframes[path] = pd.DataFrame(
+                    self._store.get_results(logdir))
+        return self._trial_dataframes[path]
+
     @property
     def trial_dataframes(self):
         """List of all dataframes of the trials."""
+        if self._store and pd:
+            self.fetch_trial_dataframes()
         return self._trial_dataframes
 
 
@@ -276,6 +326,9 @@ class ExperimentAnalysis(Analysis):
                 trial's min/max score for `metric` based on `mode`, and
                 compare trials based on `mode=[min,max]`.
         """
+        if not self.trials and self._store:
+            best = self._store.get_best_trial(metric, mode, scope)
+            return best[1] if best else None
         best_trial = self.get_best_trial(metric, mode, scope)
         return best_trial.config if best_trial else None
 
@@ -293,6 +346,9 @@ class ExperimentAnalysis(Analysis):
                 trial's min/max score for `metric` based on `mode`, and
                 compare trials based on `mode=[min,max]`.
         """
+        if not self.trials and self._store:
+            best = self._store.get_best_trial(metric, mode, scope)
+            return best[0] if best else None
         best_trial = self.get_best_trial(metric, mode, scope)
         return best_trial.logdir if best_trial else None
 
@@ -101,6 +101,34 @@ class CheckpointManager:
         if old_checkpoint.value and old_checkpoint not in self._membership:
             self.delete(old_checkpoint)
 
+    def release_memory_checkpoint(self, value):
+        """Stops tracking the in-memory checkpoint with the given value, so
+        that its object can be freed.
+
+        Args:
+            value: Value of the checkpoint, e.g. an object ID.
+        """
+
+        def matches(checkpoint):
+            return (checkpoint.storage == Checkpoint.MEMORY
+                    and checkpoint.value is value)
+
+        if matches(self.newest_checkpoint):
+            self.newest_checkpoint = Checkpoint(Checkpoint.MEMORY, None)
+        released = [
+            queue_item for queue_item in self._best_checkpoints
+            if matches(queue_item.value)
+        ]
+        if not released:
+            return
+        self._best_checkpoints = [
+            queue_item for queue_item in self._best_checkpoints
+            if not matches(queue_item.value)
+        ]
+        heapq.heapify(self._best_checkpoints)
+        for queue_item in released:
+            self._membership.discard(queue_item.value)
+
     def best_checkpoints(self):
         """Returns best checkpoints, sorted by score."""
         checkpoints = sorted(self._best_checkpoints, key=lambda c: c.priority)
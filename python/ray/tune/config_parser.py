@@ -193,4 +193,5 @@ def create_trial_from_spec(spec, output_path, parser, **trial_kwargs):
         # str(None) doesn't create None
         sync_to_driver_fn=spec.get("sync_to_driver"),
         max_failures=args.max_failures,
+        async_logging=spec.get("async_logging", False),
         **trial_kwargs)
@@ -92,7 +92,8 @@ class Experiment:
                  restore=None,
                  repeat=None,
                  trial_resources=None,
-                 sync_function=None):
+                 sync_function=None,
+                 async_logging=False):
         """Initialize a new Experiment.
 
         The args here take the same meaning as the command line flags defined
@@ -149,6 +150,7 @@ class Experiment:
             "checkpoint_score_attr": checkpoint_score_attr,
             "export_formats": export_formats or [],
             "max_failures": max_failures,
+            "async_logging": async_logging,
             "restore": os.path.abspath(os.path.expanduser(restore))
             if restore else None
         }
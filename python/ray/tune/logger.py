@@ -2,17 +2,21 @@ import csv
 import json
 import logging
 import os
+import threading
+import time
 import yaml
 import distutils.version
 import numbers
 
 import numpy as np
+from six.moves import queue
 
 import ray.cloudpickle as cloudpickle
 from ray.tune.result import (NODE_IP, TRAINING_ITERATION, TIME_TOTAL_S,
                              TIMESTEPS_TOTAL, EXPR_PARAM_FILE,
                              EXPR_PARAM_PICKLE_FILE, EXPR_PROGRESS_FILE,
-                             EXPR_RESULT_FILE)
+                             EXPR_RESULT_FILE, EXPR_RESULTS_DB_FILE)
+from ray.tune.results_store import get_results_store
 from ray.tune.syncer import get_node_syncer
 from ray.tune.utils import flatten_dict
 
@@ -21,6 +25,8 @@ logger = logging.getLogger(__name__)
 tf = None
 VALID_SUMMARY_TYPES = [int, float, np.float32, np.float64, np.int32]
 
+_async_logging_service = None
+
 
 class Logger:
     """Logging interface for ray.tune.
@@ -34,6 +40,10 @@ class Logger:
         logdir: Directory for all logger creators to log to.
     """
 
+    # Whether on_result() flushes each result to storage. This is disabled
+    # for loggers run by the AsyncLoggingService, which flushes periodically.
+    flush_on_result = True
+
     def __init__(self, config, logdir, trial=None):
         self.config = config
         self.logdir = logdir
@@ -106,7 +116,8 @@ class JsonLogger(Logger):
     def on_result(self, result):
         json.dump(result, self, cls=_SafeFallbackEncoder)
         self.write("\n")
-        self.local_out.flush()
+        if self.flush_on_result:
+            self.local_out.flush()
 
     def write(self, b):
         self.local_out.write(b)
@@ -209,7 +220,8 @@ class TF2Logger(Logger):
                     if type(value) in VALID_SUMMARY_TYPES:
                         tf.summary.scalar(
                             "/".join(path + [attr]), value, step=step)
-        self._file_writer.flush()
+        if self.flush_on_result:
+            self._file_writer.flush()
 
     def flush(self):
         if self._file_writer is not None:
@@ -265,7 +277,8 @@ class TFLogger(Logger):
         }, ["ray", "tune"])
         iteration_stats = tf.Summary(value=iteration_value)
         self._file_writer.add_summary(iteration_stats, t)
-        self._file_writer.flush()
+        if self.flush_on_result:
+            self._file_writer.flush()
 
     def flush(self):
         self._file_writer.flush()
@@ -303,7 +316,8 @@ class CSVLogger(Logger):
         self._csv_out.writerow(
             {k: v
              for k, v in result.items() if k in self._csv_out.fieldnames})
-        self._file.flush()
+        if self.flush_on_result:
+            self._file.flush()
 
     def flush(self):
         self._file.flush()
@@ -351,7 +365,8 @@ class TBXLogger(Logger):
         for attr, value in valid_result.items():
             self._file_writer.add_scalar(attr, value, global_step=step)
         self.last_result = valid_result
-        self._file_writer.flush()
+        if self.flush_on_result:
+            self._file_writer.flush()
 
     def flush(self):
         if self._file_writer is not None:
@@ -377,6 +392,45 @@ class TBXLogger(Logger):
         self._file_writer.file_writer.add_summary(session_end_tag)
 
 
+class SQLiteLogger(Logger):
+    """Logs results to results.db under the experiment directory.
+
+    The configs and results of all trials of the experiment are stored in a
+    single database, which Analysis uses to query the best trial without
+    reading every trial's progress.csv. Results are flattened as in the
+    CSVLogger.
+    """
+
+    def _init(self):
+        self._store = get_results_store(
+            os.path.join(os.path.dirname(self.logdir), EXPR_RESULTS_DB_FILE),
+            encoder=_SafeFallbackEncoder)
+        self._trial_id = self.trial.trial_id if self.trial else \
+            os.path.basename(self.logdir)
+        self.update_config(self.config)
+
+    def on_result(self, result):
+        self._store.add_result(self._trial_id, result)
+        if self.flush_on_result:
+            self._store.commit()
+
+    def update_config(self, config):
+        self.config = config
+        # The logdir is relative so that the experiment dir can be moved
+        self._store.set_config(
+            self._trial_id,
+            os.path.relpath(self.logdir, os.path.dirname(self._store.path)),
+            config)
+        self._store.commit()
+
+    def flush(self):
+        self._store.commit()
+
+    def close(self):
+        # The store is shared with the other trials of the experiment
+        self._store.commit()
+
+
 DEFAULT_LOGGERS = (JsonLogger, CSVLogger, TBXLogger)
 
 
@@ -390,6 +444,8 @@ class UnifiedLogger(Logger):
             and JSON loggers.
         sync_function (func|str): Optional function for syncer to run.
             See ray/python/ray/tune/syncer.py
+        async_logging (bool): Whether to write the results on the shared
+            AsyncLoggingService thread instead of the calling thread.
     """
 
     def __init__(self,
@@ -397,13 +453,17 @@ class UnifiedLogger(Logger):
                  logdir,
                  trial=None,
                  loggers=None,
-                 sync_function=None):
+                 sync_function=None,
+                 async_logging=False):
         if loggers is None:
             self._logger_cls_list = DEFAULT_LOGGERS
         else:
             self._logger_cls_list = loggers
         self._sync_function = sync_function
         self._log_syncer = None
+        self._service = None
+        if async_logging:
+            self._service = get_async_logging_service()
 
         super(UnifiedLogger, self).__init__(config, logdir, trial)
 
@@ -415,33 +475,63 @@ class UnifiedLogger(Logger):
             except Exception as exc:
                 logger.warning("Could not instantiate %s: %s.", cls.__name__,
                                str(exc))
+        if self._service:
+            for _logger in self._loggers:
+                _logger.flush_on_result = False
         self._log_syncer = get_node_syncer(
             self.logdir,
             remote_dir=self.logdir,
             sync_function=self._sync_function)
 
     def on_result(self, result):
-        for _logger in self._loggers:
-            _logger.on_result(result)
+        if self._service:
+            self._service.log_result(self, result)
+        else:
+            self._log_result(result)
         self._log_syncer.set_worker_ip(result.get(NODE_IP))
         self._log_syncer.sync_down_if_needed()
 
     def update_config(self, config):
-        for _logger in self._loggers:
-            _logger.update_config(config)
+        if self._service:
+            self._service.submit(self._update_config, config)
+        else:
+            self._update_config(config)
 
     def close(self):
-        for _logger in self._loggers:
-            _logger.close()
+        if self._service:
+            self._service.submit(self._close)
+        else:
+            self._close()
 
     def flush(self, sync_down=True):
-        for _logger in self._loggers:
-            _logger.flush()
+        # The logs are written on the driver, so syncing down the files of
+        # the trial does not need to wait for the queued results
+        if self._service:
+            self._service.submit(self._flush)
+        else:
+            self._flush()
         if sync_down:
             if not self._log_syncer.sync_down():
                 logger.warning("Trial %s: Post-flush sync skipped.",
                                self.trial)
 
+    def _log_result(self, result):
+        for _logger in self._loggers:
+            _logger.on_result(result)
+
+    def _update_config(self, config):
+        for _logger in self._loggers:
+            _logger.update_config(config)
+
+    def _flush(self):
+        for _logger in self._loggers:
+            _logger.flush()
+
+    def _close(self):
+        for _logger in self._loggers:
+            _logger.close()
+        self._loggers = []
+
     def sync_up(self):
         return self._log_syncer.sync_up()
 
@@ -473,6 +563,127 @@ class UnifiedLogger(Logger):
                 "should not occur.", self.trial, worker_ip)
 
 
+class AsyncLoggingService:
+    """Writes the results of UnifiedLoggers on a background thread.
+
+    Results are passed through a bounded queue, so that slow file I/O does
+    not stall the trial event loop. Results that arrive while the queue is
+    full are dropped and counted. Other logger calls, e.g., to close a
+    logger, block until they can be queued. The loggers are flushed once
+    `flush_size` results have been written or `flush_interval_s` has passed,
+    and when they are closed.
+
+    Arguments:
+        queue_size (int): Max number of queued results.
+        flush_interval_s (float): Max time between flushes of loggers that
+            have unflushed results.
+        flush_size (int): Number of results after which the loggers are
+            flushed.
+    """
+
+    def __init__(self, queue_size=10000, flush_interval_s=5.0,
+                 flush_size=1000):
+        self.flush_interval_s = flush_interval_s
+        self.flush_size = flush_size
+        self.num_dropped = 0
+        self._queue = queue.Queue(queue_size)
+        # Only accessed by the logging thread
+        self._unflushed = set()
+        self._num_unflushed = 0
+        self._thread = threading.Thread(
+            target=self._run, name="AsyncLoggingService")
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def num_queued(self):
+        """Number of results and calls waiting to be processed."""
+        return self._queue.qsize()
+
+    def log_result(self, unified_logger, result):
+        """Queues a result, or drops it if the queue is full."""
+        try:
+            self._queue.put_nowait((self._write, (unified_logger, result),
+                                    None))
+        except queue.Full:
+            self.num_dropped += 1
+            if self.num_dropped % 1000 == 1:
+                logger.warning(
+                    "Dropped %s results since the async logging queue is "
+                    "full. Consider increasing your period of result "
+                    "reporting.", self.num_dropped)
+
+    def submit(self, fn, *args):
+        """Calls fn on the logging thread after the queued results."""
+        self._queue.put((fn, args, None))
+
+    def wait(self):
+        """Blocks until all queued results are written and flushed."""
+        done = threading.Event()
+        self._queue.put((self._flush, (), done))
+        done.wait()
+
+    def debug_string(self):
+        return "Async logging: {} queued, {} dropped results".format(
+            self.num_queued, self.num_dropped)
+
+    def _write(self, unified_logger, result):
+        unified_logger._log_result(result)
+        self._unflushed.add(unified_logger)
+        self._num_unflushed += 1
+
+    def _flush(self):
+        for unified_logger in self._unflushed:
+            try:
+                unified_logger._flush()
+            except Exception:
+                logger.exception("Trial %s: Error flushing logs.",
+                                 unified_logger.trial)
+        self._unflushed = set()
+        self._num_unflushed = 0
+
+    def _run(self):
+        next_flush = time.time() + self.flush_interval_s
+        while True:
+            try:
+                fn, args, done = self._queue.get(
+                    timeout=max(0, next_flush - time.time()))
+                try:
+                    fn(*args)
+                except Exception:
+                    logger.exception("Error in async logging service.")
+                finally:
+                    if done:
+                        done.set()
+            except queue.Empty:
+                pass
+            if (self._num_unflushed >= self.flush_size
+                    or time.time() >= next_flush):
+                self._flush()
+                next_flush = time.time() + self.flush_interval_s
+
+
+def get_async_logging_service():
+    """Returns the AsyncLoggingService, starting it if needed."""
+    global _async_logging_service
+    if _async_logging_service is None:
+        _async_logging_service = AsyncLoggingService()
+    return _async_logging_service
+
+
+def async_logging_debug_str():
+    """Returns the queued and dropped counts of async logging, if used."""
+    if _async_logging_service is None:
+        return None
+    return _async_logging_service.debug_string()
+
+
+def wait_for_async_logging():
+    """Waits until the results queued for async logging are written."""
+    if _async_logging_service is not None:
+        _async_logging_service.wait()
+
+
 class _SafeFallbackEncoder(json.JSONEncoder):
     def __init__(self, nan_str="null", **kwargs):
         super(_SafeFallbackEncoder, self).__init__(**kwargs)
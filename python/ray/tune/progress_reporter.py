@@ -2,6 +2,7 @@ from __future__ import print_function
 
 import collections
 
+from ray.tune.logger import async_logging_debug_str
 from ray.tune.result import (DEFAULT_RESULT_KEYS, CONFIG_PREFIX,
                              EPISODE_REWARD_MEAN, MEAN_ACCURACY, MEAN_LOSS,
                              TRAINING_ITERATION, TIME_TOTAL_S, TIMESTEPS_TOTAL)
@@ -57,6 +58,8 @@ class JupyterNotebookReporter(ProgressReporter):
             trial_progress_str(trial_runner.get_trials(), fmt="html"),
             trial_errors_str(trial_runner.get_trials(), fmt="html"),
         ]
+        if async_logging_debug_str():
+            messages.insert(4, async_logging_debug_str())
         from IPython.display import clear_output
         from IPython.core.display import display, HTML
         if self.overwrite:
@@ -74,6 +77,8 @@ class CLIReporter(ProgressReporter):
             trial_progress_str(trial_runner.get_trials()),
             trial_errors_str(trial_runner.get_trials()),
         ]
+        if async_logging_debug_str():
+            messages.insert(4, async_logging_debug_str())
         print("\n".join(messages) + "\n")
 
 
@@ -48,11 +48,16 @@ class RayTrialExecutor(TrialExecutor):
         # Check for if we are launching a trial without resources in kick off
         # autoscaler.
         self._trial_queued = False
+        # Maps futures to trials, and trials to their pending future.
         self._running = {}
+        self._running_by_trial = {}
         # Since trial resume after paused should not run
         # trial.train.remote(), thus no more new remote object id generated.
         # We use self._paused to store paused trials here.
         self._paused = {}
+        self._paused_by_trial = {}
+        # Futures returned ready by the last get_next_available_trials()
+        self._ready_futures = set()
         self._reuse_actors = reuse_actors
         self._cached_actor = None
 
@@ -131,14 +136,14 @@ class RayTrialExecutor(TrialExecutor):
 
     def _train(self, trial):
         """Start one iteration of training and save remote id."""
-        if self._find_item(self._paused, trial):
+        if trial in self._paused_by_trial:
             raise TuneError(
                 "Should not call `train` on PAUSED trial {}. "
                 "This is an internal error - please file an issue "
                 "on https://github.com/ray-project/ray/issues/.".format(
                     str(trial)))
 
-        if self._find_item(self._running, trial):
+        if trial in self._running_by_trial:
             logging.debug(
                 "Trial {} already has a queued future. Skipping this "
                 "`train` call. This may occur if a trial has "
@@ -154,9 +159,7 @@ class RayTrialExecutor(TrialExecutor):
         if isinstance(remote, dict):
             remote = _LocalWrapper(remote)
 
-        self._running[remote] = trial
-        trial_item = self._find_item(self._running, trial)
-        assert len(trial_item) < 2, trial_item
+        self._add_running(remote, trial)
 
     def _start_trial(self, trial, checkpoint=None, runner=None):
         """Starts trial and restores last result if trial was paused.
@@ -180,11 +183,12 @@ class RayTrialExecutor(TrialExecutor):
                 or trial.has_checkpoint()))
         self.restore(trial, checkpoint)
 
-        previous_run = self._find_item(self._paused, trial)
-        if prior_status == Trial.PAUSED and previous_run:
+        previous_run = self._paused_by_trial.get(trial)
+        if prior_status == Trial.PAUSED and previous_run is not None:
             # If Trial was in flight when paused, self._paused stores result.
-            self._paused.pop(previous_run[0])
-            self._running[previous_run[0]] = trial
+            self._paused.pop(previous_run)
+            del self._paused_by_trial[trial]
+            self._add_running(previous_run, trial)
         elif not trial.is_restoring:
             self._train(trial)
 
@@ -253,9 +257,16 @@ class RayTrialExecutor(TrialExecutor):
             # Note that we don't return the resources, since they may
             # have been lost. TODO(ujvl): is this the right thing to do?
 
-    def _find_item(self, dictionary, item):
-        out = [rid for rid, t in dictionary.items() if t is item]
-        return out
+    def _add_running(self, future, trial):
+        self._running[future] = trial
+        self._running_by_trial[trial] = future
+
+    def _pop_running(self, trial):
+        future = self._running_by_trial.pop(trial, None)
+        if future is not None:
+            self._running.pop(future)
+            self._ready_futures.discard(future)
+        return future
 
     def stop_trial(self, trial, error=False, error_msg=None, stop_logger=True):
         """Only returns resources if resources allocated."""
@@ -265,9 +276,7 @@ class RayTrialExecutor(TrialExecutor):
         if prior_status == Trial.RUNNING:
             logger.debug("Trial %s: Returning resources.", trial)
             self._return_resources(trial.resources)
-            out = self._find_item(self._running, trial)
-            for result_id in out:
-                self._running.pop(result_id)
+            self._pop_running(trial)
 
     def continue_training(self, trial):
         """Continues the training of this trial."""
@@ -279,9 +288,10 @@ class RayTrialExecutor(TrialExecutor):
         If trial is in-flight, preserves return value in separate queue
         before pausing, which is restored when Trial is resumed.
         """
-        trial_future = self._find_item(self._running, trial)
-        if trial_future:
-            self._paused[trial_future[0]] = trial
+        trial_future = self._running_by_trial.get(trial)
+        if trial_future is not None:
+            self._paused[trial_future] = trial
+            self._paused_by_trial[trial] = trial_future
         super(RayTrialExecutor, self).pause_trial(trial)
 
     def reset_trial(self, trial, new_config, new_experiment_tag):
@@ -364,18 +374,56 @@ class RayTrialExecutor(TrialExecutor):
             self._last_nontrivial_wait = time.time()
         return self._running[result_id]
 
+    def get_next_available_trials(self):
+        """Blocking call that waits until at least one result is ready.
+
+        Unlike get_next_available_trial(), this returns all trials whose
+        results are ready, using a single non-blocking `ray.wait` after the
+        first result.
+
+        Returns:
+            List of Trial objects that are ready for intermediate processing.
+        """
+        futures = list(self._running.keys())
+        start = time.time()
+        ready, not_ready = ray.wait(futures)
+        wait_time = time.time() - start
+        if not_ready:
+            more_ready, _ = ray.wait(
+                not_ready, num_returns=len(not_ready), timeout=0)
+            ready += more_ready
+        if wait_time > NONTRIVIAL_WAIT_TIME_THRESHOLD_S:
+            self._last_nontrivial_wait = time.time()
+        if time.time() - self._last_nontrivial_wait > BOTTLENECK_WARN_PERIOD_S:
+            logger.warning(
+                "Over the last {} seconds, the Tune event loop has been "
+                "backlogged processing new results, {} at a time. Consider "
+                "increasing your period of result reporting to improve "
+                "performance.".format(BOTTLENECK_WARN_PERIOD_S, len(ready)))
+            self._last_nontrivial_wait = time.time()
+        self._ready_futures = set(ready)
+        return [self._running[result_id] for result_id in ready]
+
+    def has_ready_result(self, trial):
+        """Returns whether the pending future of the trial was returned by
+        the last get_next_available_trials() call.
+
+        This is False if the trial was stopped or paused since, e.g., by a
+        scheduler decision for another trial of the same batch.
+        """
+        return self._running_by_trial.get(trial) in self._ready_futures
+
     def fetch_result(self, trial):
         """Fetches one result of the running trials.
 
         Returns:
             Result of the most recent trial training run.
         """
-        trial_future = self._find_item(self._running, trial)
-        if not trial_future:
+        trial_future = self._pop_running(trial)
+        if trial_future is None:
             raise ValueError("Trial was not running.")
-        self._running.pop(trial_future[0])
         with warn_if_slow("fetch_result"):
-            result = ray.get(trial_future[0], DEFAULT_GET_TIMEOUT)
+            result = ray.get(trial_future, DEFAULT_GET_TIMEOUT)
 
         # For local mode
         if isinstance(result, _LocalWrapper):
@@ -631,7 +679,7 @@ class RayTrialExecutor(TrialExecutor):
                     "restoration. Pass in an `upload_dir` and a Trainable "
                     "extending `DurableTrainable` for remote storage-based "
                     "restoration")
-            self._running[remote] = trial
+            self._add_running(remote, trial)
             trial.restoring_from = checkpoint
 
     def export_trial_if_needed(self, trial):
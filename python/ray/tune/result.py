@@ -90,5 +90,9 @@ EXPR_PROGRESS_FILE = "progress.csv"
 # File that stores results of the trial.
 EXPR_RESULT_FILE = "result.json"
 
+# SQLite database under each experiment directory that stores the configs
+# and results of all trials, if written by the SQLiteLogger.
+EXPR_RESULTS_DB_FILE = "results.db"
+
 # Config prefix when using Analysis.
 CONFIG_PREFIX = "config/"
@@ -0,0 +1,215 @@
+import json
+import logging
+import math
+import numbers
+import sqlite3
+import threading
+
+from ray.tune.utils import flatten_dict
+
+logger = logging.getLogger(__name__)
+
+_stores = {}
+
+# Each result is stored as a JSON row of the results table. The last, min
+# and max values of each numeric metric of a trial, and the steps at which
+# they were reported, are kept up to date in the metrics table, which is
+# indexed so that best trial queries don't read the results.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    trial_id TEXT PRIMARY KEY,
+    logdir TEXT,
+    config TEXT,
+    num_results INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS results (
+    trial_id TEXT NOT NULL,
+    step INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (trial_id, step)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    trial_id TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    last REAL,
+    min REAL,
+    max REAL,
+    last_step INTEGER,
+    min_step INTEGER,
+    max_step INTEGER,
+    PRIMARY KEY (trial_id, metric)
+);
+CREATE INDEX IF NOT EXISTS metrics_last ON metrics (metric, last);
+CREATE INDEX IF NOT EXISTS metrics_min ON metrics (metric, min);
+CREATE INDEX IF NOT EXISTS metrics_max ON metrics (metric, max);
+"""
+
+_UPDATE_METRIC = """
+UPDATE metrics SET
+    last = :value,
+    last_step = :step,
+    min_step = CASE WHEN :value < min THEN :step ELSE min_step END,
+    min = MIN(min, :value),
+    max_step = CASE WHEN :value > max THEN :step ELSE max_step END,
+    max = MAX(max, :value)
+WHERE trial_id = :trial_id AND metric = :metric
+"""
+
+
+class ResultsStore:
+    """SQLite database of the configs and results of an experiment's trials.
+
+    The database is shared by the trials of an experiment and written
+    incrementally by the SQLiteLogger. Analysis uses it, if it exists, to
+    answer best trial queries with indexed lookups, and loads the full
+    results of trials only when they are accessed.
+
+    The logdir of each trial is stored relative to the experiment dir,
+    which is the directory of the database file.
+
+    Arguments:
+        path (str): Path of the database file.
+        encoder (json.JSONEncoder): Encoder class for configs and results.
+    """
+
+    def __init__(self, path, encoder=json.JSONEncoder):
+        self.path = path
+        self._encoder = encoder
+        self._lock = threading.Lock()
+        # The store is shared by the loggers of all trials, which may run on
+        # the async logging thread
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def set_config(self, trial_id, logdir, config):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO trials (trial_id) VALUES (?)",
+                (trial_id, ))
+            self._conn.execute(
+                "UPDATE trials SET logdir = ?, config = ? WHERE trial_id = ?",
+                (logdir, json.dumps(config, cls=self._encoder), trial_id))
+
+    def add_result(self, trial_id, result):
+        """Appends a result of the trial, which must have been added with
+        set_config()."""
+        flat_result = flatten_dict(
+            {k: v
+             for k, v in result.items() if k != "config"},
+            delimiter="/")
+        with self._lock:
+            step, = self._conn.execute(
+                "SELECT num_results FROM trials WHERE trial_id = ?",
+                (trial_id, )).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                (trial_id, step,
+                 json.dumps(flat_result, cls=self._encoder)))
+            self._conn.execute(
+                "UPDATE trials SET num_results = ? WHERE trial_id = ?",
+                (step + 1, trial_id))
+            metrics = [{
+                "trial_id": trial_id,
+                "metric": k,
+                "value": float(v),
+                "step": step
+            } for k, v in flat_result.items() if _is_metric(v)]
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO metrics VALUES (:trial_id, :metric, "
+                ":value, :value, :value, :step, :step, :step)", metrics)
+            self._conn.executemany(_UPDATE_METRIC, metrics)
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def get_configs(self):
+        """Returns the config of each trial, keyed by logdir."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT logdir, config FROM trials").fetchall()
+        return {logdir: json.loads(config) for logdir, config in rows}
+
+    def get_logdirs(self):
+        """Returns the logdirs of the trials with results."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT logdir FROM trials WHERE num_results > 0").fetchall()
+        return [logdir for logdir, in rows]
+
+    def get_results(self, logdir):
+        """Returns the flattened results of the trial, in order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.result FROM results r JOIN trials t "
+                "ON r.trial_id = t.trial_id WHERE t.logdir = ? "
+                "ORDER BY r.step", (logdir, )).fetchall()
+        return [json.loads(result) for result, in rows]
+
+    def get_rows(self, metric=None, mode=None):
+        """Returns one result of each trial, keyed by logdir.
+
+        This is the result with the max or min value of the metric, or the
+        last result if mode is None.
+        """
+        with self._lock:
+            if mode is None:
+                rows = self._conn.execute(
+                    "SELECT t.logdir, r.result FROM trials t JOIN results r "
+                    "ON r.trial_id = t.trial_id "
+                    "AND r.step = t.num_results - 1").fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT t.logdir, r.result FROM metrics m "
+                    "JOIN trials t ON t.trial_id = m.trial_id "
+                    "JOIN results r ON r.trial_id = m.trial_id "
+                    "AND r.step = m.{}_step WHERE m.metric = ?".format(
+                        _check_mode(mode)), (metric, )).fetchall()
+        return {logdir: json.loads(result) for logdir, result in rows}
+
+    def get_best_trial(self, metric, mode="max", scope="all"):
+        """Returns the (logdir, config) of the best trial, or None.
+
+        Arguments:
+            metric (str): Key for trial info to order on.
+            mode (str): One of [min, max].
+            scope (str): One of [all, last]. If `scope=last`, compares the
+                last values of the metric, else the min/max values.
+        """
+        column = "last" if scope == "last" else _check_mode(mode)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT t.logdir, t.config FROM metrics m "
+                "JOIN trials t ON t.trial_id = m.trial_id "
+                "WHERE m.metric = ? AND m.{column} IS NOT NULL "
+                "ORDER BY m.{column} {order} LIMIT 1".format(
+                    column=column,
+                    order="DESC" if mode == "max" else "ASC"),
+                (metric, )).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+def get_results_store(path, encoder=json.JSONEncoder):
+    """Returns the ResultsStore of the database file, opening it if needed."""
+    if path not in _stores:
+        _stores[path] = ResultsStore(path, encoder)
+    return _stores[path]
+
+
+def _check_mode(mode):
+    if mode not in ["max", "min"]:
+        raise ValueError("mode must be one of [min, max], got {}".format(mode))
+    return mode
+
+
+def _is_metric(value):
+    return (isinstance(value, numbers.Number)
+            and not isinstance(value, bool) and math.isfinite(value))
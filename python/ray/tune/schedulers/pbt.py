@@ -149,6 +149,10 @@ class PopulationBasedTraining(FIFOScheduler):
         log_config (bool): Whether to log the ray config of each model to
             local_dir at each exploit. Allows config schedule to be
             reconstructed.
+        max_object_store_checkpoints (int): Max number of checkpoints of top
+            trials held in the Ray object store for exploitation. When this
+            is exceeded, the checkpoints of the lowest scoring trials are
+            released. Defaults to no limit, i.e., one per top trial.
 
     Example:
         >>> pbt = PopulationBasedTraining(
@@ -178,7 +182,8 @@ class PopulationBasedTraining(FIFOScheduler):
                  quantile_fraction=0.25,
                  resample_probability=0.25,
                  custom_explore_fn=None,
-                 log_config=True):
+                 log_config=True,
+                 max_object_store_checkpoints=None):
         for value in hyperparam_mutations.values():
             if not (isinstance(value, list) or callable(value)):
                 raise TypeError("`hyperparam_mutation` values must be either "
@@ -194,6 +199,13 @@ class PopulationBasedTraining(FIFOScheduler):
                 "You must set `quantile_fraction` to a value between 0 and"
                 "0.5. Current value: '{}'".format(quantile_fraction))
 
+        if max_object_store_checkpoints is not None and \
+                max_object_store_checkpoints < 1:
+            raise TuneError(
+                "You must set `max_object_store_checkpoints` to a positive "
+                "value. Current value: '{}'".format(
+                    max_object_store_checkpoints))
+
         assert mode in ["min", "max"], "`mode` must be 'min' or 'max'!"
 
         if reward_attr is not None:
@@ -218,10 +230,12 @@ class PopulationBasedTraining(FIFOScheduler):
         self._trial_state = {}
         self._custom_explore_fn = custom_explore_fn
         self._log_config = log_config
+        self._max_object_store_checkpoints = max_object_store_checkpoints
 
         # Metrics
         self._num_checkpoints = 0
         self._num_perturbations = 0
+        self._num_evictions = 0
 
     def on_trial_add(self, trial_runner, trial):
         self._trial_state[trial] = PBTTrialState(trial)
@@ -240,17 +254,24 @@ class PopulationBasedTraining(FIFOScheduler):
         state.last_perturbation_time = time
         lower_quantile, upper_quantile = self._quantiles()
 
+        # The previous checkpoint is replaced or, if the trial is no longer
+        # a top trial, not needed anymore
+        self._release_checkpoint(trial)
         if trial in upper_quantile:
             # The trial last result is only updated after the scheduler
             # callback. So, we override with the current result.
             state.last_checkpoint = trial_runner.trial_executor.save(
                 trial, Checkpoint.MEMORY, result=result)
             self._num_checkpoints += 1
-        else:
-            state.last_checkpoint = None  # not a top trial
+            self._evict_checkpoints()
 
         if trial in lower_quantile:
-            trial_to_clone = random.choice(upper_quantile)
+            # Prefer trials whose checkpoint wasn't evicted
+            candidates = [
+                t for t in upper_quantile
+                if self._trial_state[t].last_checkpoint is not None
+            ]
+            trial_to_clone = random.choice(candidates or upper_quantile)
             assert trial is not trial_to_clone
             self._exploit(trial_runner.trial_executor, trial, trial_to_clone)
 
@@ -260,6 +281,40 @@ class PopulationBasedTraining(FIFOScheduler):
 
         return TrialScheduler.CONTINUE
 
+    def on_trial_complete(self, trial_runner, trial, result):
+        # Finished trials are never exploited, so release their checkpoint
+        self._release_checkpoint(trial)
+
+    def on_trial_remove(self, trial_runner, trial):
+        self._release_checkpoint(trial)
+
+    def _release_checkpoint(self, trial):
+        """Drops all references to the checkpoint of the trial, including
+        the trial's own, so that the object store can free it."""
+        state = self._trial_state[trial]
+        if state.last_checkpoint is None:
+            return
+        trial.checkpoint_manager.release_memory_checkpoint(
+            state.last_checkpoint)
+        state.last_checkpoint = None
+
+    def _evict_checkpoints(self):
+        """Releases the checkpoints of the lowest scoring trials until at
+        most `max_object_store_checkpoints` are held."""
+        if self._max_object_store_checkpoints is None:
+            return
+        holders = [
+            trial for trial, state in self._trial_state.items()
+            if state.last_checkpoint is not None
+        ]
+        num_evict = len(holders) - self._max_object_store_checkpoints
+        if num_evict <= 0:
+            return
+        holders.sort(key=lambda trial: self._trial_state[trial].last_score)
+        for trial in holders[:num_evict]:
+            self._release_checkpoint(trial)
+            self._num_evictions += 1
+
     def _log_config_on_step(self, trial_state, new_state, trial,
                             trial_to_clone, new_config):
         """Logs transition during exploit/exploit step.
@@ -380,6 +435,7 @@ class PopulationBasedTraining(FIFOScheduler):
     def reset_stats(self):
         self._num_perturbations = 0
         self._num_checkpoints = 0
+        self._num_evictions = 0
 
     def last_scores(self, trials):
         scores = []
@@ -390,5 +446,8 @@ class PopulationBasedTraining(FIFOScheduler):
         return scores
 
     def debug_string(self):
-        return "PopulationBasedTraining: {} checkpoints, {} perturbs".format(
+        out = "PopulationBasedTraining: {} checkpoints, {} perturbs".format(
             self._num_checkpoints, self._num_perturbations)
+        if self._num_evictions:
+            out += ", {} evictions".format(self._num_evictions)
+        return out
@@ -13,6 +13,7 @@ from ray import tune
 from ray.tune import DurableTrainable, Trainable, TuneError
 from ray.tune import register_env, register_trainable, run_experiments
 from ray.tune.schedulers import TrialScheduler, FIFOScheduler
+from ray.tune.trainable import TrainableUtil
 from ray.tune.trial import Trial
 from ray.tune.result import (TIMESTEPS_TOTAL, DONE, HOSTNAME, NODE_IP, PID,
                              EPISODES_TOTAL, TRAINING_ITERATION,
@@ -762,6 +763,39 @@ class TrainableFunctionApiTest(unittest.TestCase):
             self.assertEqual(trial.status, Trial.TERMINATED)
             self.assertTrue(trial.has_checkpoint())
 
+    def testCheckpointDictToObject(self):
+        class TestTrain(Trainable):
+            def _setup(self, config):
+                self.state = {"hi": 1}
+
+            def _train(self):
+                return {"timesteps_this_iter": 1, "done": True}
+
+            def _save(self, path):
+                return self.state
+
+            def _restore(self, state):
+                self.state = state
+
+        test_trainable = TestTrain()
+        test_trainable.train()
+        with patch.object(TrainableUtil, "pickle_checkpoint") as pickle_ckpt:
+            obj = test_trainable.save_to_object()
+            # The checkpoint is serialized in memory, not read from disk
+            self.assertFalse(pickle_ckpt.called)
+
+        test_trainable2 = TestTrain()
+        test_trainable2.restore_from_object(obj)
+        self.assertEqual(test_trainable2.state["hi"], 1)
+        self.assertIsNone(test_trainable2.state["tune_checkpoint_path"])
+        self.assertEqual(test_trainable2.iteration, 1)
+
+        # Objects of checkpoints written to disk are restored the same way
+        checkpoint_path = test_trainable.save()
+        obj = TrainableUtil.pickle_checkpoint(checkpoint_path)
+        test_trainable2.restore_from_object(obj)
+        self.assertEqual(test_trainable2.state["hi"], 1)
+
     def testMultipleCheckpoints(self):
         class TestTrain(Trainable):
             def _setup(self, config):
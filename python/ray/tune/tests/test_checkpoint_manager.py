@@ -87,6 +87,26 @@ class CheckpointManagerTest(unittest.TestCase):
         for i in range(len(best_checkpoints)):
             self.assertEqual(best_checkpoints[i].value, i + 12)
 
+    def testReleaseMemoryCheckpoint(self):
+        """
+        Tests that released in-memory checkpoints are no longer referenced.
+        """
+        checkpoint_manager = self.checkpoint_manager(None)
+        checkpoints = [
+            Checkpoint(Checkpoint.MEMORY, {i}, self.mock_result(i))
+            for i in range(3)
+        ]
+        for checkpoint in checkpoints:
+            checkpoint_manager.on_checkpoint(checkpoint)
+
+        checkpoint_manager.release_memory_checkpoint(checkpoints[1].value)
+        self.assertEqual(checkpoint_manager.best_checkpoints(),
+                         [checkpoints[0], checkpoints[2]])
+        checkpoint_manager.release_memory_checkpoint(checkpoints[2].value)
+        self.assertEqual(checkpoint_manager.best_checkpoints(),
+                         [checkpoints[0]])
+        self.assertIsNone(checkpoint_manager.newest_checkpoint.value)
+
     def testOnCheckpointUnavailableAttribute(self):
         """
         Tests that an error is logged when the associated result of the
@@ -6,7 +6,8 @@ import os
 import pandas as pd
 
 import ray
-from ray.tune import run, sample_from
+from ray.tune import run, sample_from, Analysis
+from ray.tune.logger import DEFAULT_LOGGERS, SQLiteLogger
 from ray.tune.examples.async_hyperband_example import MyTrainableClass
 
 
@@ -125,6 +126,56 @@ class ExperimentAnalysisSuite(unittest.TestCase):
         df = analysis.dataframe()
         self.assertEquals(df.shape[0], 1)
 
+    def testResultsStore(self):
+        run(MyTrainableClass,
+            name="store_exp",
+            local_dir=self.test_dir,
+            loggers=DEFAULT_LOGGERS + (SQLiteLogger, ),
+            stop={"training_iteration": 3},
+            num_samples=self.num_samples,
+            config={
+                "width": sample_from(
+                    lambda spec: 10 + int(90 * random.random())),
+                "height": sample_from(lambda spec: int(100 * random.random())),
+            })
+        exp_dir = os.path.join(self.test_dir, "store_exp")
+        analysis = Analysis(exp_dir)
+        self.assertTrue(analysis._store)
+        self.assertFalse(analysis._trial_dataframes)
+
+        # Queries from the store match those from the csv files
+        analysis._store = None
+        analysis.fetch_trial_dataframes()
+        for mode in ["max", "min"]:
+            best_logdir = analysis.get_best_logdir(self.metric, mode)
+            best_config = analysis.get_best_config(self.metric, mode)
+            store_analysis = Analysis(exp_dir)
+            self.assertEqual(
+                store_analysis.get_best_logdir(self.metric, mode),
+                best_logdir)
+            self.assertEqual(
+                store_analysis.get_best_config(self.metric, mode),
+                best_config)
+
+        df = store_analysis.dataframe(self.metric, mode="max")
+        self.assertEquals(df.shape[0], self.num_samples)
+        self.assertTrue("config/width" in df.columns)
+        dataframes = store_analysis.trial_dataframes
+        self.assertEqual(len(dataframes), self.num_samples)
+        for df in dataframes.values():
+            self.assertEqual(df.training_iteration.max(), 3)
+
+        # The logdirs are stored relative to the moved experiment dir
+        moved_dir = os.path.join(self.test_dir, "moved_exp")
+        shutil.move(exp_dir, moved_dir)
+        moved_analysis = Analysis(moved_dir)
+        best_logdir = moved_analysis.get_best_logdir(self.metric)
+        self.assertEqual(os.path.dirname(best_logdir), moved_dir)
+        self.assertTrue(os.path.isdir(best_logdir))
+        self.assertIn(best_logdir, moved_analysis.get_all_configs())
+        self.assertEqual(
+            len(moved_analysis._get_trial_dataframe(best_logdir)), 3)
+
 
 if __name__ == "__main__":
     import pytest
@@ -1,9 +1,13 @@
 from collections import namedtuple
+import os
+import threading
 import unittest
 import tempfile
 import shutil
 
-from ray.tune.logger import tf2_compat_logger, JsonLogger, CSVLogger, TBXLogger
+from ray.tune.logger import tf2_compat_logger, JsonLogger, CSVLogger, \
+    TBXLogger, UnifiedLogger, AsyncLoggingService
+from ray.tune.result import EXPR_PROGRESS_FILE, EXPR_RESULT_FILE
 
 Trial = namedtuple("MockTrial", ["evaluated_params", "trial_id"])
 
@@ -58,6 +62,44 @@ class LoggerSuite(unittest.TestCase):
         logger.on_result(result(2, 4))
         logger.close()
 
+    def testAsyncLogging(self):
+        config = {"a": 2, "b": 5}
+        t = Trial(evaluated_params=config, trial_id="async")
+        logger = UnifiedLogger(
+            config=config,
+            logdir=self.test_dir,
+            trial=t,
+            loggers=[JsonLogger, CSVLogger],
+            async_logging=True)
+        for i in range(10):
+            logger.on_result(result(i, 4))
+        logger.close()
+        logger._service.wait()
+        with open(os.path.join(self.test_dir, EXPR_RESULT_FILE)) as f:
+            self.assertEqual(len(f.readlines()), 10)
+        with open(os.path.join(self.test_dir, EXPR_PROGRESS_FILE)) as f:
+            self.assertEqual(len(f.readlines()), 11)
+
+    def testAsyncLoggingDropsResults(self):
+        config = {"a": 2, "b": 5}
+        t = Trial(evaluated_params=config, trial_id="async")
+        logger = UnifiedLogger(
+            config=config,
+            logdir=self.test_dir,
+            trial=t,
+            loggers=[JsonLogger],
+            async_logging=True)
+        service = AsyncLoggingService(queue_size=5)
+        # Block the logging thread, so that the queue fills up
+        unblock = threading.Event()
+        service.submit(unblock.wait)
+        for i in range(10):
+            service.log_result(logger, result(i, 4))
+        self.assertGreaterEqual(service.num_dropped, 5)
+        unblock.set()
+        service.wait()
+        self.assertEqual(service.num_queued, 0)
+
 
 if __name__ == "__main__":
     import pytest
@@ -226,6 +226,38 @@ class TrialRunnerTest(unittest.TestCase):
         self.assertEqual(trials[0].status, Trial.RUNNING)
         self.assertEqual(trials[1].status, Trial.RUNNING)
 
+    def testBatchResults(self):
+        ray.init(num_cpus=4)
+        runner = TrialRunner(batch_results=True)
+        kwargs = {
+            "stopping_criterion": {
+                "training_iteration": 5
+            },
+            "resources": Resources(cpu=1, gpu=0),
+        }
+        trials = [Trial("__fake", **kwargs) for _ in range(4)]
+        for t in trials:
+            runner.add_trial(t)
+
+        for _ in range(4):
+            runner.step()
+        self.assertTrue(all(t.status == Trial.RUNNING for t in trials))
+
+        # Wait for all results, so that they are processed in one step
+        ray.wait(
+            list(runner.trial_executor._running.keys()), num_returns=4)
+        runner.step()
+        for t in trials:
+            self.assertEqual(t.last_result["training_iteration"], 1)
+
+        while not runner.is_finished():
+            runner.step()
+        for t in trials:
+            self.assertEqual(t.status, Trial.TERMINATED)
+            self.assertEqual(t.last_result["training_iteration"], 5)
+        self.assertFalse(runner.trial_executor._running)
+        self.assertFalse(runner.trial_executor._running_by_trial)
+
     def testMultiStepRun2(self):
         """Checks that runner.step throws when overstepping."""
         ray.init(num_cpus=1)
@@ -342,6 +342,48 @@ class TrialRunnerTest3(unittest.TestCase):
         self.assertRaises(TuneError, runner2.step)
         shutil.rmtree(tmpdir)
 
+    def testIncrementalCheckpoint(self):
+        ray.init(num_cpus=3)
+        tmpdir = tempfile.mkdtemp()
+
+        runner = TrialRunner(
+            local_checkpoint_dir=tmpdir,
+            checkpoint_period=0,
+            incremental_checkpoint=True)
+        trials = [
+            Trial(
+                "__fake",
+                trial_id="trial_terminate",
+                stopping_criterion={"training_iteration": 1},
+                checkpoint_freq=1),
+            Trial(
+                "__fake",
+                trial_id="trial_succ",
+                stopping_criterion={"training_iteration": 3},
+                checkpoint_freq=1),
+        ]
+        for t in trials:
+            runner.add_trial(t)
+        runner.step()  # start
+        runner.step()  # start
+        self.assertTrue(os.path.exists(runner.checkpoint_file))
+        journal_file = runner.checkpoint_file.replace(".json", ".journal")
+        runner.step()
+        runner.step()
+        self.assertEquals(trials[0].status, Trial.TERMINATED)
+        self.assertEquals(trials[1].status, Trial.RUNNING)
+        with open(journal_file) as f:
+            self.assertTrue(f.read())
+
+        runner2 = TrialRunner(resume="LOCAL", local_checkpoint_dir=tmpdir)
+        self.assertEqual(
+            runner2.get_trial("trial_terminate").status, Trial.TERMINATED)
+        restored_trial = runner2.get_trial("trial_succ")
+        self.assertEqual(restored_trial.status, Trial.PENDING)
+        self.assertEqual(restored_trial.last_result["training_iteration"],
+                         trials[1].last_result["training_iteration"])
+        shutil.rmtree(tmpdir)
+
     def testTrialNoSave(self):
         """Check that non-checkpointing trials are not saved."""
         ray.init(num_cpus=3)
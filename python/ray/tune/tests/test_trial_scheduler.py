@@ -6,6 +6,7 @@ import numpy as np
 import sys
 import tempfile
 import shutil
+import weakref
 from unittest.mock import MagicMock
 
 import ray
@@ -15,6 +16,7 @@ from ray.tune.schedulers import (HyperBandScheduler, AsyncHyperBandScheduler,
                                  TrialScheduler, HyperBandForBOHB)
 
 from ray.tune.schedulers.pbt import explore
+from ray.tune.checkpoint_manager import CheckpointManager
 from ray.tune.trial import Trial, Checkpoint
 from ray.tune.trial_executor import TrialExecutor
 from ray.tune.resources import Resources
@@ -696,6 +698,8 @@ class _MockTrial(Trial):
         self.restored_checkpoint = None
         self.resources = Resources(1, 0)
         self.custom_trial_name = None
+        self.checkpoint_manager = CheckpointManager(None, TRAINING_ITERATION,
+                                                    lambda checkpoint: None)
 
 
 class PopulationBasedTestingSuite(unittest.TestCase):
@@ -711,7 +715,8 @@ class PopulationBasedTestingSuite(unittest.TestCase):
                    explore=None,
                    perturbation_interval=10,
                    log_config=False,
-                   step_once=True):
+                   step_once=True,
+                   max_object_store_checkpoints=None):
         pbt = PopulationBasedTraining(
             time_attr="training_iteration",
             perturbation_interval=perturbation_interval,
@@ -723,7 +728,8 @@ class PopulationBasedTestingSuite(unittest.TestCase):
                 "int_factor": lambda: 10,
             },
             custom_explore_fn=explore,
-            log_config=log_config)
+            log_config=log_config,
+            max_object_store_checkpoints=max_object_store_checkpoints)
         runner = _MockTrialRunner(pbt)
         for i in range(5):
             trial = _MockTrial(
@@ -773,6 +779,60 @@ class PopulationBasedTestingSuite(unittest.TestCase):
         self.assertEqual(pbt._num_checkpoints, 2)
         self.assertEqual(pbt._num_perturbations, 0)
 
+    def testEvictsCheckpointsOfLowestTrials(self):
+        pbt, runner = self.basicSetup(max_object_store_checkpoints=1)
+        trials = runner.get_trials()
+        states = [pbt._trial_state[trial] for trial in trials]
+        self.assertEqual([s.last_checkpoint for s in states],
+                         [None, None, None, None, "trial_4"])
+
+        # trial 3 is now the best, so the checkpoint of trial 4 is evicted
+        self.assertEqual(
+            pbt.on_trial_result(runner, trials[3], result(20, 300)),
+            TrialScheduler.CONTINUE)
+        self.assertEqual([s.last_checkpoint for s in states],
+                         [None, None, None, "trial_3", None])
+        self.assertEqual(pbt._num_evictions, 1)
+
+        # exploit from the remaining checkpoint
+        self.assertEqual(
+            pbt.on_trial_result(runner, trials[0], result(20, -100)),
+            TrialScheduler.CONTINUE)
+        self.assertEqual(trials[0].restored_checkpoint, "trial_3")
+
+        # finished trials release their checkpoint
+        pbt.on_trial_complete(runner, trials[3], result(30, 300))
+        self.assertIsNone(states[3].last_checkpoint)
+
+    def testEvictionReleasesCheckpointReference(self):
+        pbt, runner = self.basicSetup(max_object_store_checkpoints=1)
+        trials = runner.get_trials()
+
+        class CheckpointValue:
+            pass
+
+        values = []
+
+        def save(trial, storage=Checkpoint.PERSISTENT, result=None):
+            value = CheckpointValue()
+            values.append(weakref.ref(value))
+            trial.checkpoint_manager.on_checkpoint(
+                Checkpoint(storage, value, result))
+            return value
+
+        runner.trial_executor.save = save
+        pbt.on_trial_result(runner, trials[3], result(20, 300))
+        self.assertIs(trials[3].checkpoint.value, values[0]())
+
+        # trial 2 is now the best, so the checkpoint of trial 3 is evicted,
+        # which also releases the trial's own reference to it
+        pbt.on_trial_result(runner, trials[2], result(20, 400))
+        self.assertEqual(pbt._num_evictions, 2)
+        self.assertIsNone(values[0]())
+        self.assertIsNone(trials[3].checkpoint.value)
+        self.assertEqual(trials[3].checkpoint_manager.best_checkpoints(), [])
+        self.assertIsNotNone(values[1]())
+
     def testPerturbsLowPerformingTrials(self):
         pbt, runner = self.basicSetup()
         trials = runner.get_trials()
@@ -333,6 +333,9 @@ class Trainable:
                                       "checkpoint_{}".format(self._iteration))
         TrainableUtil.make_checkpoint_dir(checkpoint_dir)
         checkpoint = self._save(checkpoint_dir)
+        return self._write_checkpoint(checkpoint_dir, checkpoint)
+
+    def _write_checkpoint(self, checkpoint_dir, checkpoint):
         saved_as_dict = False
         if isinstance(checkpoint, string_types):
             if not checkpoint.startswith(checkpoint_dir):
@@ -355,29 +358,52 @@ class Trainable:
                              "Expected str or dict.".format(type(checkpoint)))
 
         with open(checkpoint_path + ".tune_metadata", "wb") as f:
-            pickle.dump({
-                "experiment_id": self._experiment_id,
-                "iteration": self._iteration,
-                "timesteps_total": self._timesteps_total,
-                "time_total": self._time_total,
-                "episodes_total": self._episodes_total,
-                "saved_as_dict": saved_as_dict,
-                "ray_version": ray.__version__,
-            }, f)
+            pickle.dump(self._checkpoint_metadata(saved_as_dict), f)
         return checkpoint_path
 
+    def _checkpoint_metadata(self, saved_as_dict):
+        return {
+            "experiment_id": self._experiment_id,
+            "iteration": self._iteration,
+            "timesteps_total": self._timesteps_total,
+            "time_total": self._time_total,
+            "episodes_total": self._episodes_total,
+            "saved_as_dict": saved_as_dict,
+            "ray_version": ray.__version__,
+        }
+
     def save_to_object(self):
         """Saves the current model state to a Python object.
 
-        It also saves to disk but does not return the checkpoint path.
+        If ``_save`` returns a dict and writes no files, the dict is
+        serialized in memory. Otherwise, the checkpoint is saved to disk
+        but the checkpoint path is not returned.
 
         Returns:
             Object holding checkpoint data.
         """
         tmpdir = tempfile.mkdtemp("save_to_object", dir=self.logdir)
-        checkpoint_path = self.save(tmpdir)
-        # Save all files in subtree.
-        data_dict = TrainableUtil.pickle_checkpoint(checkpoint_path)
+        checkpoint_dir = os.path.join(tmpdir,
+                                      "checkpoint_{}".format(self._iteration))
+        TrainableUtil.make_checkpoint_dir(checkpoint_dir)
+        checkpoint = self._save(checkpoint_dir)
+        if isinstance(checkpoint, dict) and \
+                os.listdir(checkpoint_dir) == [".is_checkpoint"]:
+            # Same layout as pickle_checkpoint() of the files save() writes
+            data_dict = pickle.dumps({
+                "checkpoint_name": "checkpoint",
+                "data": {
+                    ".is_checkpoint": b"",
+                    "checkpoint": pickle.dumps(checkpoint),
+                    "checkpoint.tune_metadata": pickle.dumps(
+                        self._checkpoint_metadata(saved_as_dict=True)),
+                },
+            })
+        else:
+            checkpoint_path = self._write_checkpoint(checkpoint_dir,
+                                                     checkpoint)
+            # Save all files in subtree.
+            data_dict = TrainableUtil.pickle_checkpoint(checkpoint_path)
         out = io.BytesIO()
         if len(data_dict) > 10e6:  # getting pretty large
             logger.info("Checkpoint size is {} bytes".format(len(data_dict)))
@@ -395,25 +421,30 @@ class Trainable:
         """
         with open(checkpoint_path + ".tune_metadata", "rb") as f:
             metadata = pickle.load(f)
+        if metadata["saved_as_dict"]:
+            with open(checkpoint_path, "rb") as loaded_state:
+                checkpoint = pickle.load(loaded_state)
+            checkpoint.update(tune_checkpoint_path=checkpoint_path)
+        else:
+            checkpoint = checkpoint_path
+        self._restore_checkpoint(metadata, checkpoint)
+        logger.info("Restored on %s from checkpoint: %s", self.current_ip(),
+                    checkpoint_path)
+        self._log_restored_state()
+
+    def _restore_checkpoint(self, metadata, checkpoint):
         self._experiment_id = metadata["experiment_id"]
         self._iteration = metadata["iteration"]
         self._timesteps_total = metadata["timesteps_total"]
         self._time_total = metadata["time_total"]
         self._episodes_total = metadata["episodes_total"]
-        saved_as_dict = metadata["saved_as_dict"]
-        if saved_as_dict:
-            with open(checkpoint_path, "rb") as loaded_state:
-                checkpoint_dict = pickle.load(loaded_state)
-            checkpoint_dict.update(tune_checkpoint_path=checkpoint_path)
-            self._restore(checkpoint_dict)
-        else:
-            self._restore(checkpoint_path)
+        self._restore(checkpoint)
         self._time_since_restore = 0.0
         self._timesteps_since_restore = 0
         self._iterations_since_restore = 0
         self._restored = True
-        logger.info("Restored on %s from checkpoint: %s", self.current_ip(),
-                    checkpoint_path)
+
+    def _log_restored_state(self):
         state = {
             "_iteration": self._iteration,
             "_timesteps_total": self._timesteps_total,
@@ -429,6 +460,19 @@ class Trainable:
         """
         info = pickle.loads(obj)
         data = info["data"]
+        name = info["checkpoint_name"]
+        if set(data) == {".is_checkpoint", name, name + ".tune_metadata"}:
+            metadata = pickle.loads(data[name + ".tune_metadata"])
+            if metadata["saved_as_dict"]:
+                # Restore dict checkpoints without writing them to disk
+                checkpoint = pickle.loads(data[name])
+                checkpoint.update(tune_checkpoint_path=None)
+                self._restore_checkpoint(metadata, checkpoint)
+                logger.info("Restored on %s from checkpoint object",
+                            self.current_ip())
+                self._log_restored_state()
+                return
+
         tmpdir = tempfile.mkdtemp("restore_from_object", dir=self.logdir)
         checkpoint_path = os.path.join(tmpdir, info["checkpoint_name"])
 
@@ -138,7 +138,8 @@ class Trial:
                  trial_name_creator=None,
                  loggers=None,
                  sync_to_driver_fn=None,
-                 max_failures=0):
+                 max_failures=0,
+                 async_logging=False):
         """Initialize a new trial.
 
         The args here take the same meaning as the command line flags defined
@@ -172,6 +173,7 @@ class Trial:
         self.stopping_criterion = stopping_criterion or {}
         self.loggers = loggers
         self.sync_to_driver_fn = sync_to_driver_fn
+        self.async_logging = async_logging
         self.verbose = True
         self.max_failures = max_failures
 
@@ -270,7 +272,8 @@ class Trial:
                 self.logdir,
                 trial=self,
                 loggers=self.loggers,
-                sync_function=self.sync_to_driver_fn)
+                sync_function=self.sync_to_driver_fn,
+                async_logging=self.async_logging)
 
     def update_resources(self, cpu, gpu, **kwargs):
         """EXPERIMENTAL: Updates the resource requirements.
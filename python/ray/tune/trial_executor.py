@@ -23,6 +23,9 @@ class TrialExecutor:
         """
         self._queue_trials = queue_trials
         self._cached_trial_state = {}
+        # IDs of the trials whose metadata changed since the last call of
+        # get_updated_checkpoints()
+        self._updated_trial_ids = set()
 
     def set_status(self, trial, status):
         """Sets status and checkpoints metadata if needed.
@@ -57,6 +60,7 @@ class TrialExecutor:
         try:
             logger.debug("Trial %s: Saving trial metadata.", trial)
             self._cached_trial_state[trial.trial_id] = trial.__getstate__()
+            self._updated_trial_ids.add(trial.trial_id)
         except Exception:
             logger.exception("Trial %s: Error checkpointing trial metadata.",
                              trial)
@@ -65,6 +69,16 @@ class TrialExecutor:
         """Returns a copy of mapping of the trial ID to pickled metadata."""
         return self._cached_trial_state.copy()
 
+    def get_updated_checkpoints(self):
+        """Returns the metadata of the trials that changed since the last
+        call, as a mapping of the trial ID to pickled metadata."""
+        updated = {
+            trial_id: self._cached_trial_state[trial_id]
+            for trial_id in self._updated_trial_ids
+        }
+        self._updated_trial_ids = set()
+        return updated
+
     def has_resources(self, resources):
         """Returns whether this runner has at least the specified resources."""
         raise NotImplementedError("Subclasses of TrialExecutor must provide "
@@ -182,6 +196,19 @@ class TrialExecutor:
         """
         raise NotImplementedError
 
+    def get_next_available_trials(self):
+        """Blocking call that waits until at least one result is ready.
+
+        Returns:
+            List of Trial objects that are ready for intermediate processing.
+        """
+        return [self.get_next_available_trial()]
+
+    def has_ready_result(self, trial):
+        """Returns whether a trial returned by the last
+        get_next_available_trials() call still has its result ready."""
+        return True
+
     def get_next_failed_trial(self):
         """Non-blocking call that detects and returns one failed trial.
 
@@ -22,6 +22,9 @@ from ray.tune.web_server import TuneServer
 from ray.utils import binary_to_hex, hex_to_binary
 
 MAX_DEBUG_TRIALS = 20
+# Min number of trial states in the checkpoint journal before it is
+# compacted into a new snapshot
+JOURNAL_COMPACTION_MIN_TRIALS = 1000
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +69,83 @@ class _TuneFunctionDecoder(json.JSONDecoder):
         return cloudpickle.loads(hex_to_binary(obj["value"]))
 
 
+class _CheckpointJournal:
+    """Incremental experiment checkpoint.
+
+    The experiment state is stored as a snapshot, in the same format as
+    non-incremental checkpoints, and a journal next to it. Each checkpoint
+    appends a line with the metadata of the trials that changed since the
+    previous one. Once the journal holds more trial states than the
+    snapshot, it is compacted into a new snapshot, so that writing the
+    checkpoints takes amortized constant time per trial update.
+    """
+
+    def __init__(self, snapshot_file):
+        self.snapshot_file = snapshot_file
+        self.journal_file = _journal_file(snapshot_file)
+        # Sequence number of the last appended journal entry
+        self.seq = 0
+        self.num_snapshot_trials = None
+        self.num_journal_trials = 0
+
+    def needs_compaction(self, num_updated):
+        if self.num_snapshot_trials is None:
+            return True
+        return self.num_journal_trials + num_updated > max(
+            self.num_snapshot_trials, JOURNAL_COMPACTION_MIN_TRIALS)
+
+    def append(self, runner_state):
+        self.seq += 1
+        runner_state["seq"] = self.seq
+        with open(self.journal_file, "a") as f:
+            f.write(json.dumps(runner_state, cls=_TuneFunctionEncoder))
+            f.write("\n")
+        self.num_journal_trials += len(runner_state["checkpoints"])
+
+    def compact(self, runner_state, tmp_file_name):
+        runner_state["journal_seq"] = self.seq
+        with open(tmp_file_name, "w") as f:
+            json.dump(runner_state, f, indent=2, cls=_TuneFunctionEncoder)
+        os.rename(tmp_file_name, self.snapshot_file)
+        # Entries up to journal_seq are skipped on replay, so a crash before
+        # truncating the journal does not restore stale trial states.
+        open(self.journal_file, "w").close()
+        self.num_snapshot_trials = len(runner_state["checkpoints"])
+        self.num_journal_trials = 0
+
+    @staticmethod
+    def replay(snapshot_file, runner_state):
+        """Applies the journal of the snapshot to the loaded snapshot."""
+        journal_file = _journal_file(snapshot_file)
+        if not os.path.exists(journal_file):
+            return runner_state
+        checkpoints = {
+            cp["trial_id"]: cp
+            for cp in runner_state["checkpoints"]
+        }
+        with open(journal_file, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line, cls=_TuneFunctionDecoder)
+                except ValueError:
+                    # The last entry may have been partially written
+                    logger.warning("Ignoring corrupt entry of checkpoint "
+                                   "journal {}".format(journal_file))
+                    break
+                if entry["seq"] <= runner_state.get("journal_seq", 0):
+                    continue
+                for cp in entry["checkpoints"]:
+                    checkpoints[cp["trial_id"]] = cp
+                runner_state["runner_data"] = entry["runner_data"]
+                runner_state["stats"] = entry["stats"]
+        runner_state["checkpoints"] = list(checkpoints.values())
+        return runner_state
+
+
+def _journal_file(snapshot_file):
+    return os.path.splitext(snapshot_file)[0] + ".journal"
+
+
 class TrialRunner:
     """A TrialRunner implements the event loop for scheduling trials on Ray.
 
@@ -102,7 +182,9 @@ class TrialRunner:
                  server_port=TuneServer.DEFAULT_PORT,
                  verbose=True,
                  checkpoint_period=10,
-                 trial_executor=None):
+                 trial_executor=None,
+                 batch_results=False,
+                 incremental_checkpoint=False):
         """Initializes a new TrialRunner.
 
         Args:
@@ -121,6 +203,13 @@ class TrialRunner:
             verbose (bool): Flag for verbosity. If False, trial results
                 will not be output.
             trial_executor (TrialExecutor): Defaults to RayTrialExecutor.
+            batch_results (bool): Whether to process all results that are
+                ready in one step, instead of one result per step. This
+                reduces the per-step overhead, e.g., of experiment
+                checkpoints, when running many concurrent trials.
+            incremental_checkpoint (bool): Whether to append the changed
+                trials to a journal on each experiment checkpoint, instead
+                of rewriting the state of all trials.
         """
         self._search_alg = search_alg or BasicVariantGenerator()
         self._scheduler_alg = scheduler or FIFOScheduler()
@@ -133,6 +222,7 @@ class TrialRunner:
         self._total_time = 0
         self._iteration = 0
         self._verbose = verbose
+        self._batch_results = batch_results
 
         self._server = None
         self._server_port = server_port
@@ -173,6 +263,9 @@ class TrialRunner:
             self.checkpoint_file = os.path.join(
                 self._local_checkpoint_dir,
                 TrialRunner.CKPT_FILE_TMPL.format(self._session_str))
+        self._checkpoint_journal = None
+        if self.checkpoint_file and incremental_checkpoint:
+            self._checkpoint_journal = _CheckpointJournal(self.checkpoint_file)
 
     @property
     def scheduler_alg(self):
@@ -250,21 +343,36 @@ class TrialRunner:
                 not force):
             return
         self._last_checkpoint_time = now
-        runner_state = {
-            "checkpoints": list(
-                self.trial_executor.get_checkpoints().values()),
-            "runner_data": self.__getstate__(),
-            "stats": {
-                "start_time": self._start_time,
-                "timestamp": self._last_checkpoint_time
-            }
+        stats = {
+            "start_time": self._start_time,
+            "timestamp": self._last_checkpoint_time
         }
         tmp_file_name = os.path.join(self._local_checkpoint_dir,
                                      ".tmp_checkpoint")
-        with open(tmp_file_name, "w") as f:
-            json.dump(runner_state, f, indent=2, cls=_TuneFunctionEncoder)
+        journal = self._checkpoint_journal
+        if journal:
+            updated = self.trial_executor.get_updated_checkpoints()
+        if journal and not journal.needs_compaction(len(updated)):
+            journal.append({
+                "checkpoints": list(updated.values()),
+                "runner_data": self.__getstate__(),
+                "stats": stats
+            })
+        else:
+            runner_state = {
+                "checkpoints": list(
+                    self.trial_executor.get_checkpoints().values()),
+                "runner_data": self.__getstate__(),
+                "stats": stats
+            }
+            if journal:
+                journal.compact(runner_state, tmp_file_name)
+            else:
+                with open(tmp_file_name, "w") as f:
+                    json.dump(
+                        runner_state, f, indent=2, cls=_TuneFunctionEncoder)
+                os.rename(tmp_file_name, self.checkpoint_file)
 
-        os.rename(tmp_file_name, self.checkpoint_file)
         if force:
             self._syncer.sync_up()
         else:
@@ -282,6 +390,8 @@ class TrialRunner:
         with open(newest_ckpt_path, "r") as f:
             runner_state = json.load(f, cls=_TuneFunctionDecoder)
             self.checkpoint_file = newest_ckpt_path
+        runner_state = _CheckpointJournal.replay(newest_ckpt_path,
+                                                 runner_state)
 
         logger.warning("".join([
             "Attempting to resume experiment from {}. ".format(
@@ -410,13 +520,21 @@ class TrialRunner:
         else:
             # TODO(ujvl): Consider combining get_next_available_trial and
             #  fetch_result functionality so that we don't timeout on fetch.
-            trial = self.trial_executor.get_next_available_trial()  # blocking
-            if trial.is_restoring:
-                with warn_if_slow("process_trial_restore"):
-                    self._process_trial_restore(trial)
+            if self._batch_results:
+                trials = self.trial_executor.get_next_available_trials()
             else:
-                with warn_if_slow("process_trial"):
-                    self._process_trial(trial)
+                trials = [self.trial_executor.get_next_available_trial()]
+            for i, trial in enumerate(trials):
+                # Processing a result may stop or pause other trials of the
+                # batch, e.g., through the scheduler
+                if i > 0 and not self.trial_executor.has_ready_result(trial):
+                    continue
+                if trial.is_restoring:
+                    with warn_if_slow("process_trial_restore"):
+                        self._process_trial_restore(trial)
+                else:
+                    with warn_if_slow("process_trial"):
+                        self._process_trial(trial)
 
     def _process_trial(self, trial):
         """Processes a trial result."""
@@ -663,6 +781,7 @@ class TrialRunner:
                 "_scheduler_alg",
                 "trial_executor",
                 "_syncer",
+                "_checkpoint_journal",
         ]:
             del state[k]
         state["launch_web_server"] = bool(self._server)
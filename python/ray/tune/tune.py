@@ -3,6 +3,7 @@ import time
 import six
 
 from ray.tune.error import TuneError
+from ray.tune.logger import wait_for_async_logging
 from ray.tune.experiment import convert_to_experiment_list, Experiment
 from ray.tune.analysis import ExperimentAnalysis
 from ray.tune.suggest import BasicVariantGenerator
@@ -84,7 +85,10 @@ def run(run_or_experiment,
         raise_on_failed_trial=True,
         return_trials=False,
         ray_auto_init=True,
-        sync_function=None):
+        sync_function=None,
+        batch_results=False,
+        incremental_checkpoint=False,
+        async_logging=False):
     """Executes training.
 
     Args:
@@ -191,6 +195,14 @@ def run(run_or_experiment,
             if Ray is not initialized. Defaults to True.
         sync_function: Deprecated. See `sync_to_cloud` and
             `sync_to_driver`.
+        batch_results (bool): Whether the event loop processes all results
+            that are ready at once, instead of one result at a time. This
+            speeds up experiments with many concurrent trials.
+        incremental_checkpoint (bool): Whether experiment checkpoints only
+            append the changed trials to a journal, which is periodically
+            compacted, instead of rewriting the state of all trials.
+        async_logging (bool): Whether to write trial results on a background
+            thread, which batches the writes to each trial's files.
 
     Returns:
         List of Trial objects.
@@ -247,7 +259,8 @@ def run(run_or_experiment,
                 export_formats=export_formats,
                 max_failures=max_failures,
                 restore=restore,
-                sync_function=sync_function)
+                sync_function=sync_function,
+                async_logging=async_logging)
     else:
         logger.debug("Ignoring some parameters passed into tune.run.")
 
@@ -267,7 +280,9 @@ def run(run_or_experiment,
         launch_web_server=with_server,
         server_port=server_port,
         verbose=bool(verbose > 1),
-        trial_executor=trial_executor)
+        trial_executor=trial_executor,
+        batch_results=batch_results,
+        incremental_checkpoint=incremental_checkpoint)
 
     for exp in experiments:
         runner.add_experiment(exp)
@@ -303,6 +318,9 @@ def run(run_or_experiment,
                 reporter.report(runner)
             last_debug = time.time()
 
+    # The final checkpoint syncs the experiment directory, so the results
+    # that are still queued for async logging must be written before it
+    wait_for_async_logging()
     try:
         runner.checkpoint(force=True)
     except Exception:
@@ -224,6 +224,22 @@ COMMON_CONFIG = {
     # but optimal value could be obtained by measuring your environment
     # step / reset and model inference perf.
     "remote_env_batch_wait_ms": 0,
+    # If using num_envs_per_worker > 1, whether to step those envs
+    # concurrently in subprocesses of the worker, with Box observations
+    # returned through shared memory. This lets CPU-heavy envs use multiple
+    # cores from a single worker, with less overhead than remote_worker_envs.
+    # Only single-agent gym envs are supported.
+    "subproc_worker_envs": False,
+    # If using num_envs_per_worker > 1, whether to split the envs into two
+    # groups, and step one group in a background thread while computing
+    # actions for the other. This overlaps env stepping with policy
+    # inference, which helps most if the envs release the GIL while stepping,
+    # e.g., with subproc_worker_envs.
+    "pipeline_worker_envs": False,
+    # Whether to collect samples in preallocated NumPy column buffers, sized
+    # for one sample batch and grown as needed, instead of in Python lists.
+    # This reduces the per-step overhead of sampling for cheap envs.
+    "preallocate_sample_buffers": False,
     # Minimum time per iteration
     "min_iter_time_s": 0,
     # Minimum env steps to optimize for per train call. This value does
@@ -267,7 +283,9 @@ COMMON_CONFIG = {
     # === Offline Datasets ===
     # Specify how to generate experiences:
     #  - "sampler": generate experiences via online simulation (default)
-    #  - a local directory or file glob expression (e.g., "/tmp/*.json")
+    #  - a local directory or file glob expression (e.g., "/tmp/*.json").
+    #    Files in the binary columnar format ("*.batches") are memory-mapped
+    #    instead of parsed.
     #  - a list of individual file paths/URIs (e.g., ["/tmp/1.json",
     #    "s3://bucket/2.json"])
     #  - a dict with string keys and sampling probabilities as values (e.g.,
@@ -290,13 +308,26 @@ COMMON_CONFIG = {
     # of this number of batches. Use this if the input data is not in random
     # enough order. Input is delayed until the shuffle buffer is filled.
     "shuffle_buffer_size": 0,
+    # If positive, offline input files are read and decoded ahead by this many
+    # background threads, each reading from its own file.
+    "input_prefetch_threads": 0,
+    # If positive, the rows of offline input batches are shuffled via a
+    # streaming buffer of this many rows, and read in batches of
+    # `sample_batch_size` rows.
+    "input_shuffle_buffer_rows": 0,
     # Specify where experiences should be saved:
     #  - None: don't save any experiences
     #  - "logdir" to save to the agent log dir
     #  - a path/URI to save to a custom output directory (e.g., "s3://bucket/")
     #  - a function that returns a rllib.offline.OutputWriter
     "output": None,
-    # What sample batch columns to LZ4 compress in the output data.
+    # The format to save experiences in:
+    #  - "json": LZ4 compressed JSON batches, which can be saved to URIs
+    #  - "columnar": uncompressed binary columns, which are read without
+    #    parsing. Only local paths are supported.
+    "output_format": "json",
+    # What sample batch columns to LZ4 compress in the output data (only for
+    # the "json" format).
     "output_compress_columns": ["obs", "new_obs"],
     # Max output file size before rolling over to a new file.
     "output_max_file_size": 64 * 1024 * 1024,
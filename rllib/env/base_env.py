@@ -1,3 +1,7 @@
+import six.moves.queue as queue
+import threading
+import time
+
 from ray.rllib.env.external_env import ExternalEnv
 from ray.rllib.env.external_multi_agent_env import ExternalMultiAgentEnv
 from ray.rllib.env.vector_env import VectorEnv
@@ -77,14 +81,41 @@ class BaseEnv:
                     make_env=None,
                     num_envs=1,
                     remote_envs=False,
-                    remote_env_batch_wait_ms=0):
+                    remote_env_batch_wait_ms=0,
+                    subproc_envs=False,
+                    pipeline_envs=False):
         """Wraps any env type as needed to expose the async interface."""
 
         from ray.rllib.env.remote_vector_env import RemoteVectorEnv
+        from ray.rllib.env.subproc_vector_env import SubprocVectorEnv
         if remote_envs and num_envs == 1:
             raise ValueError(
                 "Remote envs only make sense to use if num_envs > 1 "
                 "(i.e. vectorization is enabled).")
+        if subproc_envs and remote_envs:
+            raise ValueError(
+                "Only one of remote envs and subprocess envs can be used.")
+        if pipeline_envs and remote_envs:
+            raise ValueError(
+                "Remote envs are already stepped asynchronously, and can't "
+                "be pipelined.")
+
+        if pipeline_envs and num_envs > 1 and not isinstance(
+                env, (BaseEnv, VectorEnv, ExternalEnv)):
+            # Split the envs into two groups, so that one group steps while
+            # actions are computed for the other
+            num_first = (num_envs + 1) // 2
+            first = BaseEnv.to_base_env(
+                env, make_env, num_first, subproc_envs=subproc_envs)
+            # Subprocess envs are all created by make_env in the
+            # subprocesses, so the second group only needs the spaces of
+            # the caller's env
+            second = BaseEnv.to_base_env(
+                env if subproc_envs else make_env(num_first),
+                lambda i: make_env(num_first + i),
+                num_envs - num_first,
+                subproc_envs=subproc_envs)
+            return _PipelinedBaseEnv([first, second])
 
         if not isinstance(env, BaseEnv):
             if isinstance(env, MultiAgentEnv):
@@ -94,6 +125,10 @@ class BaseEnv:
                         num_envs,
                         multiagent=True,
                         remote_env_batch_wait_ms=remote_env_batch_wait_ms)
+                elif subproc_envs and num_envs > 1:
+                    raise ValueError(
+                        "Subprocess envs are not supported for "
+                        "MultiAgentEnv, use remote envs instead.")
                 else:
                     env = _MultiAgentEnvToBaseEnv(
                         make_env=make_env,
@@ -119,6 +154,13 @@ class BaseEnv:
                         num_envs,
                         multiagent=False,
                         remote_env_batch_wait_ms=remote_env_batch_wait_ms)
+                elif subproc_envs:
+                    env = SubprocVectorEnv(
+                        make_env,
+                        num_envs,
+                        action_space=env.action_space,
+                        observation_space=env.observation_space)
+                    env = _VectorEnvToBaseEnv(env)
                 else:
                     env = VectorEnv.wrap(
                         make_env=make_env,
@@ -226,6 +268,8 @@ class _ExternalEnvToBaseEnv(BaseEnv):
                 results = self._poll()
                 if not self.external_env.isAlive():
                     raise Exception("Serving thread has stopped.")
+            if self.external_env._batch_wait_s > 0:
+                self._wait_for_more_results(results)
         limit = self.external_env._max_concurrent_episodes
         assert len(results[0]) < limit, \
             ("Too many concurrent episodes, were some leaked? This "
@@ -242,6 +286,19 @@ class _ExternalEnvToBaseEnv(BaseEnv):
                 self.external_env._episodes[env_id].action_queue.put(
                     action[_DUMMY_AGENT_ID])
 
+    def _wait_for_more_results(self, results):
+        """Adds the results of other episodes that arrive within the batch
+        wait window, so that their actions are computed in the same pass."""
+        deadline = time.time() + self.external_env._batch_wait_s
+        while any(eid not in results[0]
+                  for eid in self.external_env._episodes):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            self.external_env._results_avail_condition.wait(remaining)
+            for merged, more in zip(results, self._poll()):
+                merged.update(more)
+
     def _poll(self):
         all_obs, all_rewards, all_dones, all_infos = {}, {}, {}, {}
         off_policy_actions = {}
@@ -408,6 +465,79 @@ class _MultiAgentEnvToBaseEnv(BaseEnv):
         return [state.env for state in self.env_states]
 
 
+class _PipelinedBaseEnv(BaseEnv):
+    """Internal wrapper that overlaps env stepping with policy evaluation.
+
+    The envs are split into two groups. Each poll() returns the observations
+    of one group, alternating between the groups, and send_actions() steps
+    that group in a background thread. This way, the actions of one group
+    are computed while the other group steps.
+    """
+
+    def __init__(self, groups):
+        assert len(groups) == 2, groups
+        self.groups = groups
+        self.offsets = [0, groups[0].num_envs]
+        self.num_envs = groups[0].num_envs + groups[1].num_envs
+        self.cur_group = 0
+        self.pending = [False, False]
+        # Set by the sampler to record the time stepping in the background
+        self.perf_stats = None
+        self.requests = queue.Queue()
+        self.results = [queue.Queue(), queue.Queue()]
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    @override(BaseEnv)
+    def poll(self):
+        group = self.cur_group
+        if self.pending[group]:
+            self.pending[group] = False
+            error = self.results[group].get()
+            # Propagate errors
+            if error is not None:
+                raise error
+        offset = self.offsets[group]
+        return tuple({env_id + offset: values
+                      for env_id, values in returns.items()}
+                     for returns in self.groups[group].poll())
+
+    @override(BaseEnv)
+    def send_actions(self, action_dict):
+        group = self.cur_group
+        offset = self.offsets[group]
+        self.requests.put((group, {
+            env_id - offset: actions
+            for env_id, actions in action_dict.items()
+        }))
+        self.pending[group] = True
+        self.cur_group = 1 - group
+
+    @override(BaseEnv)
+    def try_reset(self, env_id):
+        group = 0 if env_id < self.offsets[1] else 1
+        return self.groups[group].try_reset(env_id - self.offsets[group])
+
+    @override(BaseEnv)
+    def get_unwrapped(self):
+        return (self.groups[0].get_unwrapped() +
+                self.groups[1].get_unwrapped())
+
+    def _run(self):
+        while True:
+            group, action_dict = self.requests.get()
+            t0 = time.time()
+            try:
+                self.groups[group].send_actions(action_dict)
+                error = None
+            except BaseException as e:
+                error = e
+            if self.perf_stats is not None:
+                self.perf_stats.background_env_time += time.time() - t0
+            self.results[group].put(error)
+
+
 class _MultiAgentEnvState:
     def __init__(self, env):
         assert isinstance(env, MultiAgentEnv)
@@ -36,7 +36,11 @@ class ExternalEnv(threading.Thread):
     """
 
     @PublicAPI
-    def __init__(self, action_space, observation_space, max_concurrent=100):
+    def __init__(self,
+                 action_space,
+                 observation_space,
+                 max_concurrent=100,
+                 batch_wait_ms=0):
         """Initialize an external env.
 
         ExternalEnv subclasses must call this during their __init__.
@@ -46,6 +50,9 @@ class ExternalEnv(threading.Thread):
             observation_space (gym.Space): Observation space of the env.
             max_concurrent (int): Max number of active episodes to allow at
                 once. Exceeding this limit raises an error.
+            batch_wait_ms (float): Once an episode requests an action, wait up
+                to this long for the other active episodes, so that their
+                actions are computed in a single batched forward pass.
         """
 
         threading.Thread.__init__(self)
@@ -56,6 +63,7 @@ class ExternalEnv(threading.Thread):
         self._finished = set()
         self._results_avail_condition = threading.Condition()
         self._max_concurrent_episodes = max_concurrent
+        self._batch_wait_s = batch_wait_ms / 1000
 
     @PublicAPI
     def run(self):
@@ -9,7 +9,11 @@ class ExternalMultiAgentEnv(ExternalEnv):
     """This is the multi-agent version of ExternalEnv."""
 
     @PublicAPI
-    def __init__(self, action_space, observation_space, max_concurrent=100):
+    def __init__(self,
+                 action_space,
+                 observation_space,
+                 max_concurrent=100,
+                 batch_wait_ms=0):
         """Initialize a multi-agent external env.
 
         ExternalMultiAgentEnv subclasses must call this during their __init__.
@@ -19,9 +23,12 @@ class ExternalMultiAgentEnv(ExternalEnv):
             observation_space (gym.Space): Observation space of the env.
             max_concurrent (int): Max number of active episodes to allow at
                 once. Exceeding this limit raises an error.
+            batch_wait_ms (float): Once an episode requests an action, wait up
+                to this long for the other active episodes, so that their
+                actions are computed in a single batched forward pass.
         """
         ExternalEnv.__init__(self, action_space, observation_space,
-                             max_concurrent)
+                             max_concurrent, batch_wait_ms)
 
         # we require to know all agents' spaces
         if isinstance(self.action_space, dict) or isinstance(
@@ -0,0 +1,176 @@
+import logging
+import multiprocessing
+import numpy as np
+import traceback
+
+import gym
+
+from ray import cloudpickle as pickle
+from ray.rllib.env.vector_env import VectorEnv
+from ray.rllib.utils.annotations import override, PublicAPI
+
+logger = logging.getLogger(__name__)
+
+
+@PublicAPI
+class SubprocVectorEnv(VectorEnv):
+    """Vector env that steps its sub-envs concurrently in subprocesses.
+
+    Each sub-env runs in its own process, so that CPU-heavy envs use
+    multiple cores from a single rollout worker. Actions are sent to all
+    processes before any result is waited for. For Box observation spaces,
+    the observations are written into a shared memory buffer instead of being
+    pickled through the pipes.
+
+    Processes are started with the "spawn" method, since rollout workers are
+    multi-threaded, so `make_env` is serialized with cloudpickle.
+
+    Arguments:
+        make_env (func): Factory that produces a new gym env, given the
+            vector index of the env.
+        num_envs (int): Number of sub-envs to run.
+        action_space (gym.Space): Action space of the envs.
+        observation_space (gym.Space): Observation space of the envs.
+    """
+
+    def __init__(self, make_env, num_envs, action_space, observation_space):
+        self.num_envs = num_envs
+        self.action_space = action_space
+        self.observation_space = observation_space
+
+        ctx = multiprocessing.get_context("spawn")
+        if isinstance(observation_space, gym.spaces.Box):
+            dtype = np.dtype(observation_space.dtype)
+            shape = (num_envs, ) + observation_space.shape
+            buf = ctx.RawArray("b", int(np.prod(shape)) * dtype.itemsize)
+            self.obs_buffer = np.frombuffer(buf, dtype=dtype).reshape(shape)
+        else:
+            buf = None
+            self.obs_buffer = None
+
+        make_env = pickle.dumps(make_env)
+        self.conns = []
+        self.processes = []
+        for i in range(num_envs):
+            conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(child_conn, make_env, i, buf,
+                      None if buf is None else self.obs_buffer.dtype.str,
+                      None if buf is None else self.obs_buffer.shape))
+            process.daemon = True
+            process.start()
+            child_conn.close()
+            self.conns.append(conn)
+            self.processes.append(process)
+        logger.info("Started {} env processes".format(num_envs))
+
+    @override(VectorEnv)
+    def vector_reset(self):
+        for conn in self.conns:
+            conn.send(("reset", None))
+        obs = [_get_result(conn) for conn in self.conns]
+        return self._get_obs(obs)
+
+    @override(VectorEnv)
+    def reset_at(self, index):
+        self.conns[index].send(("reset", None))
+        obs = _get_result(self.conns[index])
+        if self.obs_buffer is not None:
+            return self.obs_buffer[index].copy()
+        return obs
+
+    @override(VectorEnv)
+    def vector_step(self, actions):
+        for conn, action in zip(self.conns, actions):
+            conn.send(("step", action))
+        results = [_get_result(conn) for conn in self.conns]
+        obs_batch, rew_batch, done_batch, info_batch = zip(*results)
+        return (self._get_obs(obs_batch), list(rew_batch), list(done_batch),
+                list(info_batch))
+
+    @override(VectorEnv)
+    def get_unwrapped(self):
+        # The envs live in the subprocesses
+        return []
+
+    def close(self):
+        """Stops the env processes."""
+        for conn in self.conns:
+            try:
+                conn.send(("close", None))
+            except (OSError, EOFError):
+                pass  # already exited
+        for process in self.processes:
+            process.join()
+
+    def _get_obs(self, obs):
+        if self.obs_buffer is not None:
+            # Copy out of the shared buffer, since the sampler keeps the
+            # observations after the next step
+            return list(self.obs_buffer.copy())
+        return list(obs)
+
+
+def _get_result(conn):
+    result, error = conn.recv()
+    if error is not None:
+        raise error
+    return result
+
+
+def _worker(conn, make_env, index, buf, dtype, shape):
+    obs_buffer = None
+    if buf is not None:
+        obs_buffer = np.frombuffer(buf, dtype=np.dtype(dtype)).reshape(shape)
+
+    def put_obs(obs):
+        if obs_buffer is None:
+            return obs
+        obs_buffer[index] = obs
+        return None
+
+    try:
+        env = pickle.loads(make_env)(index)
+    except Exception as e:
+        conn.recv()
+        conn.send((None, _as_picklable(e)))
+        return
+
+    while True:
+        try:
+            command, data = conn.recv()
+        except EOFError:
+            command = "close"  # the vector env was garbage collected
+        if command == "close":
+            if hasattr(env, "close"):
+                env.close()
+            return
+        try:
+            if command == "reset":
+                result = put_obs(env.reset())
+            elif command == "step":
+                obs, r, done, info = env.step(data)
+                if not np.isscalar(r) or not np.isreal(r) or \
+                        not np.isfinite(r):
+                    raise ValueError(
+                        "Reward should be finite scalar, got {} ({})".format(
+                            r, type(r)))
+                if type(info) is not dict:
+                    raise ValueError(
+                        "Info should be a dict, got {} ({})".format(
+                            info, type(info)))
+                result = (put_obs(obs), r, done, info)
+            else:
+                raise ValueError("Unknown command {}".format(command))
+            conn.send((result, None))
+        except Exception as e:
+            conn.send((None, _as_picklable(e)))
+
+
+def _as_picklable(e):
+    try:
+        pickle.loads(pickle.dumps(e))
+        return e
+    except Exception:
+        return RuntimeError(traceback.format_exc())
@@ -138,6 +138,9 @@ class RolloutWorker(EvaluatorInterface):
                  output_creator=lambda ioctx: NoopOutput(),
                  remote_worker_envs=False,
                  remote_env_batch_wait_ms=0,
+                 subproc_worker_envs=False,
+                 pipeline_worker_envs=False,
+                 preallocate_sample_buffers=False,
                  soft_horizon=False,
                  no_done_at_end=False,
                  seed=None,
@@ -224,6 +227,14 @@ class RolloutWorker(EvaluatorInterface):
                 least one env is ready) is a reasonable default, but optimal
                 value could be obtained by measuring your environment
                 step / reset and model inference perf.
+            subproc_worker_envs (bool): If using num_envs > 1, whether to step
+                those envs concurrently in subprocesses of the current worker,
+                with observations passed through shared memory.
+            pipeline_worker_envs (bool): If using num_envs > 1, whether to
+                split the envs into two groups, and step one group in the
+                background while computing actions for the other.
+            preallocate_sample_buffers (bool): Whether to collect samples in
+                preallocated NumPy column buffers instead of lists.
             soft_horizon (bool): Calculate rewards but don't reset the
                 environment when the horizon is hit.
             no_done_at_end (bool): Ignore the done=True at the end of the
@@ -381,7 +392,9 @@ class RolloutWorker(EvaluatorInterface):
             make_env=make_env,
             num_envs=num_envs,
             remote_envs=remote_worker_envs,
-            remote_env_batch_wait_ms=remote_env_batch_wait_ms)
+            remote_env_batch_wait_ms=remote_env_batch_wait_ms,
+            subproc_envs=subproc_worker_envs,
+            pipeline_envs=pipeline_worker_envs)
         self.num_envs = num_envs
 
         if self.batch_mode == "truncate_episodes":
@@ -429,7 +442,8 @@ class RolloutWorker(EvaluatorInterface):
                 clip_actions=clip_actions,
                 blackhole_outputs="simulation" in input_evaluation,
                 soft_horizon=soft_horizon,
-                no_done_at_end=no_done_at_end)
+                no_done_at_end=no_done_at_end,
+                preallocate=preallocate_sample_buffers)
             self.sampler.start()
         else:
             self.sampler = SyncSampler(
@@ -446,7 +460,8 @@ class RolloutWorker(EvaluatorInterface):
                 tf_sess=self.tf_sess,
                 clip_actions=clip_actions,
                 soft_horizon=soft_horizon,
-                no_done_at_end=no_done_at_end)
+                no_done_at_end=no_done_at_end,
+                preallocate=preallocate_sample_buffers)
 
         self.input_reader = input_creator(self.io_context)
         assert isinstance(self.input_reader, InputReader), self.input_reader
@@ -1,6 +1,7 @@
 import collections
 import logging
 import numpy as np
+import six
 
 from ray.rllib.policy.sample_batch import SampleBatch, MultiAgentBatch
 from ray.rllib.utils.annotations import PublicAPI, DeveloperAPI
@@ -16,17 +17,49 @@ def to_float_array(v):
     return arr
 
 
+def _column_type(v):
+    """Returns the (dtype, shape) of a typed column for the value, if any."""
+    if isinstance(v, (np.ndarray, np.generic)):
+        dtype, shape = v.dtype, v.shape
+    elif isinstance(v, bool):
+        dtype, shape = np.dtype(np.bool_), ()
+    elif isinstance(v, six.integer_types):
+        dtype, shape = np.dtype(np.int64), ()
+    elif isinstance(v, float):
+        dtype, shape = np.dtype(np.float32), ()
+    else:
+        return None, None
+    if dtype.kind not in "biuf":
+        return None, None
+    if dtype == np.float64:
+        dtype = np.dtype(np.float32)  # save some memory, as to_float_array
+    return dtype, shape
+
+
 @PublicAPI
 class SampleBatchBuilder:
     """Util to build a SampleBatch incrementally.
 
     For efficiency, SampleBatches hold values in column form (as arrays).
     However, it is useful to add data one row (dict) at a time.
+
+    If a capacity is given, numeric values are written into preallocated
+    NumPy column buffers, which grow geometrically as needed, and the built
+    batch holds slices of these buffers. Other values (e.g., infos) are
+    appended to lists as usual.
     """
 
     @PublicAPI
-    def __init__(self):
+    def __init__(self, capacity=None):
+        """Initialize a SampleBatchBuilder.
+
+        Arguments:
+            capacity (int): If set, the number of rows to preallocate column
+                buffers for.
+        """
         self.buffers = collections.defaultdict(list)
+        self.columns = {}  # typed column buffers, if preallocating
+        self.capacity = None if capacity is None else max(1, int(capacity))
         self.count = 0
         self.unroll_id = 0  # disambiguates unrolls within a single episode
 
@@ -34,8 +67,13 @@ class SampleBatchBuilder:
     def add_values(self, **values):
         """Add the given dictionary (row) of values to this batch."""
 
-        for k, v in values.items():
-            self.buffers[k].append(v)
+        if self.capacity is None:
+            for k, v in values.items():
+                self.buffers[k].append(v)
+        else:
+            for k, v in values.items():
+                if k in self.buffers or not self._write(k, v, single=True):
+                    self.buffers[k].append(v)
         self.count += 1
 
     @PublicAPI
@@ -43,23 +81,78 @@ class SampleBatchBuilder:
         """Add the given batch of values to this batch."""
 
         for k, column in batch.items():
-            self.buffers[k].extend(column)
+            if self.capacity is None or k in self.buffers or \
+                    not self._write(k, column, single=False):
+                self.buffers[k].extend(column)
         self.count += batch.count
 
     @PublicAPI
     def build_and_reset(self):
         """Returns a sample batch including all previously added values."""
 
-        batch = SampleBatch(
-            {k: to_float_array(v)
-             for k, v in self.buffers.items()})
+        data = {k: to_float_array(v) for k, v in self.buffers.items()}
+        for k, column in self.columns.items():
+            # The buffers are handed out, so the next batch gets new ones
+            data[k] = column[:self.count]
+        batch = SampleBatch(data)
         batch.data[SampleBatch.UNROLL_ID] = np.repeat(self.unroll_id,
                                                       batch.count)
         self.buffers.clear()
+        self.columns = {}
         self.count = 0
         self.unroll_id += 1
         return batch
 
+    def last_value(self, key):
+        """Returns the last value added for the given key."""
+
+        if key in self.columns:
+            return self.columns[key][self.count - 1]
+        return self.buffers[key][-1]
+
+    def _write(self, k, v, single):
+        """Writes a row (or rows) at the end of a typed column.
+
+        Returns False if the values don't fit into a typed column, in which
+        case the column is converted to a list.
+        """
+        dtype, shape = _column_type(v)
+        if dtype is not None and not single:
+            shape = shape[1:]
+        column = self.columns.get(k)
+        if column is None:
+            if dtype is None or self.count > 0:
+                return False
+            column = np.empty((self.capacity, ) + shape, dtype=dtype)
+            self.columns[k] = column
+        elif dtype is None or shape != column.shape[1:]:
+            # E.g., variable size values, fall back to a list
+            self.buffers[k] = list(self.columns.pop(k)[:self.count])
+            return False
+        elif dtype != column.dtype and not np.can_cast(
+                dtype, column.dtype, "safe"):
+            new_dtype = np.result_type(column.dtype, dtype)
+            if new_dtype == np.float64:
+                new_dtype = np.float32
+            if new_dtype != column.dtype:
+                column = column.astype(new_dtype)
+                self.columns[k] = column
+
+        end = self.count + (1 if single else len(v))
+        if end > len(column):
+            while self.capacity < end:
+                self.capacity *= 2
+            new_column = np.empty(
+                (self.capacity, ) + column.shape[1:], dtype=column.dtype)
+            new_column[:self.count] = column[:self.count]
+            column = new_column
+            self.columns[k] = column
+        if single:
+            column[self.count] = v
+        else:
+            column[self.count:end] = v
+        return True
+
 
 @DeveloperAPI
 class MultiAgentSampleBatchBuilder:
@@ -71,19 +164,26 @@ class MultiAgentSampleBatchBuilder:
     corresponding policy batch for the agent's policy.
     """
 
-    def __init__(self, policy_map, clip_rewards, postp_callback):
+    def __init__(self,
+                 policy_map,
+                 clip_rewards,
+                 postp_callback,
+                 capacity=None):
         """Initialize a MultiAgentSampleBatchBuilder.
 
         Arguments:
             policy_map (dict): Maps policy ids to policy instances.
             clip_rewards (bool): Whether to clip rewards before postprocessing.
             postp_callback: function to call on each postprocessed batch.
+            capacity (int): If set, the number of rows to preallocate column
+                buffers for in each builder (see SampleBatchBuilder).
         """
 
         self.policy_map = policy_map
         self.clip_rewards = clip_rewards
+        self.capacity = capacity
         self.policy_builders = {
-            k: SampleBatchBuilder()
+            k: SampleBatchBuilder(capacity)
             for k in policy_map.keys()
         }
         self.agent_builders = {}
@@ -112,7 +212,7 @@ class MultiAgentSampleBatchBuilder:
         """
 
         if agent_id not in self.agent_builders:
-            self.agent_builders[agent_id] = SampleBatchBuilder()
+            self.agent_builders[agent_id] = SampleBatchBuilder(self.capacity)
             self.agent_to_policy[agent_id] = policy_id
         builder = self.agent_builders[agent_id]
         builder.add_values(**values)
@@ -174,7 +274,7 @@ class MultiAgentSampleBatchBuilder:
 
     def check_missing_dones(self):
         for agent_id, builder in self.agent_builders.items():
-            if builder.buffers["dones"][-1] is not True:
+            if not builder.last_value("dones"):
                 raise ValueError(
                     "The environment terminated for all agents, but we still "
                     "don't have a last observation for "
@@ -11,7 +11,8 @@ from ray.rllib.evaluation.sample_batch_builder import \
     MultiAgentSampleBatchBuilder
 from ray.rllib.policy.policy import TupleActions
 from ray.rllib.policy.tf_policy import TFPolicy
-from ray.rllib.env.base_env import BaseEnv, ASYNC_RESET_RETURN
+from ray.rllib.env.base_env import BaseEnv, ASYNC_RESET_RETURN, \
+    _PipelinedBaseEnv
 from ray.rllib.env.atari_wrappers import get_wrapper_by_cls, MonitorEnv
 from ray.rllib.offline import InputReader
 from ray.rllib.utils.annotations import override
@@ -35,12 +36,17 @@ class PerfStats:
         self.env_wait_time = 0.0
         self.processing_time = 0.0
         self.inference_time = 0.0
+        # Time spent stepping envs in the background when pipelining, which
+        # overlaps with the other phases
+        self.background_env_time = 0.0
 
     def get(self):
         return {
             "mean_env_wait_ms": self.env_wait_time * 1000 / self.iters,
             "mean_processing_ms": self.processing_time * 1000 / self.iters,
-            "mean_inference_ms": self.inference_time * 1000 / self.iters
+            "mean_inference_ms": self.inference_time * 1000 / self.iters,
+            "mean_background_env_ms": (
+                self.background_env_time * 1000 / self.iters)
         }
 
 
@@ -72,7 +78,8 @@ class SyncSampler(SamplerInput):
                  tf_sess=None,
                  clip_actions=True,
                  soft_horizon=False,
-                 no_done_at_end=False):
+                 no_done_at_end=False,
+                 preallocate=False):
         self.base_env = BaseEnv.to_base_env(env)
         self.unroll_length = unroll_length
         self.horizon = horizon
@@ -87,7 +94,7 @@ class SyncSampler(SamplerInput):
             self.policy_mapping_fn, self.unroll_length, self.horizon,
             self.preprocessors, self.obs_filters, clip_rewards, clip_actions,
             pack, callbacks, tf_sess, self.perf_stats, soft_horizon,
-            no_done_at_end)
+            no_done_at_end, preallocate)
         self.metrics_queue = queue.Queue()
 
     def get_data(self):
@@ -134,7 +141,8 @@ class AsyncSampler(threading.Thread, SamplerInput):
                  clip_actions=True,
                  blackhole_outputs=False,
                  soft_horizon=False,
-                 no_done_at_end=False):
+                 no_done_at_end=False,
+                 preallocate=False):
         for _, f in obs_filters.items():
             assert getattr(f, "is_concurrent", False), \
                 "Observation Filter must support concurrent updates."
@@ -158,6 +166,7 @@ class AsyncSampler(threading.Thread, SamplerInput):
         self.blackhole_outputs = blackhole_outputs
         self.soft_horizon = soft_horizon
         self.no_done_at_end = no_done_at_end
+        self.preallocate = preallocate
         self.perf_stats = PerfStats()
         self.shutdown = False
 
@@ -181,7 +190,8 @@ class AsyncSampler(threading.Thread, SamplerInput):
             self.policy_mapping_fn, self.unroll_length, self.horizon,
             self.preprocessors, self.obs_filters, self.clip_rewards,
             self.clip_actions, self.pack, self.callbacks, self.tf_sess,
-            self.perf_stats, self.soft_horizon, self.no_done_at_end)
+            self.perf_stats, self.soft_horizon, self.no_done_at_end,
+            self.preallocate)
         while not self.shutdown:
             # The timeout variable exists because apparently, if one worker
             # dies, the other workers won't die with it, unless the timeout is
@@ -226,7 +236,7 @@ class AsyncSampler(threading.Thread, SamplerInput):
 def _env_runner(base_env, extra_batch_callback, policies, policy_mapping_fn,
                 unroll_length, horizon, preprocessors, obs_filters,
                 clip_rewards, clip_actions, pack, callbacks, tf_sess,
-                perf_stats, soft_horizon, no_done_at_end):
+                perf_stats, soft_horizon, no_done_at_end, preallocate=False):
     """This implements the common experience collection logic.
 
     Args:
@@ -255,6 +265,8 @@ def _env_runner(base_env, extra_batch_callback, policies, policy_mapping_fn,
             environment when the horizon is hit.
         no_done_at_end (bool): Ignore the done=True at the end of the episode
             and instead record done=False.
+        preallocate (bool): Whether to build batches in preallocated column
+            buffers (see SampleBatchBuilder).
 
     Yields:
         rollout (SampleBatch): Object containing state, action, reward,
@@ -269,16 +281,30 @@ def _env_runner(base_env, extra_batch_callback, policies, policy_mapping_fn,
     if not horizon:
         horizon = float("inf")
 
+    if isinstance(base_env, _PipelinedBaseEnv):
+        base_env.perf_stats = perf_stats
+
     # Pool of batch builders, which can be shared across episodes to pack
     # trajectory data.
     batch_builder_pool = []
 
+    # Size the column buffers for one unroll, or episode
+    if not preallocate:
+        capacity = None
+    elif unroll_length != float("inf"):
+        capacity = unroll_length
+    elif horizon != float("inf"):
+        capacity = horizon
+    else:
+        capacity = 100
+
     def get_batch_builder():
         if batch_builder_pool:
             return batch_builder_pool.pop()
         else:
             return MultiAgentSampleBatchBuilder(
-                policies, clip_rewards, callbacks.get("on_postprocess_traj"))
+                policies, clip_rewards, callbacks.get("on_postprocess_traj"),
+                capacity)
 
     def new_episode():
         episode = MultiAgentEpisode(policies, policy_mapping_fn,
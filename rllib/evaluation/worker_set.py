@@ -5,7 +5,8 @@ from ray.rllib.utils.annotations import DeveloperAPI
 from ray.rllib.evaluation.rollout_worker import RolloutWorker, \
     _validate_multiagent_config
 from ray.rllib.offline import NoopOutput, JsonReader, MixedInput, JsonWriter, \
-    ShuffledInput
+    ShuffledInput, ColumnarReader, ColumnarWriter, PrefetchingInput
+from ray.rllib.offline.columnar_reader import is_columnar_input
 from ray.rllib.utils import merge_dicts, try_import_tf
 from ray.rllib.utils.memory import ray_get_and_free
 
@@ -143,6 +144,21 @@ class WorkerSet:
             input_creator = (lambda ioctx: ShuffledInput(
                 MixedInput(config["input"], ioctx), config[
                     "shuffle_buffer_size"]))
+        elif (config["input_prefetch_threads"] > 0
+              or config["input_shuffle_buffer_rows"] > 0):
+            reader_cls = ColumnarReader if is_columnar_input(
+                config["input"]) else JsonReader
+            input_creator = (lambda ioctx: ShuffledInput(
+                PrefetchingInput(
+                    lambda: reader_cls(config["input"], ioctx),
+                    num_threads=max(1, config["input_prefetch_threads"]),
+                    shuffle_buffer_size=config["input_shuffle_buffer_rows"],
+                    batch_size=config["sample_batch_size"]), config[
+                        "shuffle_buffer_size"]))
+        elif is_columnar_input(config["input"]):
+            input_creator = (lambda ioctx: ShuffledInput(
+                ColumnarReader(config["input"], ioctx), config[
+                    "shuffle_buffer_size"]))
         else:
             input_creator = (lambda ioctx: ShuffledInput(
                 JsonReader(config["input"], ioctx), config[
@@ -152,6 +168,12 @@ class WorkerSet:
             output_creator = config["output"]
         elif config["output"] is None:
             output_creator = (lambda ioctx: NoopOutput())
+        elif config["output_format"] == "columnar":
+            output_creator = (lambda ioctx: ColumnarWriter(
+                ioctx.log_dir
+                if config["output"] == "logdir" else config["output"],
+                ioctx,
+                max_file_size=config["output_max_file_size"]))
         elif config["output"] == "logdir":
             output_creator = (lambda ioctx: JsonWriter(
                 ioctx.log_dir,
@@ -209,6 +231,9 @@ class WorkerSet:
             output_creator=output_creator,
             remote_worker_envs=config["remote_worker_envs"],
             remote_env_batch_wait_ms=config["remote_env_batch_wait_ms"],
+            subproc_worker_envs=config["subproc_worker_envs"],
+            pipeline_worker_envs=config["pipeline_worker_envs"],
+            preallocate_sample_buffers=config["preallocate_sample_buffers"],
             soft_horizon=config["soft_horizon"],
             no_done_at_end=config["no_done_at_end"],
             seed=(config["seed"] + worker_index)
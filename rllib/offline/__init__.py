@@ -1,18 +1,26 @@
 from ray.rllib.offline.io_context import IOContext
 from ray.rllib.offline.json_reader import JsonReader
 from ray.rllib.offline.json_writer import JsonWriter
+from ray.rllib.offline.columnar_reader import ColumnarReader
+from ray.rllib.offline.columnar_writer import ColumnarWriter, \
+    convert_json_dataset
 from ray.rllib.offline.output_writer import OutputWriter, NoopOutput
 from ray.rllib.offline.input_reader import InputReader
 from ray.rllib.offline.mixed_input import MixedInput
+from ray.rllib.offline.prefetching_input import PrefetchingInput
 from ray.rllib.offline.shuffled_input import ShuffledInput
 
 __all__ = [
     "IOContext",
     "JsonReader",
     "JsonWriter",
+    "ColumnarReader",
+    "ColumnarWriter",
+    "convert_json_dataset",
     "NoopOutput",
     "OutputWriter",
     "InputReader",
     "MixedInput",
+    "PrefetchingInput",
     "ShuffledInput",
 ]
@@ -0,0 +1,192 @@
+import glob
+import json
+import logging
+import numpy as np
+import os
+import pickle
+import random
+import six
+from six.moves.urllib.parse import urlparse
+
+from ray.rllib.offline.columnar_writer import RECORD_MAGIC, RECORD_PREFIX, \
+    FILE_SUFFIX, INDEX_SUFFIX, _align
+from ray.rllib.offline.input_reader import InputReader
+from ray.rllib.offline.io_context import IOContext
+from ray.rllib.policy.sample_batch import MultiAgentBatch, SampleBatch, \
+    DEFAULT_POLICY_ID
+from ray.rllib.utils.annotations import override, PublicAPI
+
+logger = logging.getLogger(__name__)
+
+
+@PublicAPI
+class ColumnarReader(InputReader):
+    """Reader object that loads experiences from binary columnar file chunks.
+
+    The input files will be read from in an random order. Files are
+    memory-mapped, and array columns of the returned batches are read-only
+    views of the mapped files, so that no data is copied or parsed."""
+
+    @PublicAPI
+    def __init__(self, inputs, ioctx=None):
+        """Initialize a ColumnarReader.
+
+        Arguments:
+            inputs (str|list): either a glob expression for files, e.g.,
+                "/tmp/**/*.batches", or a list of single local file paths.
+            ioctx (IOContext): current IO context object.
+        """
+
+        self.ioctx = ioctx or IOContext()
+        if isinstance(inputs, six.string_types):
+            inputs = os.path.abspath(os.path.expanduser(inputs))
+            if os.path.isdir(inputs):
+                inputs = os.path.join(inputs, "*" + FILE_SUFFIX)
+                logger.warning(
+                    "Treating input directory as glob pattern: {}".format(
+                        inputs))
+            self.files = glob.glob(inputs)
+        elif type(inputs) is list:
+            self.files = inputs
+        else:
+            raise ValueError(
+                "type of inputs must be list or str, not {}".format(inputs))
+        for path in self.files:
+            if urlparse(path).scheme:
+                raise ValueError(
+                    "ColumnarReader can only read local files, not {}".format(
+                        path))
+        if self.files:
+            logger.info("Found {} input files.".format(len(self.files)))
+        else:
+            raise ValueError("No files found matching {}".format(inputs))
+        self.cur_file = None
+        self.cur_data = None
+        self.cur_records = []
+        self.cur_record = 0
+
+    @override(InputReader)
+    def next(self):
+        tries = 0
+        while self.cur_record >= len(self.cur_records) and tries < 100:
+            tries += 1
+            self._open_file(random.choice(self.files))
+        if self.cur_record >= len(self.cur_records):
+            raise ValueError("Failed to read next batch from files: {}".format(
+                self.files))
+        offset, _ = self.cur_records[self.cur_record]
+        self.cur_record += 1
+        return self._postprocess_if_needed(
+            _read_record(self.cur_data, offset))
+
+    def _postprocess_if_needed(self, batch):
+        if not self.ioctx.config.get("postprocess_inputs"):
+            return batch
+
+        if isinstance(batch, SampleBatch):
+            out = []
+            for sub_batch in batch.split_by_episode():
+                out.append(self.ioctx.worker.policy_map[DEFAULT_POLICY_ID]
+                           .postprocess_trajectory(sub_batch))
+            return SampleBatch.concat_samples(out)
+        else:
+            raise NotImplementedError(
+                "Postprocessing of multi-agent data not implemented yet.")
+
+    def _open_file(self, path):
+        self.cur_file = path
+        self.cur_record = 0
+        if os.path.getsize(path) == 0:
+            logger.debug("Ignoring empty file {}".format(path))
+            self.cur_data = None
+            self.cur_records = []
+            return
+        # Batches returned from the previous file keep their mapping alive
+        self.cur_data = np.memmap(path, dtype=np.uint8, mode="r")
+        self.cur_records = read_index(path, self.cur_data)
+
+
+def is_columnar_input(inputs):
+    """Returns whether the input glob, directory or file list is columnar."""
+    if isinstance(inputs, six.string_types):
+        path = os.path.abspath(os.path.expanduser(inputs))
+        if os.path.isdir(path):
+            return bool(glob.glob(os.path.join(path, "*" + FILE_SUFFIX)))
+        return path.endswith(FILE_SUFFIX)
+    elif type(inputs) is list:
+        return bool(inputs) and all(
+            path.endswith(FILE_SUFFIX) for path in inputs)
+    return False
+
+
+@PublicAPI
+def read_index(path, data=None):
+    """Returns the (offset, row count) of each record in a columnar file.
+
+    The index written by ColumnarWriter is used if it exists. Otherwise, e.g.,
+    for files still being written, the record headers are scanned.
+
+    Arguments:
+        path (str): the path of the columnar file.
+        data (np.memmap): the file mapped as bytes, if already mapped.
+    """
+
+    if os.path.exists(path + INDEX_SUFFIX):
+        with open(path + INDEX_SUFFIX, "r") as f:
+            return [tuple(record) for record in json.load(f)["records"]]
+
+    if data is None:
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+    records = []
+    offset = 0
+    while offset + RECORD_PREFIX.size <= len(data):
+        header, data_offset = _read_header(data, offset)
+        end = data_offset + header["data_size"]
+        if end > len(data):
+            break  # the last record is still being written
+        records.append((offset, header["count"]))
+        offset = end
+    return records
+
+
+def _read_header(data, offset):
+    magic, header_size = RECORD_PREFIX.unpack_from(data, offset)
+    if magic != RECORD_MAGIC:
+        raise ValueError("Corrupt columnar record at offset {}".format(offset))
+    start = offset + RECORD_PREFIX.size
+    header = json.loads(data[start:start + header_size].tobytes().decode(
+        "utf-8"))
+    return header, offset + _align(RECORD_PREFIX.size + header_size)
+
+
+def _from_columns(data, specs, data_offset):
+    out = {}
+    for k, spec in specs.items():
+        start = data_offset + spec["offset"]
+        if spec.get("pickled"):
+            out[k] = pickle.loads(
+                data[start:start + spec["nbytes"]].tobytes())
+        else:
+            dtype = np.dtype(spec["dtype"])
+            out[k] = np.frombuffer(
+                data,
+                dtype=dtype,
+                count=spec["nbytes"] // dtype.itemsize,
+                offset=start).reshape(spec["shape"])
+    return SampleBatch(out)
+
+
+def _read_record(data, offset):
+    header, data_offset = _read_header(data, offset)
+    if header["type"] == "SampleBatch":
+        return _from_columns(data, header["columns"], data_offset)
+    elif header["type"] == "MultiAgentBatch":
+        policy_batches = {
+            policy_id: _from_columns(data, specs, data_offset)
+            for policy_id, specs in header["policy_batches"].items()
+        }
+        return MultiAgentBatch(policy_batches, header["count"])
+    else:
+        raise ValueError(
+            "Type field must be one of ['SampleBatch', 'MultiAgentBatch']",
+            header["type"])
@@ -0,0 +1,207 @@
+from datetime import datetime
+import glob
+import json
+import logging
+import numpy as np
+import os
+import pickle
+import six
+import struct
+from six.moves.urllib.parse import urlparse
+import time
+
+from ray.rllib.policy.sample_batch import MultiAgentBatch
+from ray.rllib.offline.io_context import IOContext
+from ray.rllib.offline.json_reader import _from_json
+from ray.rllib.offline.output_writer import OutputWriter
+from ray.rllib.utils.annotations import override, PublicAPI
+
+logger = logging.getLogger(__name__)
+
+# A columnar file is a sequence of records, one per written batch:
+#
+#   RECORD_MAGIC | header size (uint64) | JSON header | padding | columns
+#
+# The header describes the batch and the dtype, shape and offset of each
+# column. Column data is aligned to ALIGNMENT bytes, so that the columns can
+# be read as zero-copy views of a memory-mapped file.
+RECORD_MAGIC = b"RLLIBCOL"
+RECORD_PREFIX = struct.Struct("<8sQ")
+ALIGNMENT = 64
+FILE_SUFFIX = ".batches"
+# Written next to each file once it is complete, with the offset and row
+# count of each record.
+INDEX_SUFFIX = ".index"
+
+
+@PublicAPI
+class ColumnarWriter(OutputWriter):
+    """Writer object that saves experiences in binary columnar file chunks.
+
+    Unlike JsonWriter, the columns are written as raw arrays that
+    ColumnarReader memory-maps, so reading a batch requires no parsing or
+    decompression. Only local paths are supported."""
+
+    @PublicAPI
+    def __init__(self, path, ioctx=None, max_file_size=64 * 1024 * 1024):
+        """Initialize a ColumnarWriter.
+
+        Arguments:
+            path (str): a path of the local output directory to save files in.
+            ioctx (IOContext): current IO context object.
+            max_file_size (int): max size of single files before rolling over.
+        """
+
+        self.ioctx = ioctx or IOContext()
+        self.max_file_size = max_file_size
+        if urlparse(path).scheme:
+            raise ValueError(
+                "ColumnarWriter can only write to local paths, not {}".format(
+                    path))
+        path = os.path.abspath(os.path.expanduser(path))
+        try:
+            os.makedirs(path)
+        except OSError:
+            pass  # already exists
+        assert os.path.exists(path), "Failed to create {}".format(path)
+        self.path = path
+        self.file_index = 0
+        self.bytes_written = 0
+        self.cur_file = None
+        self.cur_index = []
+
+    @override(OutputWriter)
+    def write(self, sample_batch):
+        start = time.time()
+        header, columns = _to_record(sample_batch)
+        f = self._get_file()
+        offset = f.tell()
+        size = _write_record(f, header, columns)
+        f.flush()
+        self.cur_index.append([offset, sample_batch.count])
+        self.bytes_written += size
+        logger.debug("Wrote {} bytes to {} in {}s".format(
+            size, f.name,
+            time.time() - start))
+
+    @PublicAPI
+    def close(self):
+        """Closes the current file and writes its index."""
+        if self.cur_file:
+            self.cur_file.close()
+            _write_index(self.cur_file.name, self.cur_index)
+            self.cur_file = None
+            self.cur_index = []
+
+    def _get_file(self):
+        if not self.cur_file or self.bytes_written >= self.max_file_size:
+            self.close()
+            timestr = datetime.today().strftime("%Y-%m-%d_%H-%M-%S")
+            path = os.path.join(
+                self.path, "output-{}_worker-{}_{}{}".format(
+                    timestr, self.ioctx.worker_index, self.file_index,
+                    FILE_SUFFIX))
+            self.cur_file = open(path, "wb")
+            self.file_index += 1
+            self.bytes_written = 0
+            logger.info("Writing to new output file {}".format(path))
+        return self.cur_file
+
+
+@PublicAPI
+def convert_json_dataset(inputs,
+                         output_path,
+                         max_file_size=64 * 1024 * 1024):
+    """Converts experiences saved by JsonWriter to the columnar format.
+
+    Arguments:
+        inputs (str|list): either a glob expression or directory of JSON
+            files, or a list of local file paths.
+        output_path (str): the directory to write the columnar files to.
+        max_file_size (int): max size of single output files.
+
+    Returns:
+        The number of converted batches.
+    """
+
+    if isinstance(inputs, six.string_types):
+        inputs = os.path.abspath(os.path.expanduser(inputs))
+        if os.path.isdir(inputs):
+            inputs = os.path.join(inputs, "*.json")
+        inputs = sorted(glob.glob(inputs))
+    if not inputs:
+        raise ValueError("No JSON files to convert")
+
+    writer = ColumnarWriter(output_path, max_file_size=max_file_size)
+    num_batches = 0
+    for path in inputs:
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    writer.write(_from_json(line))
+                    num_batches += 1
+    writer.close()
+    logger.info("Converted {} batches from {} files".format(
+        num_batches, len(inputs)))
+    return num_batches
+
+
+def _align(n):
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _to_columns(data, columns):
+    specs = {}
+    for k, v in data.items():
+        if isinstance(v, np.ndarray) and not v.dtype.hasobject:
+            buf = np.ascontiguousarray(v).tobytes()
+            spec = {"dtype": v.dtype.str, "shape": list(v.shape)}
+        else:
+            # Lists of dicts (e.g., infos) and object arrays can't be mapped
+            buf = pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL)
+            spec = {"pickled": True}
+        spec["offset"] = sum(_align(len(c)) for c in columns)
+        spec["nbytes"] = len(buf)
+        specs[k] = spec
+        columns.append(buf)
+    return specs
+
+
+def _to_record(batch):
+    columns = []
+    header = {"count": batch.count}
+    if isinstance(batch, MultiAgentBatch):
+        header["type"] = "MultiAgentBatch"
+        header["policy_batches"] = {
+            policy_id: _to_columns(sub_batch.data, columns)
+            for policy_id, sub_batch in batch.policy_batches.items()
+        }
+    else:
+        header["type"] = "SampleBatch"
+        header["columns"] = _to_columns(batch.data, columns)
+    header["data_size"] = sum(_align(len(c)) for c in columns)
+    return header, columns
+
+
+def _write_record(f, header, columns):
+    header = json.dumps(header).encode("utf-8")
+    prefix = RECORD_PREFIX.pack(RECORD_MAGIC, len(header))
+    size = len(prefix) + len(header)
+    f.write(prefix)
+    f.write(header)
+    f.write(b"\0" * (_align(size) - size))
+    size = _align(size)
+    for column in columns:
+        f.write(column)
+        f.write(b"\0" * (_align(len(column)) - len(column)))
+        size += _align(len(column))
+    return size
+
+
+def _write_index(path, records):
+    with open(path + INDEX_SUFFIX, "w") as f:
+        json.dump({
+            "records": records,
+            "count": sum(count for _, count in records),
+        }, f)
@@ -1,5 +1,7 @@
 import numpy as np
 
+from ray.rllib.offline.columnar_reader import ColumnarReader, \
+    is_columnar_input
 from ray.rllib.offline.input_reader import InputReader
 from ray.rllib.offline.json_reader import JsonReader
 from ray.rllib.utils.annotations import override, DeveloperAPI
@@ -22,8 +24,8 @@ class MixedInput(InputReader):
         """Initialize a MixedInput.
 
         Arguments:
-            dist (dict): dict mapping JSONReader paths or "sampler" to
-                probabilities. The probabilities must sum to 1.0.
+            dist (dict): dict mapping JSONReader or ColumnarReader paths or
+                "sampler" to probabilities. The probabilities must sum to 1.0.
             ioctx (IOContext): current IO context object.
         """
         if sum(dist.values()) != 1.0:
@@ -33,6 +35,8 @@ class MixedInput(InputReader):
         for k, v in dist.items():
             if k == "sampler":
                 self.choices.append(ioctx.default_sampler_input())
+            elif is_columnar_input(k):
+                self.choices.append(ColumnarReader(k, ioctx))
             else:
                 self.choices.append(JsonReader(k))
             self.p.append(v)
@@ -0,0 +1,172 @@
+import logging
+import numpy as np
+import random
+import six.moves.queue as queue
+import threading
+
+from ray.rllib.offline.input_reader import InputReader
+from ray.rllib.policy.sample_batch import SampleBatch
+from ray.rllib.utils.annotations import override, DeveloperAPI
+
+logger = logging.getLogger(__name__)
+
+
+@DeveloperAPI
+class PrefetchingInput(InputReader):
+    """Reads ahead from a number of child readers on background threads.
+
+    Each thread owns a child reader, e.g., a JsonReader, so that several files
+    are opened, read and decoded concurrently while the caller consumes the
+    batches already in the queue.
+
+    Optionally, rows are shuffled through a buffer of `shuffle_buffer_size`
+    rows, from which batches of `batch_size` random rows are emitted. The
+    emitted rows are then replaced in place by new input rows, so each batch
+    costs O(batch_size). Unlike ShuffledInput, this mixes the rows of
+    different input batches. MultiAgentBatches are passed through without
+    shuffling.
+
+    The threads are stopped by stop(), or once the reader is garbage
+    collected.
+
+    Examples:
+        >>> PrefetchingInput(
+            lambda: JsonReader("/tmp/experiences/*.json", ioctx),
+            num_threads=4, shuffle_buffer_size=10000, batch_size=200)
+    """
+
+    @DeveloperAPI
+    def __init__(self,
+                 reader_creator,
+                 num_threads=4,
+                 queue_size=16,
+                 shuffle_buffer_size=0,
+                 batch_size=None):
+        """Initialize a PrefetchingInput.
+
+        Arguments:
+            reader_creator (func): function that returns a new child
+                InputReader. It is called once for each thread.
+            num_threads (int): number of threads reading ahead.
+            queue_size (int): max number of batches to read ahead.
+            shuffle_buffer_size (int): if positive, shuffle rows over a buffer
+                of this many rows.
+            batch_size (int): number of rows of the shuffled batches.
+        """
+        if shuffle_buffer_size > 0 and not batch_size:
+            raise ValueError("batch_size must be set to shuffle rows")
+        self.shuffle_buffer_size = shuffle_buffer_size
+        self.batch_size = batch_size
+        # The shuffle buffer: preallocated columns of `capacity` rows, the
+        # slots of the rows emitted last (to be replaced in place), and the
+        # input batch the next rows are taken from
+        self.capacity = max(shuffle_buffer_size, batch_size or 0)
+        self.columns = None
+        self.free_slots = None
+        self.pending = None
+        self.pending_offset = 0
+        self.queue = queue.Queue(queue_size)
+        self.stopped = threading.Event()
+        # Create the readers here, so that e.g. missing files are reported to
+        # the caller. The threads don't reference this object, so that it is
+        # garbage collected (which stops the threads) once it is unused.
+        self.threads = []
+        for i in range(num_threads):
+            thread = threading.Thread(
+                target=_prefetch,
+                args=(reader_creator(), self.queue, self.stopped),
+                name="PrefetchingInput-{}".format(i))
+            thread.daemon = True
+            self.threads.append(thread)
+        for thread in self.threads:
+            thread.start()
+
+    @override(InputReader)
+    def next(self):
+        if self.shuffle_buffer_size <= 0:
+            return self._get()
+        # Replace the rows emitted last (all rows initially)
+        while self.free_slots is None or len(self.free_slots):
+            if self.pending is None or \
+                    self.pending_offset == self.pending.count:
+                batch = self._get()
+                if not isinstance(batch, SampleBatch):
+                    return batch
+                if self.columns is None:
+                    self._allocate(batch)
+                else:
+                    self._check_columns(batch)
+                self.pending, self.pending_offset = batch, 0
+                continue
+            n = min(
+                len(self.free_slots),
+                self.pending.count - self.pending_offset)
+            slots = self.free_slots[:n]
+            for k, column in self.columns.items():
+                column[slots] = self.pending[k][self.pending_offset:
+                                                self.pending_offset + n]
+            self.pending_offset += n
+            self.free_slots = self.free_slots[n:]
+        selected = np.array(
+            random.sample(range(self.capacity), self.batch_size))
+        self.free_slots = selected
+        return SampleBatch({k: v[selected] for k, v in self.columns.items()})
+
+    @DeveloperAPI
+    def stop(self):
+        """Stops the background threads."""
+        self.stopped.set()
+
+    def __del__(self):
+        if hasattr(self, "stopped"):
+            self.stopped.set()
+
+    def _allocate(self, batch):
+        self.columns = {}
+        for k, v in batch.items():
+            v = np.asarray(v)
+            self.columns[k] = np.empty(
+                (self.capacity, ) + v.shape[1:], dtype=v.dtype)
+        self.free_slots = np.arange(self.capacity)
+
+    # Widens the dtype of a column if the batch holds values it can't
+    # represent, e.g., float rewards after int rewards
+    def _check_columns(self, batch):
+        if set(batch.keys()) != set(self.columns):
+            raise ValueError(
+                "Can't shuffle batches with different columns: {} and "
+                "{}".format(sorted(self.columns), sorted(batch.keys())))
+        for k, column in self.columns.items():
+            v = np.asarray(batch[k])
+            if v.shape[1:] != column.shape[1:]:
+                raise ValueError(
+                    "Can't shuffle rows of shape {} and {} in column "
+                    "{}".format(column.shape[1:], v.shape[1:], k))
+            if not np.can_cast(v.dtype, column.dtype, "safe"):
+                self.columns[k] = column.astype(
+                    np.result_type(column.dtype, v.dtype))
+
+    def _get(self):
+        item = self.queue.get()
+        # Propagate errors of the reader threads
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+
+def _prefetch(reader, batches, stopped):
+    """Reads batches of the reader into the queue until stopped is set."""
+    while not stopped.is_set():
+        try:
+            item = reader.next()
+        except BaseException as e:
+            logger.exception("Error reading input")
+            item = e
+        while not stopped.is_set():
+            try:
+                batches.put(item, timeout=1.0)
+                break
+            except queue.Full:
+                pass
+        if isinstance(item, BaseException):
+            return
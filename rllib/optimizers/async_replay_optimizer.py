@@ -2,7 +2,6 @@
 
 https://arxiv.org/abs/1803.00933"""
 
-import collections
 import os
 import random
 import time
@@ -16,7 +15,9 @@ from ray.rllib.evaluation.metrics import get_learner_stats
 from ray.rllib.policy.sample_batch import SampleBatch, DEFAULT_POLICY_ID, \
     MultiAgentBatch
 from ray.rllib.optimizers.policy_optimizer import PolicyOptimizer
-from ray.rllib.optimizers.replay_buffer import PrioritizedReplayBuffer
+from ray.rllib.optimizers.replay_buffer import PrioritizedReplayBuffer, \
+    ReplayBufferMapping
+from ray.rllib.optimizers.replay_storage import storage_config_for
 from ray.rllib.utils.annotations import override
 from ray.rllib.utils.actors import TaskPool, create_colocated
 from ray.rllib.utils.memory import ray_get_and_free
@@ -56,7 +57,9 @@ class AsyncReplayOptimizer(PolicyOptimizer):
                  num_replay_buffer_shards=1,
                  max_weight_sync_delay=400,
                  debug=False,
-                 batch_replay=False):
+                 batch_replay=False,
+                 replay_storage="list",
+                 replay_storage_config=None):
         """Initialize an async replay optimizer.
 
         Arguments:
@@ -77,7 +80,18 @@ class AsyncReplayOptimizer(PolicyOptimizer):
             debug (bool): return extra debug stats
             batch_replay (bool): replay entire sequential batches of
                 experiences instead of sampling steps individually
+            replay_storage (str): how the replay actors store experiences,
+                either "list", "columnar", "frame_stack" or "mmap" (see
+                replay_storage.py). Batch replay only supports "list".
+            replay_storage_config (dict): arguments of the replay storage.
+                If it has a path, each replay shard and policy stores its
+                buffer in a subdirectory of it.
         """
+        if batch_replay and replay_storage != "list":
+            raise ValueError(
+                "Batch replay keeps whole batches in memory and does not "
+                "support the {} replay storage.".format(replay_storage))
+
         PolicyOptimizer.__init__(self, workers)
 
         self.debug = debug
@@ -102,7 +116,13 @@ class AsyncReplayOptimizer(PolicyOptimizer):
             prioritized_replay_alpha,
             prioritized_replay_beta,
             prioritized_replay_eps,
+            replay_storage,
+            replay_storage_config,
         ], num_replay_buffer_shards)
+        ray.get([
+            actor.set_shard_index.remote(i)
+            for i, actor in enumerate(self.replay_actors)
+        ])
 
         # Stats
         self.timers = {
@@ -260,18 +280,26 @@ class ReplayActor:
 
     def __init__(self, num_shards, learning_starts, buffer_size,
                  train_batch_size, prioritized_replay_alpha,
-                 prioritized_replay_beta, prioritized_replay_eps):
+                 prioritized_replay_beta, prioritized_replay_eps,
+                 replay_storage, replay_storage_config):
         self.replay_starts = learning_starts // num_shards
         self.buffer_size = buffer_size // num_shards
         self.train_batch_size = train_batch_size
+        self.replay_storage = replay_storage
         self.prioritized_replay_beta = prioritized_replay_beta
         self.prioritized_replay_eps = prioritized_replay_eps
+        self.shard_index = 0
 
-        def new_buffer():
+        def new_buffer(policy_id):
             return PrioritizedReplayBuffer(
-                self.buffer_size, alpha=prioritized_replay_alpha)
+                self.buffer_size,
+                alpha=prioritized_replay_alpha,
+                storage=replay_storage,
+                storage_config=storage_config_for(
+                    replay_storage_config,
+                    "shard_{}".format(self.shard_index), policy_id))
 
-        self.replay_buffers = collections.defaultdict(new_buffer)
+        self.replay_buffers = ReplayBufferMapping(new_buffer)
 
         # Metrics
         self.add_batch_timer = TimerStat()
@@ -282,12 +310,24 @@ class ReplayActor:
     def get_host(self):
         return os.uname()[1]
 
+    def set_shard_index(self, shard_index):
+        """Sets the index of this shard, which names the directory of its
+        buffers if they are stored on disk."""
+        self.shard_index = shard_index
+
     def add_batch(self, batch):
         # Handle everything as if multiagent
         if isinstance(batch, SampleBatch):
             batch = MultiAgentBatch({DEFAULT_POLICY_ID: batch}, batch.count)
         with self.add_batch_timer:
             for policy_id, s in batch.policy_batches.items():
+                if self.replay_storage != "list":
+                    # Columns are stored as arrays, so they are not packed
+                    s.decompress_if_needed()
+                    self.replay_buffers[policy_id].add_batch(
+                        s["obs"], s["actions"], s["rewards"], s["new_obs"],
+                        s["dones"], s["weights"])
+                    continue
                 for row in s.rows():
                     self.replay_buffers[policy_id].add(
                         row["obs"], row["actions"], row["rewards"],
@@ -343,16 +383,20 @@ class ReplayActor:
 class BatchReplayActor:
     """The batch replay version of the replay actor.
 
-    This allows for RNN models, but ignores prioritization params.
+    This allows for RNN models, but ignores prioritization params. Batches
+    are always kept in memory, i.e. only the "list" replay storage is
+    supported.
     """
 
     def __init__(self, num_shards, learning_starts, buffer_size,
                  train_batch_size, prioritized_replay_alpha,
-                 prioritized_replay_beta, prioritized_replay_eps):
+                 prioritized_replay_beta, prioritized_replay_eps,
+                 replay_storage, replay_storage_config):
         self.replay_starts = learning_starts // num_shards
         self.buffer_size = buffer_size // num_shards
         self.train_batch_size = train_batch_size
         self.buffer = []
+        self.shard_index = 0
 
         # Metrics
         self.num_added = 0
@@ -361,6 +405,11 @@ class BatchReplayActor:
     def get_host(self):
         return os.uname()[1]
 
+    def set_shard_index(self, shard_index):
+        """Sets the index of this shard. Batches are not stored on disk, so
+        the index is only informational."""
+        self.shard_index = shard_index
+
     def add_batch(self, batch):
         # Handle everything as if multiagent
         if isinstance(batch, SampleBatch):
@@ -1,7 +1,9 @@
+import collections
 import numpy as np
 import random
 import sys
 
+from ray.rllib.optimizers.replay_storage import make_storage
 from ray.rllib.optimizers.segment_tree import SumSegmentTree, MinSegmentTree
 from ray.rllib.utils.annotations import DeveloperAPI
 from ray.rllib.utils.compression import unpack_if_needed
@@ -11,7 +13,7 @@ from ray.rllib.utils.window_stat import WindowStat
 @DeveloperAPI
 class ReplayBuffer:
     @DeveloperAPI
-    def __init__(self, size):
+    def __init__(self, size, storage="list", storage_config=None):
         """Create Prioritized Replay buffer.
 
         Parameters
@@ -19,8 +21,17 @@ class ReplayBuffer:
         size: int
           Max number of transitions to store in the buffer. When the buffer
           overflows the old memories are dropped.
+        storage: str
+          How transitions are stored, either "list" (a list of tuples),
+          "columnar" (preallocated arrays), "frame_stack" (deduplicated
+          frames of stacked observations) or "mmap" (memory-mapped files),
+          see replay_storage.py.
+        storage_config: dict
+          Arguments of the storage, e.g. {"num_frames": 4} for
+          "frame_stack".
         """
-        self._storage = []
+        self._storage = make_storage(storage, size, **(storage_config or {}))
+        self._columnar = not isinstance(self._storage, list)
         self._maxsize = size
         self._next_idx = 0
         self._hit_count = np.zeros(size)
@@ -30,27 +41,71 @@ class ReplayBuffer:
         self._evicted_hit_stats = WindowStat("evicted_hit", 1000)
         self._est_size_bytes = 0
 
+        # Continue after the transitions restored by a persistent storage
+        if self._columnar and len(self._storage) > 0:
+            self._next_idx = self._storage.next_idx
+            self._eviction_started = len(self._storage) == size
+
     def __len__(self):
         return len(self._storage)
 
     @DeveloperAPI
     def add(self, obs_t, action, reward, obs_tp1, done, weight):
-        data = (obs_t, action, reward, obs_tp1, done)
-        self._num_added += 1
+        if self._columnar:
+            self._storage.write(self._next_idx,
+                                [[obs_t], [action], [reward], [obs_tp1],
+                                 [done]])
+            self._advance(1)
+            return
 
+        data = (obs_t, action, reward, obs_tp1, done)
         if self._next_idx >= len(self._storage):
             self._storage.append(data)
             self._est_size_bytes += sum(sys.getsizeof(d) for d in data)
         else:
             self._storage[self._next_idx] = data
-        if self._next_idx + 1 >= self._maxsize:
-            self._eviction_started = True
-        self._next_idx = (self._next_idx + 1) % self._maxsize
+        self._advance(1)
+
+    @DeveloperAPI
+    def add_batch(self, obs_t, actions, rewards, obs_tp1, dones, weights):
+        """Adds a batch of transitions, given as one array per column.
+
+        With columnar storage, the batch is written with one slice
+        assignment per column."""
+        if not self._columnar:
+            for i in range(len(actions)):
+                self.add(obs_t[i], actions[i], rewards[i], obs_tp1[i],
+                         dones[i], None if weights is None else weights[i])
+            return
+
+        columns = [obs_t, actions, rewards, obs_tp1, dones]
+        for start in range(0, len(actions), self._maxsize):
+            end = start + self._maxsize
+            self._storage.write(self._next_idx,
+                                [column[start:end] for column in columns])
+            self._advance(min(len(actions), end) - start)
+        self._storage.commit()
+
+    # Moves the next index past n newly written transitions
+    def _advance(self, n):
+        self._num_added += n
+        # The transitions are written at self._next_idx + [0, n)
+        written = self._next_idx + np.arange(n)
         if self._eviction_started:
-            self._evicted_hit_stats.push(self._hit_count[self._next_idx])
-            self._hit_count[self._next_idx] = 0
+            evicting = np.ones(n, dtype=bool)
+        else:
+            evicting = written + 1 >= self._maxsize
+            self._eviction_started = bool(evicting[-1])
+        self._next_idx = (self._next_idx + n) % self._maxsize
+        for idx in (written[evicting] + 1) % self._maxsize:
+            self._evicted_hit_stats.push(self._hit_count[idx])
+            self._hit_count[idx] = 0
 
     def _encode_sample(self, idxes):
+        if self._columnar:
+            np.add.at(self._hit_count, idxes, 1)
+            return tuple(self._storage.gather(idxes))
+
         obses_t, actions, rewards, obses_tp1, dones = [], [], [], [], []
         for i in idxes:
             data = self._storage[i]
@@ -108,9 +163,12 @@ class ReplayBuffer:
         data = {
             "added_count": self._num_added,
             "sampled_count": self._num_sampled,
-            "est_size_bytes": self._est_size_bytes,
+            "est_size_bytes": (self._storage.size_bytes() if self._columnar
+                               else self._est_size_bytes),
             "num_entries": len(self._storage),
         }
+        if self._columnar:
+            data.update(self._storage.stats())
         if debug:
             data.update(self._evicted_hit_stats.stats())
         return data
@@ -119,7 +177,7 @@ class ReplayBuffer:
 @DeveloperAPI
 class PrioritizedReplayBuffer(ReplayBuffer):
     @DeveloperAPI
-    def __init__(self, size, alpha):
+    def __init__(self, size, alpha, storage="list", storage_config=None):
         """Create Prioritized Replay buffer.
 
         Parameters
@@ -130,12 +188,17 @@ class PrioritizedReplayBuffer(ReplayBuffer):
         alpha: float
           how much prioritization is used
           (0 - no prioritization, 1 - full prioritization)
+        storage: str
+          How transitions are stored (see ReplayBuffer.__init__)
+        storage_config: dict
+          Arguments of the storage (see ReplayBuffer.__init__)
 
         See Also
         --------
         ReplayBuffer.__init__
         """
-        super(PrioritizedReplayBuffer, self).__init__(size)
+        super(PrioritizedReplayBuffer, self).__init__(size, storage,
+                                                      storage_config)
         assert alpha > 0
         self._alpha = alpha
 
@@ -148,6 +211,13 @@ class PrioritizedReplayBuffer(ReplayBuffer):
         self._max_priority = 1.0
         self._prio_change_stats = WindowStat("reprio", 1000)
 
+        # Priorities are not persisted, restored transitions get the
+        # initial max priority
+        if len(self._storage) > 0:
+            idxes = np.arange(len(self._storage))
+            self._it_sum.set_many(idxes, self._max_priority**alpha)
+            self._it_min.set_many(idxes, self._max_priority**alpha)
+
     @DeveloperAPI
     def add(self, obs_t, action, reward, obs_tp1, done, weight):
         """See ReplayBuffer.store_effect"""
@@ -160,14 +230,44 @@ class PrioritizedReplayBuffer(ReplayBuffer):
         self._it_sum[idx] = weight**self._alpha
         self._it_min[idx] = weight**self._alpha
 
+    @DeveloperAPI
+    def add_batch(self, obs_t, actions, rewards, obs_tp1, dones, weights):
+        if not self._columnar:
+            # add() sets the priorities one at a time
+            return super(PrioritizedReplayBuffer, self).add_batch(
+                obs_t, actions, rewards, obs_tp1, dones, weights)
+
+        n = len(actions)
+        idxes = (self._next_idx + np.arange(n)) % self._maxsize
+        super(PrioritizedReplayBuffer, self).add_batch(
+            obs_t, actions, rewards, obs_tp1, dones, weights)
+        if weights is None:
+            priorities = np.full(n, self._max_priority**self._alpha)
+        else:
+            priorities = np.asarray(weights, dtype=np.float64)**self._alpha
+        # Only the last write to an index counts if the batch wraps around
+        idxes, priorities = idxes[-self._maxsize:], priorities[-self._maxsize:]
+        self._it_sum.set_many(idxes, priorities)
+        self._it_min.set_many(idxes, priorities)
+
     def _sample_proportional(self, batch_size):
-        res = []
-        for _ in range(batch_size):
-            # TODO(szymon): should we ensure no repeats?
-            mass = random.random() * self._it_sum.sum(0, len(self._storage))
-            idx = self._it_sum.find_prefixsum_idx(mass)
-            res.append(idx)
-        return res
+        # Stratified sampling: the total priority mass is split into
+        # batch_size equal segments and one mass is drawn from each, which
+        # keeps the sampling probabilities proportional to the priorities.
+        # TODO(szymon): should we ensure no repeats?
+        segment = self._it_sum.sum(0, len(self._storage)) / batch_size
+        masses = (np.arange(batch_size) + np.random.random(batch_size)) * \
+            segment
+        idxes = self._it_sum.find_prefixsum_idx(masses)
+        # Guard against rounding errors pushing a mass past the last item
+        return np.minimum(idxes, len(self._storage) - 1)
+
+    def _compute_weights(self, idxes, beta):
+        p_min = self._it_min.min() / self._it_sum.sum()
+        max_weight = (p_min * len(self._storage))**(-beta)
+        p_samples = self._it_sum[idxes] / self._it_sum.sum()
+        weights = (p_samples * len(self._storage))**(-beta)
+        return weights / max_weight
 
     @DeveloperAPI
     def sample_idxes(self, batch_size):
@@ -178,15 +278,7 @@ class PrioritizedReplayBuffer(ReplayBuffer):
         assert beta > 0
         self._num_sampled += len(idxes)
 
-        weights = []
-        p_min = self._it_min.min() / self._it_sum.sum()
-        max_weight = (p_min * len(self._storage))**(-beta)
-
-        for idx in idxes:
-            p_sample = self._it_sum[idx] / self._it_sum.sum()
-            weight = (p_sample * len(self._storage))**(-beta)
-            weights.append(weight / max_weight)
-        weights = np.array(weights)
+        weights = self._compute_weights(idxes, beta)
         encoded_sample = self._encode_sample(idxes)
         return tuple(list(encoded_sample) + [weights, idxes])
 
@@ -232,15 +324,7 @@ class PrioritizedReplayBuffer(ReplayBuffer):
 
         idxes = self._sample_proportional(batch_size)
 
-        weights = []
-        p_min = self._it_min.min() / self._it_sum.sum()
-        max_weight = (p_min * len(self._storage))**(-beta)
-
-        for idx in idxes:
-            p_sample = self._it_sum[idx] / self._it_sum.sum()
-            weight = (p_sample * len(self._storage))**(-beta)
-            weights.append(weight / max_weight)
-        weights = np.array(weights)
+        weights = self._compute_weights(idxes, beta)
         encoded_sample = self._encode_sample(idxes)
         return tuple(list(encoded_sample) + [weights, idxes])
 
@@ -261,15 +345,25 @@ class PrioritizedReplayBuffer(ReplayBuffer):
           variable `idxes`.
         """
         assert len(idxes) == len(priorities)
-        for idx, priority in zip(idxes, priorities):
-            assert priority > 0
-            assert 0 <= idx < len(self._storage)
-            delta = priority**self._alpha - self._it_sum[idx]
+        if len(idxes) == 0:
+            return
+        idxes = np.asarray(idxes)
+        priorities = np.asarray(priorities, dtype=np.float64)
+        assert np.all(priorities > 0)
+        assert np.all((0 <= idxes) & (idxes < len(self._storage)))
+        # If an index is given more than once, the last priority is kept,
+        # as if the priorities were set one at a time.
+        _, last = np.unique(idxes[::-1], return_index=True)
+        last = len(idxes) - 1 - last
+        idxes = idxes[last]
+        new_priorities = priorities[last]**self._alpha
+
+        for delta in new_priorities - self._it_sum[idxes]:
             self._prio_change_stats.push(delta)
-            self._it_sum[idx] = priority**self._alpha
-            self._it_min[idx] = priority**self._alpha
+        self._it_sum.set_many(idxes, new_priorities)
+        self._it_min.set_many(idxes, new_priorities)
 
-            self._max_priority = max(self._max_priority, priority)
+        self._max_priority = max(self._max_priority, priorities.max())
 
     @DeveloperAPI
     def stats(self, debug=False):
@@ -277,3 +371,14 @@ class PrioritizedReplayBuffer(ReplayBuffer):
         if debug:
             parent.update(self._prio_change_stats.stats())
         return parent
+
+
+class ReplayBufferMapping(collections.defaultdict):
+    """Maps policy ids to replay buffers.
+
+    default_factory takes as an argument the missing policy id.
+    """
+
+    def __missing__(self, key):
+        self[key] = value = self.default_factory(key)
+        return value
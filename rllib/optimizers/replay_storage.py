@@ -0,0 +1,497 @@
+import json
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+
+from ray.rllib.utils.annotations import DeveloperAPI
+from ray.rllib.utils.compression import is_compressed, unpack
+
+# The order of the columns passed to `write` and returned by `gather`
+COLUMNS = ["obs", "actions", "rewards", "new_obs", "dones"]
+
+
+def _as_array(data):
+    """Returns the rows of a column as an array, unpacking compressed rows
+    (e.g. observations packed by `compress_observations`)."""
+    data = np.asarray(data)
+    if data.dtype.kind in "OSU" and len(data) > 0 and is_compressed(data[0]):
+        data = np.array([unpack(d) for d in data])
+    return data
+
+
+@DeveloperAPI
+class ColumnarStorage:
+    """Ring buffer storage that keeps each column in one NumPy array.
+
+    The arrays are allocated on the first write, with the shape and dtype
+    of the written data, and are never resized. A column is converted to a
+    wider dtype if later data can not be cast to it safely, e.g. float
+    rewards after int rewards. Compressed rows are unpacked when they are
+    written. Whole batches are written with slice assignment and sampled
+    with a single fancy-index gather per column, so the cost of both is
+    proportional to the batch size rather than to the number of Python
+    objects.
+    """
+
+    @DeveloperAPI
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._columns = None
+        self._num_stored = 0
+        # The row after the last written row
+        self.next_idx = 0
+
+    def __len__(self):
+        return self._num_stored
+
+    def _allocate(self, columns):
+        self._columns = []
+        for data in columns:
+            self._columns.append(
+                np.zeros((self.capacity, ) + data.shape[1:],
+                         dtype=data.dtype))
+
+    # Checks that the rows fit the columns, and widens the dtype of columns
+    # that can not hold the rows without loss
+    def _check_columns(self, columns):
+        for i, (column, data) in enumerate(zip(self._columns, columns)):
+            if data.shape[1:] != column.shape[1:]:
+                raise ValueError(
+                    "The rows of column {} have shape {}, but the storage "
+                    "holds rows of shape {}.".format(
+                        COLUMNS[i], data.shape[1:], column.shape[1:]))
+            if not np.can_cast(data.dtype, column.dtype, "safe"):
+                self._promote(i, np.result_type(column.dtype, data.dtype))
+
+    def _promote(self, i, dtype):
+        self._columns[i] = self._columns[i].astype(dtype)
+
+    @DeveloperAPI
+    def write(self, idx, columns):
+        """Writes a batch of rows starting at row idx.
+
+        Arguments:
+            idx (int): The row of the first item, the batch wraps around
+                to the start of the buffer if needed.
+            columns (list): One array per column (see COLUMNS), all with
+                the same length, which must not exceed the capacity.
+        """
+        columns = [_as_array(data) for data in columns]
+        if self._columns is None:
+            self._allocate(columns)
+        else:
+            self._check_columns(columns)
+        n = len(columns[0])
+        assert n <= self.capacity
+        head = min(n, self.capacity - idx)
+        for column, data in zip(self._columns, columns):
+            column[idx:idx + head] = data[:head]
+            column[:n - head] = data[head:]
+        self._num_stored = min(self.capacity, max(self._num_stored, idx + n))
+        self.next_idx = (idx + n) % self.capacity
+
+    @DeveloperAPI
+    def gather(self, idxes):
+        """Returns one array per column with the rows at idxes."""
+        return [column[idxes] for column in self._columns]
+
+    @DeveloperAPI
+    def commit(self):
+        """Called after a batch of rows is written. Storages that persist
+        the rows record them here."""
+        pass
+
+    @DeveloperAPI
+    def size_bytes(self):
+        if self._columns is None:
+            return 0
+        return sum(column.nbytes for column in self._columns)
+
+    @DeveloperAPI
+    def stats(self):
+        return {}
+
+
+@DeveloperAPI
+class FrameStackStorage:
+    """Replay storage that keeps each unique frame of stacked observations
+    once.
+
+    Observations stacked by the FrameStack wrapper (in atari_wrappers.py)
+    overlap: the stack of a step shares all but one frame with the stack of
+    the previous step, and `new_obs` of a transition is the `obs` of a
+    later one. This storage splits `obs` and `new_obs` into frames, and
+    stores for each transition the indices of its frames in a shared frame
+    pool. A frame that is equal to a frame of the same or the previous
+    transition is not stored again. Since frames are only shared when their
+    contents are equal, stacks that span episode boundaries are always
+    reconstructed correctly.
+
+    Frames are reference counted and their slots in the pool are reused once
+    no transition refers to them. The pool grows as needed, and is converted
+    to a wider dtype if later frames can not be cast to it safely.
+    Compressed observations are unpacked before they are split.
+
+    Arguments:
+        capacity (int): The maximum number of transitions.
+        num_frames (int): The number of frames in each stack. Frames are
+            stacked along the last axis of the observations.
+    """
+
+    @DeveloperAPI
+    def __init__(self, capacity, num_frames=4):
+        self.capacity = capacity
+        self.num_frames = num_frames
+        # Frame indices of obs and new_obs, and the other columns
+        self._transitions = ColumnarStorage(capacity)
+        self._frames = None
+        self._refcount = None
+        self._free_frames = []
+        # hash of the frame contents -> frame index, for the frames of the
+        # last written transition
+        self._recent_frames = {}
+
+    def __len__(self):
+        return len(self._transitions)
+
+    # (n, ..., num_frames * channels) -> (n, num_frames, ..., channels)
+    def _split(self, stacks):
+        stacks = _as_array(stacks)
+        if stacks.ndim < 2 or stacks.shape[-1] % self.num_frames:
+            raise ValueError(
+                "Observations of shape {} are not stacks of {} frames.".format(
+                    stacks.shape[1:], self.num_frames))
+        shape = stacks.shape[:-1] + (self.num_frames,
+                                     stacks.shape[-1] // self.num_frames)
+        return np.moveaxis(stacks.reshape(shape), -2, 1)
+
+    # (n, num_frames, ..., channels) -> (n, ..., num_frames * channels)
+    def _stack(self, frames):
+        frames = np.moveaxis(frames, 1, -2)
+        return frames.reshape(frames.shape[:-2] + (-1, ))
+
+    # Checks that the frames fit the frame pool, and widens the dtype of the
+    # pool if it can not hold the frames without loss
+    def _check_frames(self, frames):
+        if self._frames is None:
+            return
+        if frames.shape[2:] != self._frames.shape[1:]:
+            raise ValueError(
+                "The frames have shape {}, but the storage holds frames of "
+                "shape {}.".format(frames.shape[2:], self._frames.shape[1:]))
+        if not np.can_cast(frames.dtype, self._frames.dtype, "safe"):
+            self._frames = self._frames.astype(
+                np.result_type(self._frames.dtype, frames.dtype))
+
+    def _allocate_frame(self, frame):
+        if self._frames is None:
+            size = self.capacity + 2 * self.num_frames
+            self._frames = np.zeros((size, ) + frame.shape, dtype=frame.dtype)
+            self._refcount = np.zeros(size, dtype=np.int32)
+            self._free_frames = list(range(size - 1, -1, -1))
+        if not self._free_frames:
+            size = len(self._frames)
+            new_size = size + size // 2 + 1
+            self._frames = np.concatenate([
+                self._frames,
+                np.zeros((new_size - size, ) + frame.shape, dtype=frame.dtype)
+            ])
+            self._refcount = np.concatenate(
+                [self._refcount,
+                 np.zeros(new_size - size, dtype=np.int32)])
+            self._free_frames = list(range(new_size - 1, size - 1, -1))
+        idx = self._free_frames.pop()
+        self._frames[idx] = frame
+        return idx
+
+    # Returns the index of a frame with the given contents, reusing a frame
+    # of the current or the previous transition if possible
+    def _store_frame(self, frame, current_frames):
+        key = hash(frame.tobytes())
+        idx = current_frames.get(key, self._recent_frames.get(key))
+        if idx is None or not np.array_equal(self._frames[idx], frame):
+            idx = self._allocate_frame(frame)
+        current_frames[key] = idx
+        self._refcount[idx] += 1
+        return idx
+
+    def _release_frames(self, idxes):
+        np.subtract.at(self._refcount, idxes, 1)
+        unused = np.unique(idxes[self._refcount[idxes] == 0])
+        self._free_frames.extend(unused.tolist())
+
+    @DeveloperAPI
+    def write(self, idx, columns):
+        """See ColumnarStorage.write."""
+        obs, actions, rewards, new_obs, dones = columns
+        n = len(actions)
+        assert n <= self.capacity
+        obs_frames = self._split(obs)
+        new_obs_frames = self._split(new_obs)
+        if obs_frames.shape[2:] != new_obs_frames.shape[2:]:
+            raise ValueError("obs and new_obs have different shapes.")
+        dtype = np.result_type(obs_frames.dtype, new_obs_frames.dtype)
+        obs_frames = obs_frames.astype(dtype, copy=False)
+        new_obs_frames = new_obs_frames.astype(dtype, copy=False)
+        self._check_frames(obs_frames)
+
+        obs_idxes = np.zeros((n, self.num_frames), dtype=np.int64)
+        new_obs_idxes = np.zeros((n, self.num_frames), dtype=np.int64)
+        for i in range(n):
+            current_frames = {}
+            for j in range(self.num_frames):
+                obs_idxes[i, j] = self._store_frame(obs_frames[i, j],
+                                                    current_frames)
+            for j in range(self.num_frames):
+                new_obs_idxes[i, j] = self._store_frame(
+                    new_obs_frames[i, j], current_frames)
+            self._recent_frames = current_frames
+
+        # The frames of overwritten transitions are released after the new
+        # transitions took their references, so that shared frames are kept
+        slots = (idx + np.arange(n)) % self.capacity
+        overwritten = slots[slots < len(self._transitions)]
+        if len(overwritten):
+            index_columns = self._transitions._columns
+            released = np.concatenate([
+                index_columns[0][overwritten].ravel(),
+                index_columns[3][overwritten].ravel()
+            ])
+        self._transitions.write(
+            idx, [obs_idxes, actions, rewards, new_obs_idxes, dones])
+        if len(overwritten):
+            self._release_frames(released)
+
+    @DeveloperAPI
+    def gather(self, idxes):
+        """See ColumnarStorage.gather."""
+        obs_idxes, actions, rewards, new_obs_idxes, dones = \
+            self._transitions.gather(idxes)
+        return [
+            self._stack(self._frames[obs_idxes]), actions, rewards,
+            self._stack(self._frames[new_obs_idxes]), dones
+        ]
+
+    @DeveloperAPI
+    def commit(self):
+        """See ColumnarStorage.commit."""
+        pass
+
+    @DeveloperAPI
+    def num_unique_frames(self):
+        if self._refcount is None:
+            return 0
+        return int(np.count_nonzero(self._refcount))
+
+    @DeveloperAPI
+    def size_bytes(self):
+        if self._frames is None:
+            return 0
+        return self._transitions.size_bytes() + self._frames.nbytes
+
+    @DeveloperAPI
+    def stats(self):
+        return {"num_unique_frames": self.num_unique_frames()}
+
+
+@DeveloperAPI
+class MmapStorage(ColumnarStorage):
+    """Columnar storage in memory-mapped files on local disk.
+
+    Each column is a fixed-size record file, so the buffer size is bounded
+    by disk space instead of RAM, and the OS page cache keeps the hot part
+    of the buffer in memory. Rows are gathered in ascending order, so that
+    sampling reads the files front to back.
+
+    Columns of Python objects or strings can not be memory-mapped, and a
+    column whose dtype is widened (see ColumnarStorage) is rewritten.
+
+    If `persistent` is set, the number of stored rows and the next row are
+    recorded in a metadata file after each batch of rows (see commit) and on
+    close(), and a storage created on the same path restores the stored
+    rows, e.g. after an actor restart.
+    The files are written through the page cache, so they survive a crash
+    of the process but not of the machine. Otherwise, the files are removed
+    when the storage is garbage collected.
+
+    Arguments:
+        capacity (int): The maximum number of transitions.
+        path (str): The directory of the files. A temporary directory is
+            created if not given.
+        persistent (bool): Whether to keep the files and restore them.
+    """
+
+    @DeveloperAPI
+    def __init__(self, capacity, path=None, persistent=False):
+        super(MmapStorage, self).__init__(capacity)
+        if path is None:
+            path = tempfile.mkdtemp(prefix="rllib_replay_")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.persistent = persistent
+        if persistent:
+            self._restore()
+        else:
+            weakref.finalize(self, shutil.rmtree, path, True)
+
+    def _column_file(self, i):
+        return os.path.join(self.path, "{}.bin".format(COLUMNS[i]))
+
+    def _meta_file(self):
+        return os.path.join(self.path, "meta.json")
+
+    def _check_dtype(self, i, dtype):
+        if dtype.kind in "OSU":
+            raise ValueError(
+                "Column {} can not be memory-mapped because it holds "
+                "Python objects or strings.".format(COLUMNS[i]))
+
+    def _allocate(self, columns):
+        self._columns = []
+        for i, data in enumerate(columns):
+            self._check_dtype(i, data.dtype)
+            self._columns.append(
+                np.memmap(
+                    self._column_file(i),
+                    dtype=data.dtype,
+                    mode="w+",
+                    shape=(self.capacity, ) + data.shape[1:]))
+
+    # Rewrites the file of a column with a wider dtype
+    def _promote(self, i, dtype):
+        self._check_dtype(i, dtype)
+        column = self._columns[i]
+        path = self._column_file(i)
+        promoted = np.memmap(
+            path + ".tmp", dtype=dtype, mode="w+", shape=column.shape)
+        promoted[:] = column
+        promoted.flush()
+        os.rename(path + ".tmp", path)
+        self._columns[i] = promoted
+        if self.persistent:
+            self._write_meta()
+
+    def _restore(self):
+        if not os.path.exists(self._meta_file()):
+            return
+        with open(self._meta_file()) as f:
+            meta = json.load(f)
+        if meta["capacity"] != self.capacity:
+            raise ValueError(
+                "The replay storage in {} has capacity {}, not {}.".format(
+                    self.path, meta["capacity"], self.capacity))
+        self._columns = [
+            np.memmap(
+                self._column_file(i),
+                dtype=np.dtype(dtype),
+                mode="r+",
+                shape=tuple(shape))
+            for i, (dtype, shape) in enumerate(meta["columns"])
+        ]
+        self._num_stored = meta["num_stored"]
+        self.next_idx = meta["next_idx"]
+
+    def _write_meta(self):
+        meta = {
+            "capacity": self.capacity,
+            "num_stored": self._num_stored,
+            "next_idx": self.next_idx,
+            "columns": [[column.dtype.str, list(column.shape)]
+                        for column in self._columns],
+        }
+        # Renaming makes the update atomic
+        with open(self._meta_file() + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.rename(self._meta_file() + ".tmp", self._meta_file())
+
+    @DeveloperAPI
+    def commit(self):
+        """Records the stored rows in the metadata file, if persistent."""
+        if self.persistent and self._columns is not None:
+            self._write_meta()
+
+    @DeveloperAPI
+    def gather(self, idxes):
+        idxes = np.asarray(idxes)
+        order = np.argsort(idxes, kind="mergesort")
+        sorted_idxes = idxes[order]
+        result = []
+        for column in self._columns:
+            data = np.empty(
+                (len(idxes), ) + column.shape[1:], dtype=column.dtype)
+            data[order] = column[sorted_idxes]
+            result.append(data)
+        return result
+
+    @DeveloperAPI
+    def flush(self):
+        """Writes all changes to disk."""
+        for column in self._columns or []:
+            column.flush()
+
+    @DeveloperAPI
+    def close(self):
+        """Writes all changes to disk and records the stored rows."""
+        self.flush()
+        self.commit()
+
+    # The resident set size of the files, or None if it is not known
+    def _resident_bytes(self):
+        resident_bytes = 0
+        try:
+            with open("/proc/self/smaps") as f:
+                in_storage = False
+                for line in f:
+                    fields = line.split()
+                    if "-" in fields[0] and ":" not in fields[0]:
+                        # Header line of a mapping, the last field is the
+                        # path of the mapped file
+                        in_storage = fields[-1].startswith(self.path)
+                    elif in_storage and fields[0] == "Rss:":
+                        resident_bytes += int(fields[1]) * 1024
+        except (IOError, IndexError, ValueError):
+            return None
+        return resident_bytes
+
+    @DeveloperAPI
+    def stats(self):
+        return {
+            "mapped_bytes": self.size_bytes(),
+            "resident_bytes": self._resident_bytes(),
+        }
+
+
+def make_storage(storage, capacity, **storage_config):
+    """Creates the storage of a replay buffer.
+
+    Arguments:
+        storage (str): Either "list" to store transitions as a Python list
+            of tuples, "columnar" (see ColumnarStorage), "frame_stack"
+            (see FrameStackStorage) or "mmap" (see MmapStorage).
+        capacity (int): The maximum number of transitions.
+        storage_config (dict): Arguments of the storage class.
+    """
+    if storage == "list":
+        return []
+    elif storage == "columnar":
+        return ColumnarStorage(capacity, **storage_config)
+    elif storage == "frame_stack":
+        return FrameStackStorage(capacity, **storage_config)
+    elif storage == "mmap":
+        return MmapStorage(capacity, **storage_config)
+    raise ValueError("Unknown replay storage: {}".format(storage))
+
+
+def storage_config_for(storage_config, *names):
+    """Returns the storage config of one of several replay buffers, such
+    that each buffer stores its files in its own subdirectory of the
+    configured path."""
+    if storage_config and storage_config.get("path"):
+        storage_config = dict(
+            storage_config,
+            path=os.path.join(storage_config["path"], *
+                              [str(name) for name in names]))
+    return storage_config
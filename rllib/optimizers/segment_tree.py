@@ -1,4 +1,4 @@
-import operator
+import numpy as np
 
 
 class SegmentTree:
@@ -17,12 +17,15 @@ class SegmentTree:
              a contiguous subsequence of items in the
              array.
 
+        The nodes are stored in a NumPy array, so that many items can be
+        set (`set_many`) or read (indexing with an array) in one call.
+
         Paramters
         ---------
         capacity: int
           Total size of the array - must be a power of two.
-        operation: lambda obj, obj -> obj
-          and operation for combining elements (eg. sum, max)
+        operation: numpy ufunc
+          and operation for combining elements (eg. np.add, np.minimum)
           must for a mathematical group together with the set of
           possible values for array elements.
         neutral_element: obj
@@ -33,38 +36,23 @@ class SegmentTree:
         assert capacity > 0 and capacity & (capacity - 1) == 0, \
             "capacity must be positive and a power of 2."
         self._capacity = capacity
-        self._value = [neutral_element for _ in range(2 * capacity)]
+        self._value = np.full(2 * capacity, neutral_element, dtype=np.float64)
         self._operation = operation
-
-    def _reduce_helper(self, start, end, node, node_start, node_end):
-        if start == node_start and end == node_end:
-            return self._value[node]
-        mid = (node_start + node_end) // 2
-        if end <= mid:
-            return self._reduce_helper(start, end, 2 * node, node_start, mid)
-        else:
-            if mid + 1 <= start:
-                return self._reduce_helper(start, end, 2 * node + 1, mid + 1,
-                                           node_end)
-            else:
-                return self._operation(
-                    self._reduce_helper(start, mid, 2 * node, node_start, mid),
-                    self._reduce_helper(mid + 1, end, 2 * node + 1, mid + 1,
-                                        node_end))
+        self._neutral_element = neutral_element
 
     def reduce(self, start=0, end=None):
         """Returns result of applying `self.operation`
         to a contiguous subsequence of the array.
 
           self.operation(
-              arr[start], operation(arr[start+1], operation(... arr[end])))
+              arr[start], operation(arr[start+1], operation(... arr[end-1])))
 
         Parameters
         ----------
         start: int
           beginning of the subsequence
         end: int
-          end of the subsequences
+          end of the subsequences (exclusive)
 
         Returns
         -------
@@ -73,10 +61,28 @@ class SegmentTree:
           elements.
         """
         if end is None:
-            end = self._capacity - 1
+            end = self._capacity
         if end < 0:
             end += self._capacity
-        return self._reduce_helper(start, end, 1, 0, self._capacity - 1)
+        end = min(end, self._capacity)
+        if start == 0 and end == self._capacity:
+            return float(self._value[1])
+
+        # Walk up from the leaves, combining the nodes that are fully
+        # contained in [start, end)
+        result = self._neutral_element
+        start += self._capacity
+        end += self._capacity
+        while start < end:
+            if start & 1:
+                result = self._operation(result, self._value[start])
+                start += 1
+            if end & 1:
+                end -= 1
+                result = self._operation(result, self._value[end])
+            start //= 2
+            end //= 2
+        return float(result)
 
     def __setitem__(self, idx, val):
         # index of the leaf
@@ -88,18 +94,39 @@ class SegmentTree:
                                                self._value[2 * idx + 1])
             idx //= 2
 
+    def set_many(self, idxes, vals):
+        """Sets arr[idxes[i]] = vals[i] for all i.
+
+        Equivalent to setting the items one at a time, but each level of
+        the tree is updated with a single vectorized operation.
+        """
+        idxes = np.asarray(idxes, dtype=np.int64) + self._capacity
+        if len(idxes) == 0:
+            return
+        self._value[idxes] = vals
+        # All leaves have the same depth, so the parents are at one level
+        idxes = np.unique(idxes // 2)
+        while idxes[0] >= 1:
+            self._value[idxes] = self._operation(self._value[2 * idxes],
+                                                 self._value[2 * idxes + 1])
+            idxes = np.unique(idxes // 2)
+
     def __getitem__(self, idx):
-        assert 0 <= idx < self._capacity
+        if np.isscalar(idx):
+            assert 0 <= idx < self._capacity
+        else:
+            idx = np.asarray(idx)
+            assert np.all((0 <= idx) & (idx < self._capacity))
         return self._value[self._capacity + idx]
 
 
 class SumSegmentTree(SegmentTree):
     def __init__(self, capacity):
         super(SumSegmentTree, self).__init__(
-            capacity=capacity, operation=operator.add, neutral_element=0.0)
+            capacity=capacity, operation=np.add, neutral_element=0.0)
 
     def sum(self, start=0, end=None):
-        """Returns arr[start] + ... + arr[end]"""
+        """Returns arr[start] + ... + arr[end - 1]"""
         return super(SumSegmentTree, self).reduce(start, end)
 
     def find_prefixsum_idx(self, prefixsum):
@@ -112,30 +139,45 @@ class SumSegmentTree(SegmentTree):
 
         Parameters
         ----------
-        perfixsum: float
-          upperbound on the sum of array prefix
+        perfixsum: float or np.array
+          upperbound on the sum of array prefix. If an array is given,
+          the index is found for all of its elements at once.
 
         Returns
         -------
-        idx: int
+        idx: int or np.array
           highest index satisfying the prefixsum constraint
         """
-        assert 0 <= prefixsum <= self.sum() + 1e-5
-        idx = 1
-        while idx < self._capacity:  # while non-leaf
-            if self._value[2 * idx] > prefixsum:
-                idx = 2 * idx
-            else:
-                prefixsum -= self._value[2 * idx]
-                idx = 2 * idx + 1
+        if np.isscalar(prefixsum):
+            assert 0 <= prefixsum <= self.sum() + 1e-5
+            idx = 1
+            while idx < self._capacity:  # while non-leaf
+                if self._value[2 * idx] > prefixsum:
+                    idx = 2 * idx
+                else:
+                    prefixsum -= self._value[2 * idx]
+                    idx = 2 * idx + 1
+            return idx - self._capacity
+
+        prefixsum = np.array(prefixsum, dtype=np.float64)
+        assert np.all(0 <= prefixsum) and \
+            np.all(prefixsum <= self.sum() + 1e-5)
+        idx = np.ones(len(prefixsum), dtype=np.int64)
+        for _ in range(self._capacity.bit_length() - 1):  # for each level
+            left = self._value[2 * idx]
+            go_right = left <= prefixsum
+            prefixsum -= np.where(go_right, left, 0.0)
+            idx = 2 * idx + go_right
         return idx - self._capacity
 
 
 class MinSegmentTree(SegmentTree):
     def __init__(self, capacity):
         super(MinSegmentTree, self).__init__(
-            capacity=capacity, operation=min, neutral_element=float("inf"))
+            capacity=capacity,
+            operation=np.minimum,
+            neutral_element=float("inf"))
 
     def min(self, start=0, end=None):
-        """Returns min(arr[start], ...,  arr[end])"""
+        """Returns min(arr[start], ...,  arr[end - 1])"""
         return super(MinSegmentTree, self).reduce(start, end)
@@ -1,10 +1,10 @@
 import logging
-import collections
 import numpy as np
 
 import ray
 from ray.rllib.optimizers.replay_buffer import ReplayBuffer, \
-    PrioritizedReplayBuffer
+    PrioritizedReplayBuffer, ReplayBufferMapping
+from ray.rllib.optimizers.replay_storage import storage_config_for
 from ray.rllib.optimizers.policy_optimizer import PolicyOptimizer
 from ray.rllib.evaluation.metrics import get_learner_stats
 from ray.rllib.policy.sample_batch import SampleBatch, DEFAULT_POLICY_ID, \
@@ -39,7 +39,9 @@ class SyncReplayOptimizer(PolicyOptimizer):
                  train_batch_size=32,
                  sample_batch_size=4,
                  before_learn_on_batch=None,
-                 synchronize_sampling=False):
+                 synchronize_sampling=False,
+                 replay_storage="list",
+                 replay_storage_config=None):
         """Initialize an sync replay optimizer.
 
         Arguments:
@@ -61,6 +63,12 @@ class SyncReplayOptimizer(PolicyOptimizer):
                 the sampled batch to learn on
             synchronize_sampling (bool): whether to sample the experiences for
                 all policies with the same indices (used in MADDPG).
+            replay_storage (str): how the replay buffer stores experiences,
+                either "list", "columnar", "frame_stack" or "mmap" (see
+                replay_storage.py)
+            replay_storage_config (dict): arguments of the replay storage.
+                If it has a path, each policy stores its buffer in a
+                subdirectory named after the policy.
         """
         PolicyOptimizer.__init__(self, workers)
 
@@ -75,6 +83,7 @@ class SyncReplayOptimizer(PolicyOptimizer):
         self.train_batch_size = train_batch_size
         self.before_learn_on_batch = before_learn_on_batch
         self.synchronize_sampling = synchronize_sampling
+        self.replay_storage = replay_storage
 
         # Stats
         self.update_weights_timer = TimerStat()
@@ -86,15 +95,23 @@ class SyncReplayOptimizer(PolicyOptimizer):
         # Set up replay buffer
         if prioritized_replay:
 
-            def new_buffer():
+            def new_buffer(policy_id):
                 return PrioritizedReplayBuffer(
-                    buffer_size, alpha=prioritized_replay_alpha)
+                    buffer_size,
+                    alpha=prioritized_replay_alpha,
+                    storage=replay_storage,
+                    storage_config=storage_config_for(replay_storage_config,
+                                                      policy_id))
         else:
 
-            def new_buffer():
-                return ReplayBuffer(buffer_size)
+            def new_buffer(policy_id):
+                return ReplayBuffer(
+                    buffer_size,
+                    storage=replay_storage,
+                    storage_config=storage_config_for(replay_storage_config,
+                                                      policy_id))
 
-        self.replay_buffers = collections.defaultdict(new_buffer)
+        self.replay_buffers = ReplayBufferMapping(new_buffer)
 
         if buffer_size < self.replay_starts:
             logger.warning("buffer_size={} < replay_starts={}".format(
@@ -125,6 +142,13 @@ class SyncReplayOptimizer(PolicyOptimizer):
                 }, batch.count)
 
             for policy_id, s in batch.policy_batches.items():
+                if self.replay_storage != "list":
+                    # Columns are stored as arrays, so they are not packed
+                    s.decompress_if_needed()
+                    self.replay_buffers[policy_id].add_batch(
+                        s["obs"], s["actions"], s["rewards"], s["new_obs"],
+                        s["dones"], None)
+                    continue
                 for row in s.rows():
                     self.replay_buffers[policy_id].add(
                         pack_if_needed(row["obs"]),
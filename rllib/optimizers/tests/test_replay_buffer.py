@@ -0,0 +1,229 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pytest
+
+from ray.rllib.optimizers.async_replay_optimizer import AsyncReplayOptimizer
+from ray.rllib.optimizers.replay_buffer import ReplayBuffer, \
+    PrioritizedReplayBuffer
+from ray.rllib.utils.compression import pack
+
+
+def _make_batch(start, n):
+    obs = np.arange(start, start + n, dtype=np.float32)[:, None] * \
+        np.ones((1, 3), dtype=np.float32)
+    return (obs, np.arange(start, start + n), np.ones(n, dtype=np.float32),
+            obs + 1, np.zeros(n, dtype=bool))
+
+
+def test_columnar_add_batch_wraparound():
+    buf = ReplayBuffer(8, storage="columnar")
+    buf.add_batch(*_make_batch(0, 5), None)
+    assert len(buf) == 5
+    buf.add_batch(*_make_batch(5, 6), None)
+    assert len(buf) == 8
+    obs, actions, rewards, new_obs, dones = buf.sample_with_idxes(
+        np.arange(8))
+    # Rows 8, 9 and 10 overwrote the oldest rows 0, 1 and 2
+    assert actions.tolist() == [8, 9, 10, 3, 4, 5, 6, 7]
+    assert obs.shape == (8, 3)
+    assert np.allclose(new_obs[:, 0], actions + 1)
+    assert buf.stats()["est_size_bytes"] > 0
+
+
+def test_columnar_matches_list_storage():
+    list_buf = ReplayBuffer(16)
+    columnar_buf = ReplayBuffer(16, storage="columnar")
+    for start in range(0, 40, 7):
+        columns = _make_batch(start, 7)
+        list_buf.add_batch(*columns, None)
+        columnar_buf.add_batch(*columns, None)
+    idxes = np.random.randint(0, 16, 32)
+    for a, b in zip(
+            list_buf.sample_with_idxes(idxes),
+            columnar_buf.sample_with_idxes(idxes)):
+        assert np.array_equal(a, b)
+    assert list_buf._next_idx == columnar_buf._next_idx
+    assert np.array_equal(list_buf._hit_count, columnar_buf._hit_count)
+
+
+def test_columnar_compressed_obs():
+    buf = ReplayBuffer(8, storage="columnar")
+    rng = np.random.RandomState(0)
+    # Zeros compress better than random frames, so the packed strings of
+    # the second batch are longer than those of the first
+    obs = [np.zeros((2, 84, 84), dtype=np.uint8)] + [
+        rng.randint(0, 255, size=(2, 84, 84), dtype=np.uint8)
+        for _ in range(2)
+    ]
+    for i in range(2):
+        packed = np.array([pack(o) for o in obs[i]])
+        packed_next = np.array([pack(o) for o in obs[i + 1]])
+        buf.add_batch(packed, np.arange(2), np.zeros(2), packed_next,
+                      np.zeros(2, dtype=bool), None)
+    obs_t, _, _, obs_tp1, _ = buf.sample_with_idxes(np.arange(4))
+    assert obs_t.dtype == np.uint8
+    assert np.array_equal(obs_t, np.concatenate(obs[:2]))
+    assert np.array_equal(obs_tp1, np.concatenate(obs[1:]))
+
+
+def test_columnar_promotes_dtype():
+    buf = ReplayBuffer(8, storage="columnar")
+    obs, actions, _, new_obs, dones = _make_batch(0, 2)
+    buf.add_batch(obs, actions, np.array([1, 2]), new_obs, dones, None)
+    buf.add(obs[0], 2, 0.5, new_obs[0], False, None)
+    _, _, rewards, _, _ = buf.sample_with_idxes(np.arange(3))
+    assert rewards.tolist() == [1, 2, 0.5]
+    with pytest.raises(ValueError):
+        buf.add(np.zeros(4), 3, 0.0, np.zeros(4), False, None)
+
+
+def test_columnar_prioritized_add_batch():
+    buf = PrioritizedReplayBuffer(8, alpha=1.0, storage="columnar")
+    buf.add_batch(*_make_batch(0, 4), np.array([1.0, 2.0, 3.0, 4.0]))
+    assert np.isclose(buf._it_sum.sum(), 10.0)
+    buf.add_batch(*_make_batch(4, 2), None)
+    # New transitions get the max priority
+    assert np.isclose(buf._it_sum.sum(), 12.0)
+    _, actions, _, _, _, weights, idxes = buf.sample(16, beta=0.4)
+    assert np.all(actions == idxes)
+    assert np.all(weights <= 1.0)
+
+
+def _make_stacked_episode(rng, length, k=4):
+    frames = rng.randint(0, 255, size=(length + 1, 6, 6, 1), dtype=np.uint8)
+    # The first stack repeats the first frame, as in FrameStack.reset()
+    padded = np.concatenate([np.repeat(frames[:1], k - 1, axis=0), frames])
+    stacks = np.array([
+        np.concatenate(padded[t:t + k], axis=2) for t in range(length + 1)
+    ])
+    return (stacks[:-1], np.arange(length), np.zeros(length),
+            stacks[1:], np.arange(length) == length - 1)
+
+
+def test_frame_stack_storage():
+    rng = np.random.RandomState(0)
+    columnar_buf = ReplayBuffer(50, storage="columnar")
+    frame_buf = ReplayBuffer(
+        50, storage="frame_stack", storage_config={"num_frames": 4})
+    for length in [7, 20, 1, 30, 15]:
+        columns = _make_stacked_episode(rng, length)
+        columnar_buf.add_batch(*columns, None)
+        frame_buf.add_batch(*columns, None)
+    idxes = np.arange(50)
+    for a, b in zip(
+            columnar_buf.sample_with_idxes(idxes),
+            frame_buf.sample_with_idxes(idxes)):
+        assert np.array_equal(a, b)
+    # About one new frame per transition
+    assert frame_buf._storage.num_unique_frames() < 50 + 5 * 4
+
+
+def test_frame_stack_compressed_and_promoted():
+    rng = np.random.RandomState(0)
+    columnar_buf = ReplayBuffer(50, storage="columnar")
+    frame_buf = ReplayBuffer(
+        50, storage="frame_stack", storage_config={"num_frames": 4})
+    for length, scale in [(7, 1), (20, 0.5)]:
+        obs, actions, rewards, new_obs, dones = _make_stacked_episode(
+            rng, length)
+        # The second episode has float frames, e.g. scaled observations
+        if scale != 1:
+            obs, new_obs = obs * scale, new_obs * scale
+        columnar_buf.add_batch(obs, actions, rewards, new_obs, dones, None)
+        frame_buf.add_batch(
+            np.array([pack(o) for o in obs]), actions, rewards,
+            np.array([pack(o) for o in new_obs]), dones, None)
+    idxes = np.arange(27)
+    for a, b in zip(
+            columnar_buf.sample_with_idxes(idxes),
+            frame_buf.sample_with_idxes(idxes)):
+        assert np.array_equal(a, b)
+
+
+def test_mmap_storage_persistence():
+    path = tempfile.mkdtemp()
+    try:
+        buf = PrioritizedReplayBuffer(
+            8,
+            alpha=0.6,
+            storage="mmap",
+            storage_config={
+                "path": path,
+                "persistent": True
+            })
+        buf.add_batch(*_make_batch(0, 10), None)
+        stats = buf.stats()
+        assert stats["mapped_bytes"] > 0
+        assert stats["num_entries"] == 8
+        del buf
+
+        # A new buffer on the same path restores the transitions
+        buf = PrioritizedReplayBuffer(
+            8,
+            alpha=0.6,
+            storage="mmap",
+            storage_config={
+                "path": path,
+                "persistent": True
+            })
+        assert len(buf) == 8
+        assert buf._next_idx == 2
+        _, actions, _, _, _ = buf._encode_sample(np.array([3, 0, 1, 0]))
+        assert actions.tolist() == [3, 8, 9, 8]
+        buf.add_batch(*_make_batch(10, 1), None)
+        _, actions, _, _, _ = buf._encode_sample(np.arange(3))
+        assert actions.tolist() == [8, 9, 10]
+        assert np.isclose(buf._it_sum.sum(), 8.0)
+    finally:
+        shutil.rmtree(path)
+
+
+def test_mmap_storage_promotes_and_commits():
+    path = tempfile.mkdtemp()
+    config = {"path": path, "persistent": True}
+    try:
+        buf = ReplayBuffer(8, storage="mmap", storage_config=config)
+        obs, actions, _, new_obs, dones = _make_batch(0, 2)
+        packed = np.array([pack(o) for o in obs])
+        packed_next = np.array([pack(o) for o in new_obs])
+        buf.add_batch(packed, actions, np.array([1, 2]), packed_next, dones,
+                      None)
+        # Float rewards widen the int column
+        buf.add_batch(obs, actions, np.array([0.5, 1.5]), new_obs, dones,
+                      None)
+        meta_file = os.path.join(path, "meta.json")
+        mtime = os.stat(meta_file).st_mtime_ns
+        # Single rows are recorded with the next batch, or on close
+        buf.add(obs[0], 2, 2.5, new_obs[0], False, None)
+        assert os.stat(meta_file).st_mtime_ns == mtime
+        buf._storage.close()
+        del buf
+
+        buf = ReplayBuffer(8, storage="mmap", storage_config=config)
+        assert len(buf) == 5
+        obs_t, _, rewards, _, _ = buf.sample_with_idxes(np.arange(5))
+        assert rewards.tolist() == [1, 2, 0.5, 1.5, 2.5]
+        assert np.array_equal(obs_t, np.concatenate([obs, obs, obs[:1]]))
+    finally:
+        shutil.rmtree(path)
+
+
+def test_batch_replay_requires_list_storage():
+    with pytest.raises(ValueError):
+        AsyncReplayOptimizer(None, batch_replay=True, replay_storage="mmap")
+
+
+if __name__ == "__main__":
+    test_columnar_add_batch_wraparound()
+    test_columnar_matches_list_storage()
+    test_columnar_compressed_obs()
+    test_columnar_promotes_dtype()
+    test_columnar_prioritized_add_batch()
+    test_frame_stack_storage()
+    test_frame_stack_compressed_and_promoted()
+    test_mmap_storage_persistence()
+    test_mmap_storage_promotes_and_commits()
+    test_batch_replay_requires_list_storage()
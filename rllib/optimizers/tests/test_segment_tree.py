@@ -95,9 +95,45 @@ def test_max_interval_tree():
     assert np.isclose(tree.min(3, 4), 3.0)
 
 
+def test_set_many():
+    tree = SumSegmentTree(8)
+    min_tree = MinSegmentTree(8)
+    expected = SumSegmentTree(8)
+
+    idxes = [5, 0, 3, 7]
+    values = [1.0, 0.5, 2.0, 3.0]
+    tree.set_many(idxes, values)
+    min_tree.set_many(idxes, values)
+    for idx, value in zip(idxes, values):
+        expected[idx] = value
+
+    assert np.allclose(tree._value, expected._value)
+    assert np.isclose(tree.sum(), 6.5)
+    assert np.isclose(tree.sum(1, 6), 3.0)
+    assert np.isclose(min_tree.min(), 0.5)
+    assert np.isclose(min_tree.min(1, 6), 1.0)
+    assert np.allclose(tree[np.array(idxes)], values)
+
+
+def test_prefixsum_idx_vectorized():
+    tree = SumSegmentTree(4)
+
+    tree[0] = 0.5
+    tree[1] = 1.0
+    tree[2] = 1.0
+    tree[3] = 3.0
+
+    prefixsums = [0.00, 0.55, 0.99, 1.51, 3.00, 5.50]
+    idxes = tree.find_prefixsum_idx(np.array(prefixsums))
+    assert idxes.tolist() == [0, 1, 1, 2, 3, 3]
+    assert idxes.tolist() == [tree.find_prefixsum_idx(p) for p in prefixsums]
+
+
 if __name__ == "__main__":
     test_tree_set()
     test_tree_set_overlap()
     test_prefixsum_idx()
     test_prefixsum_idx2()
     test_max_interval_tree()
+    test_set_many()
+    test_prefixsum_idx_vectorized()
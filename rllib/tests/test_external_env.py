@@ -1,6 +1,8 @@
 import gym
 import numpy as np
 import random
+import threading
+import time
 import unittest
 import uuid
 
@@ -8,9 +10,12 @@ import ray
 from ray.rllib.agents.dqn import DQNTrainer
 from ray.rllib.agents.pg import PGTrainer
 from ray.rllib.evaluation.rollout_worker import RolloutWorker
+from ray.rllib.env.base_env import BaseEnv
 from ray.rllib.env.external_env import ExternalEnv
 from ray.rllib.tests.test_rollout_worker import (BadPolicy, MockPolicy,
                                                  MockEnv)
+from ray.rllib.utils.policy_client import PolicyClient
+from ray.rllib.utils.policy_server import AsyncPolicyServer
 from ray.tune.registry import register_env
 
 
@@ -113,6 +118,74 @@ class MultiServing(ExternalEnv):
                     del cur_obs[i]
 
 
+class ConcurrentServing(ExternalEnv):
+    def __init__(self, env_creator, num_episodes, batch_wait_ms):
+        self.env_creator = env_creator
+        self.num_episodes = num_episodes
+        env = env_creator()
+        ExternalEnv.__init__(
+            self,
+            env.action_space,
+            env.observation_space,
+            batch_wait_ms=batch_wait_ms)
+
+    def run(self):
+        # Start all episodes before any of them requests an action
+        threads = [
+            threading.Thread(
+                target=self._run_episodes, args=(self.start_episode(), ))
+            for _ in range(self.num_episodes)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def _run_episodes(self, eid):
+        env = self.env_creator()
+        while True:
+            obs = env.reset()
+            done = False
+            while not done:
+                action = self.get_action(eid, obs)
+                obs, reward, done, _ = env.step(action)
+                self.log_returns(eid, reward)
+            self.end_episode(eid, obs)
+            eid = self.start_episode()
+
+
+class AsyncServing(ExternalEnv):
+    def __init__(self, env, port):
+        ExternalEnv.__init__(
+            self, env.action_space, env.observation_space, batch_wait_ms=10)
+        self.port = port
+
+    def run(self):
+        server = AsyncPolicyServer(self, "localhost", self.port)
+        server.serve_forever()
+
+
+def run_batched_client(port, num_episodes):
+    client = PolicyClient("http://localhost:{}".format(port))
+    envs = [MockEnv(25) for _ in range(num_episodes)]
+    while True:
+        try:
+            eids = [client.start_episode() for _ in envs]
+            break
+        except Exception:
+            time.sleep(0.1)  # the server isn't started yet
+    obs = [env.reset() for env in envs]
+    while True:
+        actions = client.get_actions(eids, obs)
+        for i, (env, action) in enumerate(zip(envs, actions)):
+            obs[i], reward, done, _ = env.step(action)
+            client.log_returns(eids[i], reward)
+            if done:
+                client.end_episode(eids[i], obs[i])
+                eids[i] = client.start_episode()
+                obs[i] = env.reset()
+
+
 class TestExternalEnv(unittest.TestCase):
     def testExternalEnvCompleteEpisodes(self):
         ev = RolloutWorker(
@@ -155,6 +228,26 @@ class TestExternalEnv(unittest.TestCase):
             batch_mode="truncate_episodes")
         self.assertRaises(Exception, lambda: ev.sample())
 
+    def testExternalEnvBatchWait(self):
+        env = ConcurrentServing(lambda: MockEnv(25), 4, batch_wait_ms=1000)
+        base_env = BaseEnv.to_base_env(env)
+        obs, _, _, _, _ = base_env.poll()
+        self.assertEqual(len(obs), 4)
+
+    def testAsyncPolicyServer(self):
+        port = 9911
+        client = threading.Thread(target=run_batched_client, args=(port, 4))
+        client.daemon = True
+        client.start()
+        ev = RolloutWorker(
+            env_creator=lambda _: AsyncServing(MockEnv(25), port),
+            policy=MockPolicy,
+            batch_steps=100,
+            batch_mode="complete_episodes")
+        for _ in range(3):
+            batch = ev.sample()
+            self.assertEqual(batch.count, 100)
+
     def testTrainCartpoleOffPolicy(self):
         register_env(
             "test3", lambda _: PartOffPolicyServing(
@@ -1,3 +1,4 @@
+import gc
 import glob
 import gym
 import json
@@ -13,7 +14,10 @@ import ray
 from ray.rllib.agents.pg import PGTrainer
 from ray.rllib.agents.pg.pg_tf_policy import PGTFPolicy
 from ray.rllib.evaluation import SampleBatch
-from ray.rllib.offline import IOContext, JsonWriter, JsonReader
+from ray.rllib.policy.sample_batch import MultiAgentBatch
+from ray.rllib.offline import IOContext, JsonWriter, JsonReader, \
+    ColumnarWriter, ColumnarReader, convert_json_dataset, PrefetchingInput
+from ray.rllib.offline.columnar_reader import read_index
 from ray.rllib.offline.json_writer import _to_json
 from ray.rllib.tests.test_multi_agent_env import MultiCartpole
 from ray.tune.registry import register_env
@@ -316,6 +320,164 @@ class JsonIOTest(unittest.TestCase):
         self.assertRaises(ValueError, lambda: reader.next())
 
 
+class ColumnarIOTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def testReadWrite(self):
+        ioctx = IOContext(self.test_dir, {}, 0, None)
+        writer = ColumnarWriter(self.test_dir, ioctx, max_file_size=5000)
+        for i in range(100):
+            writer.write(make_sample_batch(i))
+        writer.write(SAMPLES)
+        reader = ColumnarReader(self.test_dir)
+        seen_a = set()
+        for i in range(1000):
+            batch = reader.next()
+            seen_a.add(batch["actions"][0])
+            if batch.count == 4:
+                self.assertEqual(batch["eps_id"].tolist(), [1, 1, 2, 3])
+            else:
+                self.assertEqual(batch["obs"].tolist(), [batch["obs"][0]] * 3)
+                # Columns are views of the memory-mapped file
+                self.assertFalse(batch["obs"].flags.writeable)
+        self.assertGreater(len(seen_a), 90)
+        self.assertLess(len(seen_a), 102)
+
+    def testIndex(self):
+        writer = ColumnarWriter(self.test_dir)
+        for i in range(10):
+            writer.write(make_sample_batch(i))
+        path, = glob.glob(self.test_dir + "/*.batches")
+        # Without an index, the records of the file are scanned
+        scanned = read_index(path)
+        self.assertEqual([count for _, count in scanned], [3] * 10)
+        writer.close()
+        self.assertTrue(os.path.exists(path + ".index"))
+        self.assertEqual(read_index(path), scanned)
+
+    def testMultiAgent(self):
+        writer = ColumnarWriter(self.test_dir)
+        p1_batch = SAMPLES.copy()
+        p1_batch["infos"] = [{"a": i} for i in range(4)]
+        writer.write(
+            MultiAgentBatch({
+                "p0": make_sample_batch(0),
+                "p1": p1_batch
+            }, 4))
+        writer.close()
+        batch = ColumnarReader(self.test_dir).next()
+        self.assertEqual(batch.count, 4)
+        self.assertEqual(batch.policy_batches["p0"]["obs"].tolist(), [0] * 3)
+        self.assertEqual(batch.policy_batches["p1"]["eps_id"].tolist(),
+                         [1, 1, 2, 3])
+        # Object columns are pickled
+        self.assertEqual(batch.policy_batches["p1"]["infos"][3], {"a": 3})
+
+    def testConvertJson(self):
+        json_dir = os.path.join(self.test_dir, "json")
+        writer = JsonWriter(json_dir, compress_columns=["obs"])
+        for i in range(10):
+            writer.write(make_sample_batch(i))
+        writer.cur_file.close()
+        columnar_dir = os.path.join(self.test_dir, "columnar")
+        self.assertEqual(convert_json_dataset(json_dir, columnar_dir), 10)
+        reader = ColumnarReader(columnar_dir)
+        seen_o = {reader.next()["obs"][0] for _ in range(10)}
+        self.assertEqual(seen_o, set(range(10)))
+
+
+class PrefetchingInputTest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        writer = JsonWriter(self.test_dir, max_file_size=500)
+        for i in range(100):
+            writer.write(make_sample_batch(i))
+        writer.cur_file.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def testPrefetch(self):
+        reader = PrefetchingInput(
+            lambda: JsonReader(self.test_dir), num_threads=2, queue_size=4)
+        seen_a = set()
+        for i in range(1000):
+            batch = reader.next()
+            self.assertEqual(batch.count, 3)
+            seen_a.add(batch["actions"][0])
+        reader.stop()
+        self.assertGreater(len(seen_a), 90)
+
+    def testShuffleRows(self):
+        reader = PrefetchingInput(
+            lambda: JsonReader(self.test_dir),
+            num_threads=2,
+            shuffle_buffer_size=30,
+            batch_size=5)
+        mixed = 0
+        for i in range(100):
+            batch = reader.next()
+            self.assertEqual(batch.count, 5)
+            # Rows stay aligned across columns
+            self.assertEqual(batch["actions"].tolist(), batch["obs"].tolist())
+            if len(set(batch["actions"])) > 1:
+                mixed += 1
+        reader.stop()
+        self.assertGreater(mixed, 50)
+
+    def testStopsThreadsWhenCollected(self):
+        reader = PrefetchingInput(
+            lambda: JsonReader(self.test_dir), num_threads=2, queue_size=1)
+        reader.next()
+        threads = reader.threads
+        del reader
+        gc.collect()
+        for thread in threads:
+            thread.join(timeout=5.0)
+            self.assertFalse(thread.is_alive())
+
+    def testPropagatesErrors(self):
+        class BadReader:
+            def next(self):
+                raise ValueError("bad input")
+
+        reader = PrefetchingInput(BadReader, num_threads=1)
+        self.assertRaises(ValueError, lambda: reader.next())
+
+    def testShuffleWidensDtype(self):
+        class MixedReader:
+            def __init__(self):
+                self.batches = [
+                    SampleBatch({
+                        "obs": np.zeros((3, 2)),
+                        "rewards": np.array([1, 2, 3])
+                    }),
+                    SampleBatch({
+                        "obs": np.zeros((3, 2)),
+                        "rewards": np.array([0.5, 1.5, 2.5])
+                    }),
+                    SampleBatch({
+                        "obs": np.zeros((3, 4)),
+                        "rewards": np.array([1.0, 2.0, 3.0])
+                    }),
+                ]
+
+            def next(self):
+                return self.batches.pop(0)
+
+        reader = PrefetchingInput(
+            MixedReader, num_threads=1, shuffle_buffer_size=6, batch_size=6)
+        rewards = reader.next()["rewards"]
+        self.assertEqual(sorted(rewards), [0.5, 1, 1.5, 2, 2.5, 3])
+        # Rows of a different shape are rejected
+        self.assertRaisesRegex(ValueError, "shape", lambda: reader.next())
+        reader.stop()
+
+
 if __name__ == "__main__":
     ray.init(num_cpus=1)
     unittest.main(verbosity=2)
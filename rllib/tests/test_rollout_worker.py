@@ -10,10 +10,13 @@ from ray.rllib.agents.pg import PGTrainer
 from ray.rllib.agents.a3c import A2CTrainer
 from ray.rllib.evaluation.rollout_worker import RolloutWorker
 from ray.rllib.evaluation.metrics import collect_metrics
+from ray.rllib.evaluation.sample_batch_builder import SampleBatchBuilder
 from ray.rllib.policy.policy import Policy
 from ray.rllib.evaluation.postprocessing import compute_advantages
 from ray.rllib.policy.sample_batch import DEFAULT_POLICY_ID, SampleBatch
 from ray.rllib.env.vector_env import VectorEnv
+from ray.rllib.env.subproc_vector_env import SubprocVectorEnv
+from ray.rllib.env.base_env import _PipelinedBaseEnv
 from ray.tune.registry import register_env
 
 
@@ -340,6 +343,101 @@ class TestRolloutWorker(unittest.TestCase):
         result = collect_metrics(ev, [])
         self.assertEqual(result["episodes_this_iter"], 8)
 
+    def test_subproc_vector_env(self):
+        ev = RolloutWorker(
+            env_creator=lambda _: gym.make("CartPole-v0"),
+            policy=MockPolicy,
+            batch_mode="truncate_episodes",
+            batch_steps=10,
+            num_envs=4,
+            subproc_worker_envs=True)
+        vector_env = ev.async_env.vector_env
+        self.assertIsInstance(vector_env, SubprocVectorEnv)
+        for _ in range(4):
+            batch = ev.sample()
+            self.assertEqual(batch.count, 40)
+            self.assertEqual(batch["obs"].shape, (40, 4))
+        vector_env.close()
+
+    def test_subproc_vector_env_errors(self):
+        env = SubprocVectorEnv(
+            lambda _: FailOnStepEnv(),
+            2,
+            action_space=gym.spaces.Discrete(2),
+            observation_space=gym.spaces.Discrete(1))
+        self.assertRaises(ValueError, lambda: env.vector_reset())
+
+    def test_pipelined_envs(self):
+        ev = RolloutWorker(
+            env_creator=lambda cfg: MockEnv(episode_length=20, config=cfg),
+            policy=MockPolicy,
+            batch_mode="truncate_episodes",
+            batch_steps=2,
+            num_envs=8,
+            pipeline_worker_envs=True)
+        self.assertIsInstance(ev.async_env, _PipelinedBaseEnv)
+        for _ in range(16):
+            batch = ev.sample()
+            self.assertEqual(batch.count, 16)
+        result = collect_metrics(ev, [])
+        self.assertGreaterEqual(result["episodes_this_iter"], 8)
+        self.assertIn("mean_background_env_ms", result["sampler_perf"])
+        indices = [
+            env.unwrapped.config.vector_index
+            for env in ev.async_env.get_unwrapped()
+        ]
+        self.assertEqual(indices, [0, 1, 2, 3, 4, 5, 6, 7])
+
+    def test_preallocated_sample_buffers(self):
+        ev = RolloutWorker(
+            env_creator=lambda _: MockEnv(episode_length=10),
+            policy=MockPolicy,
+            batch_mode="truncate_episodes",
+            batch_steps=4,
+            num_envs=2,
+            preallocate_sample_buffers=True)
+        expected = RolloutWorker(
+            env_creator=lambda _: MockEnv(episode_length=10),
+            policy=MockPolicy,
+            batch_mode="truncate_episodes",
+            batch_steps=4,
+            num_envs=2)
+        for _ in range(5):
+            batch = ev.sample()
+            expected_batch = expected.sample()
+            self.assertEqual(batch.count, 8)
+            for k in ["obs", "actions", "rewards", "dones", "t"]:
+                self.assertEqual(batch[k].dtype, expected_batch[k].dtype)
+                self.assertEqual(batch[k].tolist(),
+                                 expected_batch[k].tolist())
+
+    def test_sample_batch_builder_growth(self):
+        builder = SampleBatchBuilder(capacity=2)
+        for i in range(5):
+            builder.add_values(
+                obs=np.array([i, i], dtype=np.float32),
+                rewards=i,
+                infos={"i": i})
+        builder.add_values(obs=np.array([5, 5]), rewards=0.5, infos={})
+        self.assertEqual(builder.columns["obs"].shape, (8, 2))
+        batch = builder.build_and_reset()
+        self.assertEqual(batch.count, 6)
+        self.assertEqual(batch["obs"].dtype, np.float32)
+        self.assertEqual(batch["obs"][:, 0].tolist(), [0, 1, 2, 3, 4, 5])
+        # Floats added to an integer column promote it
+        self.assertEqual(batch["rewards"].tolist(), [0, 1, 2, 3, 4, 0.5])
+        self.assertEqual(batch["infos"][1], {"i": 1})
+        # Wider integers promote the column instead of overflowing
+        builder.add_values(a=np.int32(1))
+        builder.add_values(a=np.int64(2**40))
+        batch = builder.build_and_reset()
+        self.assertEqual(batch["a"].tolist(), [1, 2**40])
+        # Values of varying shape fall back to a list
+        builder.add_values(obs=np.zeros(2))
+        builder.add_values(obs=np.zeros(3))
+        self.assertNotIn("obs", builder.columns)
+        self.assertEqual(len(builder.buffers["obs"]), 2)
+
     def test_truncate_episodes(self):
         ev = RolloutWorker(
             env_creator=lambda _: MockEnv(10),
@@ -8,7 +8,7 @@ from ray.rllib.utils.filter import Filter
 from ray.rllib.utils.numpy import sigmoid, softmax, relu, one_hot, fc, lstm, \
     SMALL_NUMBER, LARGE_INTEGER
 from ray.rllib.utils.policy_client import PolicyClient
-from ray.rllib.utils.policy_server import PolicyServer
+from ray.rllib.utils.policy_server import PolicyServer, AsyncPolicyServer
 from ray.rllib.utils.test_utils import check
 from ray.tune.utils import merge_dicts, deep_update
 
@@ -53,6 +53,7 @@ __all__ = [
     "LARGE_INTEGER",
     "PolicyClient",
     "PolicyServer",
+    "AsyncPolicyServer",
     "PublicAPI",
     "SMALL_NUMBER",
 ]
@@ -1,5 +1,6 @@
 import logging
 import pickle
+import threading
 
 from ray.rllib.utils.annotations import PublicAPI
 
@@ -16,10 +17,14 @@ except ImportError:
 
 @PublicAPI
 class PolicyClient:
-    """REST client to interact with a RLlib policy server."""
+    """REST client to interact with a RLlib policy server.
+
+    Connections to the server are kept alive between requests, with one
+    connection per client thread."""
 
     START_EPISODE = "START_EPISODE"
     GET_ACTION = "GET_ACTION"
+    GET_ACTIONS = "GET_ACTIONS"
     LOG_ACTION = "LOG_ACTION"
     LOG_RETURNS = "LOG_RETURNS"
     END_EPISODE = "END_EPISODE"
@@ -27,6 +32,7 @@ class PolicyClient:
     @PublicAPI
     def __init__(self, address):
         self._address = address
+        self._local = threading.local()
 
     @PublicAPI
     def start_episode(self, episode_id=None, training_enabled=True):
@@ -65,6 +71,26 @@ class PolicyClient:
             "episode_id": episode_id,
         })["action"]
 
+    @PublicAPI
+    def get_actions(self, episode_ids, observations):
+        """Record observations of several episodes and get their actions.
+
+        This sends a single request, and the actions of the episodes are
+        computed concurrently by the server.
+
+        Arguments:
+            episode_ids (list): Episode ids returned from start_episode().
+            observations (list): Current observation of each episode.
+
+        Returns:
+            actions (list): Action of each episode.
+        """
+        return self._send({
+            "command": PolicyClient.GET_ACTIONS,
+            "observations": list(observations),
+            "episode_ids": list(episode_ids),
+        })["actions"]
+
     @PublicAPI
     def log_action(self, episode_id, observation, action):
         """Record an observation and (off-policy) action taken.
@@ -116,7 +142,11 @@ class PolicyClient:
 
     def _send(self, data):
         payload = pickle.dumps(data)
-        response = requests.post(self._address, data=payload)
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        response = session.post(self._address, data=payload)
         if response.status_code != 200:
             logger.error("Request failed {}: {}".format(response.text, data))
         response.raise_for_status()
@@ -1,4 +1,7 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import pickle
+import threading
 import traceback
 
 from http.server import SimpleHTTPRequestHandler, HTTPServer
@@ -48,40 +51,199 @@ class PolicyServer(ThreadingMixIn, HTTPServer):
         HTTPServer.__init__(self, (address, port), handler)
 
 
+@PublicAPI
+class AsyncPolicyServer:
+    """Asyncio REST server that can be launched from a ExternalEnv.
+
+    This serves the same requests as PolicyServer, but handles all client
+    connections on a single event loop instead of a thread per connection,
+    and keeps HTTP/1.1 connections alive between requests. Commands are run
+    on a thread pool, so that pending get_action() calls of many episodes
+    wait concurrently. To compute their actions in one batched forward pass,
+    create the ExternalEnv with a `batch_wait_ms` window.
+
+    Clients can also send the observations of several episodes at once with
+    PolicyClient.get_actions().
+
+    Examples:
+        >>> class CartpoleServing(ExternalEnv):
+               def __init__(self):
+                   ExternalEnv.__init__(
+                       self, spaces.Discrete(2),
+                       spaces.Box(
+                           low=-10,
+                           high=10,
+                           shape=(4,),
+                           dtype=np.float32),
+                       max_concurrent=1000,
+                       batch_wait_ms=5)
+               def run(self):
+                   server = AsyncPolicyServer(self, "localhost", 8900)
+                   server.serve_forever()
+    """
+
+    @PublicAPI
+    def __init__(self, external_env, address, port, num_threads=None):
+        """Initialize an AsyncPolicyServer.
+
+        Arguments:
+            external_env (ExternalEnv): the env to forward requests to.
+            address (str): the address to listen on.
+            port (int): the port to listen on.
+            num_threads (int): number of threads that run commands. Defaults
+                to the max number of concurrent episodes of the env.
+        """
+        self.external_env = external_env
+        self.address = address
+        self.port = port
+        self.executor = ThreadPoolExecutor(
+            num_threads or external_env._max_concurrent_episodes)
+        self.loop = None
+
+    @PublicAPI
+    def serve_forever(self):
+        """Serves requests until shutdown() is called."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(
+            asyncio.start_server(self._handle_connection, self.address,
+                                 self.port))
+        try:
+            self.loop.run_forever()
+        finally:
+            server.close()
+            self.loop.run_until_complete(server.wait_closed())
+            self.loop.close()
+            self.executor.shutdown(wait=False)
+
+    @PublicAPI
+    def shutdown(self):
+        """Stops serve_forever(). Can be called from any thread."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(
+                    int(headers.get("content-length", 0)))
+                method, _, version = request_line.decode(
+                    "latin-1").strip().split(" ", 2)
+                if method != "POST":
+                    status, payload = "501 Not Implemented", b""
+                else:
+                    try:
+                        response = await self._execute(pickle.loads(body))
+                        status, payload = "200 OK", pickle.dumps(response)
+                    except Exception:
+                        status = "500 Internal Server Error"
+                        payload = traceback.format_exc().encode("utf-8")
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" or (
+                    version == "HTTP/1.1" and connection != "close")
+                writer.write("HTTP/1.1 {}\r\nContent-Length: {}\r\n"
+                             "Connection: {}\r\n\r\n".format(
+                                 status, len(payload), "keep-alive"
+                                 if keep_alive else "close").encode("latin-1"))
+                writer.write(payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # client disconnected or sent a malformed request
+        finally:
+            writer.close()
+
+    async def _execute(self, args):
+        loop = asyncio.get_event_loop()
+        if args["command"] == PolicyClient.GET_ACTIONS:
+            actions = await asyncio.gather(*[
+                loop.run_in_executor(self.executor,
+                                     self.external_env.get_action, eid, obs)
+                for eid, obs in zip(args["episode_ids"], args["observations"])
+            ])
+            return {"actions": list(actions)}
+        return await loop.run_in_executor(self.executor, _execute_command,
+                                          self.external_env, args)
+
+
 def _make_handler(external_env):
     class Handler(SimpleHTTPRequestHandler):
+        # Keep connections alive between the requests of a client
+        protocol_version = "HTTP/1.1"
+
         def do_POST(self):
             content_len = int(self.headers.get("Content-Length"), 0)
             raw_body = self.rfile.read(content_len)
             parsed_input = pickle.loads(raw_body)
             try:
-                response = self.execute_command(parsed_input)
+                response = pickle.dumps(
+                    _execute_command(external_env, parsed_input))
                 self.send_response(200)
+                self.send_header("Content-Length", len(response))
                 self.end_headers()
-                self.wfile.write(pickle.dumps(response))
+                self.wfile.write(response)
             except Exception:
                 self.send_error(500, traceback.format_exc())
 
-        def execute_command(self, args):
-            command = args["command"]
-            response = {}
-            if command == PolicyClient.START_EPISODE:
-                response["episode_id"] = external_env.start_episode(
-                    args["episode_id"], args["training_enabled"])
-            elif command == PolicyClient.GET_ACTION:
-                response["action"] = external_env.get_action(
-                    args["episode_id"], args["observation"])
-            elif command == PolicyClient.LOG_ACTION:
-                external_env.log_action(args["episode_id"],
-                                        args["observation"], args["action"])
-            elif command == PolicyClient.LOG_RETURNS:
-                external_env.log_returns(args["episode_id"], args["reward"],
-                                         args["info"])
-            elif command == PolicyClient.END_EPISODE:
-                external_env.end_episode(args["episode_id"],
-                                         args["observation"])
-            else:
-                raise Exception("Unknown command: {}".format(command))
-            return response
-
     return Handler
+
+
+def _execute_command(external_env, args):
+    command = args["command"]
+    response = {}
+    if command == PolicyClient.START_EPISODE:
+        response["episode_id"] = external_env.start_episode(
+            args["episode_id"], args["training_enabled"])
+    elif command == PolicyClient.GET_ACTION:
+        response["action"] = external_env.get_action(args["episode_id"],
+                                                     args["observation"])
+    elif command == PolicyClient.GET_ACTIONS:
+        response["actions"] = _get_actions(
+            external_env, args["episode_ids"], args["observations"])
+    elif command == PolicyClient.LOG_ACTION:
+        external_env.log_action(args["episode_id"], args["observation"],
+                                args["action"])
+    elif command == PolicyClient.LOG_RETURNS:
+        external_env.log_returns(args["episode_id"], args["reward"],
+                                 args["info"])
+    elif command == PolicyClient.END_EPISODE:
+        external_env.end_episode(args["episode_id"], args["observation"])
+    else:
+        raise Exception("Unknown command: {}".format(command))
+    return response
+
+
+def _get_actions(external_env, episode_ids, observations):
+    # The episodes must wait for their actions concurrently, so that the
+    # sampler can compute them together
+    actions = [None] * len(episode_ids)
+    errors = []
+
+    def get_action(i):
+        try:
+            actions[i] = external_env.get_action(episode_ids[i],
+                                                 observations[i])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=get_action, args=(i, ))
+        for i in range(len(episode_ids))
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+    return actions
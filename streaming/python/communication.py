@@ -1,9 +1,14 @@
+import collections
+import functools
 import hashlib
+import io
 import logging
 import pickle
+import struct
 import sys
 import time
 
+import numpy as np
 import ray
 import ray.streaming.runtime.transfer as transfer
 from ray.streaming.config import Config
@@ -21,10 +26,48 @@ forward_broadcast_strategies = [PStrategy.Forward, PStrategy.Broadcast]
 def _hash(value):
     if isinstance(value, int):
         return value
+    return _hash_bytes(value)
+
+
+# Hashes of str/bytes keys are cached since keys usually repeat (e.g. words)
+# The digest is truncated to 63 bits so that hashes fit in a NumPy int64
+@functools.lru_cache(maxsize=2**16)
+def _hash_bytes(value):
     try:
-        return int(hashlib.sha1(value.encode("utf-8")).hexdigest(), 16)
+        digest = hashlib.sha1(value.encode("utf-8")).digest()
     except AttributeError:
-        return int(hashlib.sha1(value).hexdigest(), 16)
+        digest = hashlib.sha1(value).digest()
+    return int.from_bytes(digest[:8], "big") >> 1
+
+
+# Used to choose output channels for a batch of keys in one call
+def _hash_batch(keys):
+    """Returns the hashes of the given keys as a NumPy array.
+
+    Integer NumPy (or Arrow) arrays are used as they are, which is
+    consistent with _hash() for integer keys.
+    """
+    if hasattr(keys, "to_numpy"):  # e.g. pyarrow.Array
+        keys = keys.to_numpy()
+    if isinstance(keys, np.ndarray) and keys.dtype.kind in "iu":
+        return keys
+    hashes = [_hash(key) for key in keys]
+    try:
+        return np.array(hashes, dtype=np.int64)
+    except OverflowError:  # Integer keys that do not fit in 64 bits
+        return np.array(hashes, dtype=object)
+
+
+# Splits the positions of a batch of records by target instance
+def _split_by_instance(hashes, num_instances):
+    """Returns a list with the positions of the records that must be sent
+    to each of the given number of instances, in their original order."""
+    instances = hashes % num_instances
+    if instances.dtype == object:
+        instances = instances.astype(np.int64)
+    order = np.argsort(instances, kind="stable")
+    bounds = np.cumsum(np.bincount(instances, minlength=num_instances))
+    return np.split(order, bounds[:-1])
 
 
 class DataChannel:
@@ -55,6 +98,37 @@ class DataChannel:
 
 
 _CLOSE_FLAG = b" "
+# Prefix of checkpoint barriers, followed by the checkpoint id
+_BARRIER_FLAG = b"B"
+
+
+def _pack_barrier(checkpoint_id):
+    return _BARRIER_FLAG + struct.pack(">q", checkpoint_id)
+
+
+def _unpack_barrier(msg_data):
+    return struct.unpack(">q", msg_data[1:])[0]
+
+
+# Packs a list of pickled records into a single frame
+def _pack_frame(serialized_records):
+    """Concatenates the given pickled records into a single frame.
+
+    A frame is a sequence of independent pickles, so it can be unpacked
+    without knowing the number or the size of the records it contains.
+    """
+    return b"".join(serialized_records)
+
+
+# Unpacks a frame created by _pack_frame
+def _unpack_frame(frame):
+    """Returns the list of records contained in the given frame."""
+    records = []
+    size = len(frame)
+    buffer = io.BytesIO(frame)
+    while buffer.tell() < size:
+        records.append(pickle.load(buffer))
+    return records
 
 
 # Pulls and merges data from multiple input channels
@@ -72,6 +146,21 @@ class DataInput:
          has been marked as 'closed'.
          all_closed (bool): Denotes whether all input channels have been
          closed (True) or not (False).
+         batching (bool): Denotes whether upstream instances write batched
+         frames (True) or single records (False).
+         pending (deque): Records of the last unpacked frame that have not
+         been pulled yet.
+         on_barrier (function): Called with the checkpoint id once a
+         checkpoint barrier has been received from all open channels.
+         barriers (dict): A mapping from channel ids to the checkpoint id
+         of the barrier received from the channel. Messages from these
+         channels are held back until the barrier is aligned.
+         held (deque): (channel id, message) pairs held back during the
+         alignment of a barrier.
+         released (deque): (channel id, message) pairs held back during the
+         alignment of the last barrier that have not been pulled yet.
+         on_idle (function): Called repeatedly while no message is
+         available, e.g. to flush lingering output buffers.
     """
 
     def __init__(self, env, channels):
@@ -83,6 +172,13 @@ class DataInput:
         self.max_index = len(channels)
         # Tracks the channels that have been closed. qid: close status
         self.closed = {}
+        self.batching = env.config.batching_enabled()
+        self.pending = collections.deque()
+        self.on_barrier = None
+        self.barriers = {}
+        self.held = collections.deque()
+        self.released = collections.deque()
+        self.on_idle = None
 
     def init(self):
         channels = [c.str_qid for c in self.input_channels]
@@ -100,20 +196,71 @@ class DataInput:
         self.reader = transfer.DataReader(channels, input_actors, conf)
 
     def pull(self):
+        while True:
+            # Drain the last unpacked frame first
+            if self.pending:
+                return self.pending.popleft()
+            channel_id, msg_data = self._read()
+            if channel_id in self.barriers:
+                # Wait for the barrier of the other channels
+                self.held.append((channel_id, msg_data))
+            elif msg_data == _CLOSE_FLAG:
+                self.closed[channel_id] = True
+                if len(self.closed) == len(self.input_channels):
+                    return None
+                self._align_barriers()
+            elif msg_data[:1] == _BARRIER_FLAG:
+                self.barriers[channel_id] = _unpack_barrier(msg_data)
+                self._align_barriers()
+            elif self.batching:
+                self.pending.extend(_unpack_frame(msg_data))
+            else:
+                return pickle.loads(msg_data)
+
+    # Returns the next (channel id, message) pair
+    def _read(self):
+        if self.released:
+            return self.released.popleft()
         # pull from channel
         item = self.reader.read(100)
         while item is None:
+            if self.on_idle is not None:
+                self.on_idle()
             time.sleep(0.001)
             item = self.reader.read(100)
-        msg_data = item.body()
-        if msg_data == _CLOSE_FLAG:
-            self.closed[item.channel_id] = True
-            if len(self.closed) == len(self.input_channels):
-                return None
-            else:
-                return self.pull()
-        else:
-            return pickle.loads(msg_data)
+        return item.channel_id(), item.body()
+
+    # Triggers the checkpoint once all open channels delivered its barrier
+    def _align_barriers(self):
+        if not self.barriers:
+            return
+        if len(self.barriers) + len(self.closed) < len(self.input_channels):
+            return
+        checkpoint_id = max(self.barriers.values())
+        self.barriers = {}
+        self.released.extend(self.held)
+        self.held.clear()
+        if self.on_barrier is not None:
+            self.on_barrier(checkpoint_id)
+
+    def pull_batch(self):
+        """Returns the next record together with the records that remain
+        in the frame it was unpacked from, or None if all input channels
+        have been closed. Blocks until a record is available. Records of
+        other frames are not included, even if they are already available,
+        so a batch never spans more than one frame."""
+        record = self.pull()
+        if record is None:
+            return None
+        batch = [record]
+        batch.extend(self.pending)
+        self.pending.clear()
+        return batch
+
+    def get_metrics(self):
+        """Returns a mapping from channel ids to the metrics of the
+        channel (see: ChannelMetrics in transfer.py)."""
+        return self.reader.get_metrics()
 
     def close(self):
         self.reader.stop()
@@ -138,6 +285,21 @@ class DataOutput:
          one shuffle_channel.
          shuffle_key_exists (bool): A flag indicating that there exists at
          least one shuffle_key_channel.
+         batching (bool): A flag indicating that records are buffered per
+         output channel and written as frames (see: Conf in streaming.py).
+         batches (dict): A mapping from channel ids to the pickled records
+         buffered for the channel.
+         batch_bytes (dict): A mapping from channel ids to the total size
+         of the records buffered for the channel.
+         linger_deadline (float): The time by which all buffered records
+         must be flushed, or None if no record is buffered.
+         barrier_interval (int): The number of records pushed between two
+         checkpoint barriers, or 0 if the gate does not inject barriers
+         (see: set_barrier_interval()).
+         backpressure_threshold (float): The fill level of a channel's
+         ring buffer (as a fraction of its capacity) above which writes to
+         the channel wait for the downstream instance to catch up, or None
+         to disable backpressure in the gate.
     """
 
     def __init__(self, env, channels, partitioning_schemes):
@@ -145,6 +307,18 @@ class DataOutput:
         self.env = env
         self.writer = None  # created in `init` method
         self.channels = channels
+        self.batching = env.config.batching_enabled()
+        self.batch_max_records = env.config.batch_max_records
+        self.batch_max_bytes = env.config.batch_max_bytes
+        self.batch_linger_s = env.config.batch_linger_ms / 1000
+        self.batches = {}
+        self.batch_bytes = {}
+        self.linger_deadline = None
+        self.backpressure_threshold = env.config.backpressure_threshold
+        self.barrier_interval = 0
+        self.records_since_barrier = 0
+        self.next_checkpoint_id = 1
+        self.on_checkpoint = None
         self.key_selector = None
         self.round_robin_indexes = [0]
         self.partitioning_schemes = partitioning_schemes
@@ -218,14 +392,88 @@ class DataOutput:
         }
         self.writer = transfer.DataWriter(channel_ids, to_actors, conf)
 
+    # Writes a message to a channel once the channel has enough credit
+    def _write(self, qid, msg_data):
+        if self.backpressure_threshold:
+            self._wait_for_credit(qid)
+        self.writer.write(qid, msg_data)
+
+    # Blocks while the ring buffer of the channel is saturated. Sleeping
+    # releases the GIL, so the actor can still serve other calls
+    def _wait_for_credit(self, qid):
+        size, capacity = self.writer.buffer_usage(qid)
+        limit = capacity * self.backpressure_threshold
+        if size < limit:
+            return
+        metrics = self.writer.get_metrics()[qid.channel_id_str]
+        metrics.backpressure_count += 1
+        start = time.time()
+        delay = 1e-5
+        while size >= limit:
+            time.sleep(delay)
+            delay = min(2 * delay, 1e-3)
+            size, _ = self.writer.buffer_usage(qid)
+        metrics.backpressure_time += time.time() - start
+
+    def is_backpressured(self):
+        """Returns True if any output channel is saturated, so that callers
+        (e.g. sources) can do other work instead of blocking in push()."""
+        if not self.backpressure_threshold:
+            return False
+        for c in self.channels:
+            size, capacity = self.writer.buffer_usage(c.qid)
+            if size >= capacity * self.backpressure_threshold:
+                return True
+        return False
+
+    def get_metrics(self):
+        """Returns a mapping from channel ids to the metrics of the
+        channel (see: ChannelMetrics in transfer.py)."""
+        for c in self.channels:
+            self.writer.buffer_usage(c.qid)  # Refreshes the queue depth
+        return self.writer.get_metrics()
+
+    def set_barrier_interval(self, barrier_interval, on_checkpoint=None):
+        """Injects a checkpoint barrier after every `barrier_interval`
+        pushed records. Used by the output gates of sources.
+
+        Attributes:
+             barrier_interval (int): The number of records between two
+             barriers. A value of 0 disables barriers.
+             on_checkpoint (function): Called with the checkpoint id right
+             before a barrier is emitted.
+        """
+        self.barrier_interval = barrier_interval
+        self.on_checkpoint = on_checkpoint
+
+    def _count_records(self, num_records):
+        self.records_since_barrier += num_records
+        if self.records_since_barrier >= self.barrier_interval:
+            checkpoint_id = self.next_checkpoint_id
+            self.next_checkpoint_id += 1
+            self.records_since_barrier = 0
+            if self.on_checkpoint is not None:
+                self.on_checkpoint(checkpoint_id)
+            self.emit_barrier(checkpoint_id)
+
+    def emit_barrier(self, checkpoint_id):
+        """Writes a checkpoint barrier to all output channels, after all
+        records that have been pushed before it."""
+        self.flush()
+        msg_data = _pack_barrier(checkpoint_id)
+        for c in self.channels:
+            self._write(c.qid, msg_data)
+
     def close(self):
         """Close the channel (True) by propagating _CLOSE_FLAG
 
         _CLOSE_FLAG is used as special type of record that is propagated from
          sources to sink to notify that the end of data in a stream.
+         Buffered records are flushed before the flag is written.
         """
+        self.flush()
         for c in self.channels:
-            self.writer.write(c.qid, _CLOSE_FLAG)
+            self._write(c.qid, _CLOSE_FLAG)
         # must ensure DataWriter send None flag to peer actor
         self.writer.stop()
 
@@ -270,10 +518,132 @@ class DataOutput:
             pass
 
         msg_data = pickle.dumps(record)
+        if self.batching:
+            self._batch(target_channels, msg_data)
+        else:
+            for c in target_channels:
+                # send data to channel
+                self._write(c.qid, msg_data)
+        if self.barrier_interval:
+            self._count_records(1)
+
+    # Buffers a pickled record for the given channels and writes out
+    # the buffers that are full or have been lingering for too long
+    def _batch(self, target_channels, msg_data):
+        now = time.time()
+        if self.linger_deadline is None:
+            self.linger_deadline = now + self.batch_linger_s
         for c in target_channels:
-            # send data to channel
-            self.writer.write(c.qid, msg_data)
+            self._append_to_batch(c.qid, msg_data)
+        if now >= self.linger_deadline:
+            self.flush()
+
+    def _append_to_batch(self, qid, msg_data):
+        batch = self.batches.setdefault(qid, [])
+        batch.append(msg_data)
+        num_bytes = self.batch_bytes.get(qid, 0) + len(msg_data)
+        self.batch_bytes[qid] = num_bytes
+        if (len(batch) >= self.batch_max_records
+                or num_bytes >= self.batch_max_bytes):
+            self._flush_channel(qid)
+
+    def _flush_channel(self, qid):
+        batch = self.batches.pop(qid, None)
+        self.batch_bytes.pop(qid, None)
+        if batch:
+            self._write(qid, _pack_frame(batch))
+
+    def flush(self):
+        """Writes all buffered records to their channels."""
+        for qid in list(self.batches):
+            self._flush_channel(qid)
+        self.linger_deadline = None
+
+    def flush_expired(self):
+        """Writes all buffered records if they have been lingering for
+        longer than `batch_linger_ms`. Called while the instance waits for
+        input, so that records are not held back by an idle upstream."""
+        if (self.linger_deadline is not None
+                and time.time() >= self.linger_deadline):
+            self.flush()
 
     def push_all(self, records):
+        # Records shuffled by key are partitioned in one vectorized call
+        if self._only_shuffle_by_key():
+            records = list(records)
+            self.push_keyed_batch([key for key, _ in records], records)
+            return
         for record in records:
             self.push(record)
+
+    def _only_shuffle_by_key(self):
+        return (self.shuffle_key_exists and not self.forward_channels
+                and not self.round_robin_channels)
+
+    def push_keyed_batch(self, keys, records):
+        """Shuffles a batch of (key, value) records by key.
+
+        Attributes:
+             keys (list|ndarray): The key of each record. Integer NumPy or
+             Arrow arrays are partitioned without any per-key Python call.
+             records (list): The records to push.
+        """
+        if not self._only_shuffle_by_key() or len(records) <= 1:
+            for record in records:
+                self.push(record)
+            return
+        hashes = _hash_batch(keys)
+        msgs = [pickle.dumps(record) for record in records]
+        if self.batching:
+            if self.linger_deadline is None:
+                self.linger_deadline = time.time() + self.batch_linger_s
+        for channels in self.shuffle_key_channels:
+            positions = _split_by_instance(hashes, len(channels))
+            for c, channel_positions in zip(channels, positions):
+                for i in channel_positions:
+                    if self.batching:
+                        self._append_to_batch(c.qid, msgs[i])
+                    else:
+                        self._write(c.qid, msgs[i])
+        if self.batching and time.time() >= self.linger_deadline:
+            self.flush()
+        if self.barrier_interval:
+            self._count_records(len(records))
+
+
+# Hands records to the next operator of a chain
+class ChainedOutput:
+    """An output gate that connects two chained operator instances.
+
+    Instead of serializing records and writing them to a channel, the gate
+    passes each record to the next processor of the chain, which runs in
+    the same actor.
+
+    Attributes:
+         processor: The processor of the downstream operator instance.
+         output_gate: The output gate of the downstream operator instance.
+    """
+
+    def __init__(self, processor, output_gate):
+        self.processor = processor
+        self.output_gate = output_gate
+
+    def push(self, record):
+        self.processor.process(record, self.output_gate)
+
+    def push_all(self, records):
+        process_batch = getattr(self.processor, "process_batch", None)
+        if process_batch is not None:
+            process_batch(list(records), self.output_gate)
+            return
+        for record in records:
+            self.processor.process(record, self.output_gate)
+
+    def push_keyed_batch(self, keys, records):
+        self.push_all(records)
+
+    # Called once the upstream operator instance has finished
+    def finish(self):
+        finish = getattr(self.processor, "finish", None)
+        if finish is not None:
+            finish(self.output_gate)
@@ -19,5 +19,13 @@ class Config:
     # interval.
     STREAMING_EMPTY_MESSAGE_INTERVAL = "streaming.empty_message_interval"
 
+    # micro-batching of records in DataOutput/DataInput
+    BATCH_MAX_BYTES_DEFAULT = 2**20
+    BATCH_LINGER_MS_DEFAULT = 10
+
+    # keyed state backends and checkpointing
+    MEMORY_STATE_BACKEND = "memory"
+    SQLITE_STATE_BACKEND = "sqlite"
+
     # operator type
     OPERATOR_TYPE = "operator_type"
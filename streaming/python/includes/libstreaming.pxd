@@ -143,6 +143,8 @@ cdef extern from "data_writer.h" namespace "ray::streaming" nogil:
                               const c_vector[uint64_t] &queue_size_vec);
         long WriteMessageToBufferRing(
                 const CObjectID &q_id, uint8_t *data, uint32_t data_size)
+        CStreamingStatus GetRingBufferUsage(const CObjectID &q_id,
+                                            size_t &size, size_t &capacity)
         void Run()
         void Stop()
 
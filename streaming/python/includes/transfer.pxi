@@ -201,6 +201,19 @@ cdef class DataWriter:
             msg_id = self.writer.WriteMessageToBufferRing(native_id, data, size)
         return msg_id
 
+    def buffer_usage(self, ObjectID qid):
+        """Returns the number of messages in the ring buffer of the channel
+        and the capacity of the ring buffer"""
+        cdef:
+            CObjectID native_id = qid.data
+            size_t size
+            size_t capacity
+            CStreamingStatus status
+        status = self.writer.GetRingBufferUsage(native_id, size, capacity)
+        if <uint32_t> status != <uint32_t> libstreaming.StatusOK:
+            raise Exception("unknown output channel {}".format(qid))
+        return size, capacity
+
     def stop(self):
         self.writer.Stop()
         channel_logger.info("stopped DataWriter")
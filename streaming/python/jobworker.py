@@ -7,6 +7,8 @@ import ray.streaming._streaming as _streaming
 from ray.streaming.config import Config
 from ray.function_manager import FunctionDescriptor
 from ray.streaming.communication import DataInput, DataOutput
+from ray.streaming.state import create_checkpoint_log
+from ray.streaming.state import create_state_backend
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,13 @@ class JobWorker:
         output_channels (DataOutput): The output gate that manages output
          channels of the instance (see: DataOutput in communication.py).
         the operator instance.
+        state_backends (list): The backends of the keyed state and the
+        source positions of the instance (see: state.py).
+        checkpoint_log (CheckpointLog): Records the checkpoints that are
+        complete on all instances of the job, or None if the state is not
+        persisted (see: state.py).
+        restored_checkpoint_id (int): The latest complete checkpoint when
+        the instance was initialized, which all backends restore.
     """
 
     def __init__(self, worker_id, operator, input_channels, output_channels):
@@ -38,6 +47,9 @@ class JobWorker:
         self.output_gate = None
         self.reader_client = None
         self.writer_client = None
+        self.state_backends = []
+        self.checkpoint_log = None
+        self.restored_checkpoint_id = None
 
     def init(self, env):
         """init streaming actor"""
@@ -63,14 +75,36 @@ class JobWorker:
                 self.__class__.__name__)
             self.writer_client = _streaming.WriterClient(
                 core_worker, writer_async_func, writer_sync_func)
+        # All instances restore the latest checkpoint that every instance
+        # has snapshotted, and drop their snapshots of later checkpoints
+        self.checkpoint_log = create_checkpoint_log(
+            env.config, env.job_id,
+            len(env.execution_graph.actor_handles))
+        if self.checkpoint_log is not None:
+            self.restored_checkpoint_id = \
+                self.checkpoint_log.latest_complete()
+            self.checkpoint_log.discard_after(self._instance_name(),
+                                              self.restored_checkpoint_id)
+        # Keyed state is restored here if the actor has been restarted
+        if hasattr(self.processor_instance, "init_state"):
+            self.processor_instance.init_state(self._create_state_backend)
         if len(self.input_channels) > 0:
             self.input_gate = DataInput(env, self.input_channels)
+            self.input_gate.on_barrier = self._on_barrier
             self.input_gate.init()
         if len(self.output_channels) > 0:
             self.output_gate = DataOutput(
                 env, self.output_channels,
                 self.operator.partitioning_strategies)
+            if self.input_gate is None:  # Sources inject the barriers
+                self.output_gate.set_barrier_interval(
+                    env.config.checkpoint_interval, self._snapshot)
+                if self.restored_checkpoint_id is not None:
+                    self.output_gate.next_checkpoint_id = \
+                        self.restored_checkpoint_id + 1
             self.output_gate.init()
+        if self.input_gate is not None:
+            self.input_gate.on_idle = self._on_idle
         logger.info("init operator instance %s succeed", self.processor_name)
         return True
 
@@ -93,10 +127,60 @@ class JobWorker:
             self.input_gate.close()
         if self.output_gate:
             self.output_gate.close()
+        for state_backend in self.state_backends:
+            state_backend.close()
+
+    def _instance_name(self):
+        return "{}-{}".format(*self.worker_id)
+
+    def _create_state_backend(self, operator_id):
+        state_backend = create_state_backend(
+            self.env.config, self.env.job_id, operator_id, self.worker_id[1],
+            self.restored_checkpoint_id)
+        self.state_backends.append(state_backend)
+        return state_backend
+
+    def _snapshot(self, checkpoint_id):
+        # Lets sources record their read position in their state
+        snapshot_state = getattr(self.processor_instance, "snapshot_state",
+                                 None)
+        if snapshot_state is not None:
+            snapshot_state()
+        for state_backend in self.state_backends:
+            state_backend.snapshot(checkpoint_id)
+        if self.checkpoint_log is not None:
+            complete = self.checkpoint_log.ack(self._instance_name(),
+                                               checkpoint_id)
+            for state_backend in self.state_backends:
+                state_backend.release(complete)
+
+    # Called by the input gate while it waits for input
+    def _on_idle(self):
+        if self.output_gate is not None and self.output_gate.batching:
+            self.output_gate.flush_expired()
+        on_timer = getattr(self.processor_instance, "on_timer", None)
+        if on_timer is not None:
+            on_timer(self.output_gate)
+
+    # Called by the input gate once a barrier is aligned
+    def _on_barrier(self, checkpoint_id):
+        self._snapshot(checkpoint_id)
+        if self.output_gate:
+            self.output_gate.emit_barrier(checkpoint_id)
 
     def is_finished(self):
         return not self.t.is_alive()
 
+    def get_metrics(self):
+        """Returns the metrics of the input and output channels of the
+        instance (see: ChannelMetrics in transfer.py)."""
+        metrics = {"input": {}, "output": {}}
+        if self.input_gate:
+            metrics["input"] = self.input_gate.get_metrics()
+        if self.output_gate:
+            metrics["output"] = self.output_gate.get_metrics()
+        return metrics
+
     def on_reader_message(self, buffer: bytes):
         """used in direct call mode"""
         self.reader_client.on_reader_message(buffer)
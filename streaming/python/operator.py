@@ -43,6 +43,7 @@ class OpType(enum.Enum):
     ReadTextFile = 9
     Reduce = 10
     Sum = 11
+    Chain = 12
     # ...
 
 
@@ -3,6 +3,9 @@ import sys
 import time
 import types
 
+from ray.streaming.communication import ChainedOutput
+from ray.streaming.window import WindowState
+
 logger = logging.getLogger(__name__)
 logger.setLevel("INFO")
 
@@ -14,14 +17,30 @@ def _identity(element):
 class ReadTextFile:
     """A source operator instance that reads a text file line by line.
 
+    The file offset is part of the checkpointed state, so a restored
+    instance resumes after the last line of the latest checkpoint.
+
     Attributes:
         filepath (string): The path to the input file.
     """
 
     def __init__(self, operator):
         self.filepath = operator.other_args
+        self.operator_id = operator.id
         # TODO (john): Handle possible exception here
         self.reader = open(self.filepath, "r")
+        self.state = None  # created in init_state()
+
+    def init_state(self, create_state_backend):
+        self.state = create_state_backend(self.operator_id)
+        offset = self.state.get("offset")
+        if offset is not None:
+            self.reader.seek(offset)
+
+    # Called right before a checkpoint barrier is emitted
+    def snapshot_state(self):
+        if not self.reader.closed:
+            self.state["offset"] = self.reader.tell()
 
     # Read input file line by line
     def run(self, input_gate, output_gate):
@@ -50,13 +69,14 @@ class Map:
     # Applies the mapper each record of the input stream(s)
     # and pushes resulting records to the output stream(s)
     def run(self, input_gate, output_gate):
-        elements = 0
         while True:
             record = input_gate.pull()
             if record is None:
                 return
-            output_gate.push(self.map_fn(record))
-            elements += 1
+            self.process(record, output_gate)
+
+    def process(self, record, output_gate):
+        output_gate.push(self.map_fn(record))
 
 
 class FlatMap:
@@ -80,7 +100,10 @@ class FlatMap:
             record = input_gate.pull()
             if record is None:
                 return
-            output_gate.push_all(self.flatmap_fn(record))
+            self.process(record, output_gate)
+
+    def process(self, record, output_gate):
+        output_gate.push_all(self.flatmap_fn(record))
 
 
 class Filter:
@@ -104,8 +127,11 @@ class Filter:
             record = input_gate.pull()
             if record is None:
                 return
-            if self.filter_fn(record):
-                output_gate.push(record)
+            self.process(record, output_gate)
+
+    def process(self, record, output_gate):
+        if self.filter_fn(record):
+            output_gate.push(record)
 
 
 class Inspect:
@@ -125,9 +151,12 @@ class Inspect:
             record = input_gate.pull()
             if record is None:
                 return
-            if output_gate:
-                output_gate.push(record)
-            self.inspect_fn(record)
+            self.process(record, output_gate)
+
+    def process(self, record, output_gate):
+        if output_gate:
+            output_gate.push(record)
+        self.inspect_fn(record)
 
 
 class Reduce:
@@ -150,33 +179,133 @@ class Reduce:
                 lambda record: vars(record)[self.attribute_selector]
         elif not isinstance(self.attribute_selector, types.FunctionType):
             sys.exit("Unrecognized or unsupported key selector.")
-        self.state = {}  # key -> value
+        self.operator_id = operator.id
+        self.state = {}  # key -> value, replaced in init_state()
+
+    # Moves the keyed state to a state backend (see: state.py)
+    def init_state(self, create_state_backend):
+        self.state = create_state_backend(self.operator_id)
 
     # Combines the input value for a key with the last reduced
     # value for that key to produce a new value.
     # Outputs the result as (key,new value)
     def run(self, input_gate, output_gate):
         while True:
-            record = input_gate.pull()
-            if record is None:
+            records = input_gate.pull_batch()
+            if records is None:
                 return
-            key, rest = record
+            self.process_batch(records, output_gate)
+
+    def process_batch(self, records, output_gate):
+        results = []
+        for key, rest in records:
             new_value = self.attribute_selector(rest)
-            # TODO (john): Is there a way to update state with
-            # a single dictionary lookup?
             try:
-                old_value = self.state[key]
-                new_value = self.reduce_fn(old_value, new_value)
-                self.state[key] = new_value
+                new_value = self.reduce_fn(self.state[key], new_value)
             except KeyError:  # Key does not exist in state
-                self.state.setdefault(key, new_value)
-            output_gate.push((key, new_value))
+                pass
+            self.state[key] = new_value
+            results.append((key, new_value))
+        output_gate.push_all(results)
+
+    def process(self, record, output_gate):
+        key, rest = record
+        new_value = self.attribute_selector(rest)
+        try:
+            new_value = self.reduce_fn(self.state[key], new_value)
+        except KeyError:  # Key does not exist in state
+            pass
+        self.state[key] = new_value
+        output_gate.push((key, new_value))
 
     # Returns the state of the actor
     def get_state(self):
         return self.state
 
 
+class Window:
+    """A window operator instance that aggregates the records of each
+    (key, window) pair incrementally.
+
+    Watermarks are generated from the timestamps of the records that reach
+    the instance: the watermark trails the largest timestamp seen so far by
+    `max_out_of_orderness_ms`. A window emits a single record when the
+    watermark passes its end and its state is evicted right after.
+    Records of keyed streams are expected as (key, record) pairs and
+    produce (key, window, value) records; records of non-keyed streams
+    produce (window, value) records and are windowed by a single instance.
+    All open windows fire when the input stream ends. Processing-time
+    windows also fire while no record arrives (see: on_timer()).
+
+    Attributes:
+        state (WindowState): The open windows and their accumulators.
+        timestamp_fn (function): Extracts the event time in ms from a record.
+        If None, the processing time of the record is used.
+    """
+
+    def __init__(self, operator):
+        assigner, timestamp_fn, max_out_of_orderness_ms, keyed = \
+            operator.other_args
+        self.state = WindowState(assigner, operator.logic)
+        self.timestamp_fn = timestamp_fn
+        self.max_out_of_orderness_ms = max_out_of_orderness_ms
+        self.keyed = keyed
+        self.max_timestamp = float("-inf")
+
+    def run(self, input_gate, output_gate):
+        while True:
+            record = input_gate.pull()
+            if record is None:
+                break
+            self.process(record, output_gate)
+        self.finish(output_gate)
+
+    def process(self, record, output_gate):
+        if self.keyed:
+            key, value = record
+        else:
+            key, value = None, record
+        if self.timestamp_fn is None:
+            timestamp = int(time.time() * 1000)
+        else:
+            timestamp = self.timestamp_fn(value)
+        if timestamp > self.max_timestamp:
+            self.max_timestamp = timestamp
+        self.state.add(key, timestamp, value)
+        self._emit(
+            self.state.advance_watermark(
+                self.max_timestamp - self.max_out_of_orderness_ms),
+            output_gate)
+
+    # Fires the processing-time windows that ended while the instance was
+    # waiting for input. Called periodically by the job worker
+    def on_timer(self, output_gate):
+        if self.timestamp_fn is not None:
+            return  # Event time only advances with the records
+        watermark = int(time.time() * 1000) - self.max_out_of_orderness_ms
+        self._emit(self.state.advance_watermark(watermark), output_gate)
+
+    # Fires all open windows at the end of the input stream
+    def finish(self, output_gate):
+        self._emit(self.state.flush(), output_gate)
+        if self.state.num_late_records > 0:
+            logger.info("Dropped {} late records".format(
+                self.state.num_late_records))
+
+    def _emit(self, fired_windows, output_gate):
+        if not output_gate:
+            return
+        for key, window, value in fired_windows:
+            if self.keyed:
+                output_gate.push((key, window, value))
+            else:
+                output_gate.push((window, value))
+
+    # Returns the state of the actor
+    def get_state(self):
+        return self.state.windows
+
+
 class KeyBy:
     """A key_by operator instance that physically partitions the
     stream based on a key.
@@ -195,11 +324,64 @@ class KeyBy:
     # The actual partitioning is done by the output gate
     def run(self, input_gate, output_gate):
         while True:
-            record = input_gate.pull()
-            if record is None:
+            records = input_gate.pull_batch()
+            if records is None:
                 return
-            key = self.key_selector(record)
-            output_gate.push((key, record))
+            self.process_batch(records, output_gate)
+
+    def process_batch(self, records, output_gate):
+        keys = [self.key_selector(record) for record in records]
+        output_gate.push_keyed_batch(keys, list(zip(keys, records)))
+
+    def process(self, record, output_gate):
+        key = self.key_selector(record)
+        output_gate.push((key, record))
+
+
+class Chain:
+    """A chain of operator instances that are executed by the same actor.
+
+    The first operator of the chain pulls records from the input gate and
+    each record it produces is handed to the next operator in the chain by
+    a function call (see: ChainedOutput in communication.py), without any
+    serialization. The last operator pushes records to the output gate.
+
+    Attributes:
+        processors (list): The processors of the chained operators, from
+        upstream to downstream.
+    """
+
+    def __init__(self, operator):
+        self.processors = [
+            op.processor_class(op) for op in operator.other_args
+        ]
+        self.output_gates = []  # The output gate of each processor
+
+    def run(self, input_gate, output_gate):
+        gates = [output_gate]
+        for processor in reversed(self.processors[1:]):
+            gates.append(ChainedOutput(processor, gates[-1]))
+        self.output_gates = gates[::-1]
+        self.processors[0].run(input_gate, self.output_gates[0])
+        # Let downstream operators emit what they buffered (e.g. windows)
+        for gate in self.output_gates[:-1]:
+            gate.finish()
+
+    def on_timer(self, output_gate):
+        for processor, gate in zip(self.processors, self.output_gates):
+            on_timer = getattr(processor, "on_timer", None)
+            if on_timer is not None:
+                on_timer(gate)
+
+    def init_state(self, create_state_backend):
+        for processor in self.processors:
+            if hasattr(processor, "init_state"):
+                processor.init_state(create_state_backend)
+
+    def snapshot_state(self):
+        for processor in self.processors:
+            if hasattr(processor, "snapshot_state"):
+                processor.snapshot_state()
 
 
 # A custom source actor
@@ -207,6 +389,22 @@ class Source:
     def __init__(self, operator):
         # The user-defined source with a get_next() method
         self.source = operator.logic
+        self.operator_id = operator.id
+        self.state = None  # created in init_state()
+
+    # Sources with get_state() and set_state() methods are checkpointed
+    def init_state(self, create_state_backend):
+        if not hasattr(self.source, "get_state"):
+            return
+        self.state = create_state_backend(self.operator_id)
+        position = self.state.get("position")
+        if position is not None:
+            self.source.set_state(position)
+
+    # Called right before a checkpoint barrier is emitted
+    def snapshot_state(self):
+        if self.state is not None:
+            self.state["position"] = self.source.get_state()
 
     # Starts the source by calling get_next() repeatedly
     def run(self, input_gate, output_gate):
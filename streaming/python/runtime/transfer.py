@@ -1,5 +1,6 @@
 import logging
 import random
+import time
 from queue import Queue
 from typing import List
 
@@ -142,6 +143,69 @@ class DataMessage:
 logger = logging.getLogger(__name__)
 
 
+class ChannelMetrics:
+    """
+    ChannelMetrics counts the traffic of a channel. Write latencies are kept
+     in a histogram with power-of-two buckets of microseconds.
+    """
+
+    NUM_LATENCY_BUCKETS = 32
+
+    def __init__(self):
+        self.records = 0
+        self.bytes = 0
+        self.queue_depth = 0
+        self.queue_capacity = 0
+        self.backpressure_count = 0
+        self.backpressure_time = 0.0
+        self.latency_buckets = [0] * ChannelMetrics.NUM_LATENCY_BUCKETS
+
+    def record(self, num_bytes, latency_s):
+        self.records += 1
+        self.bytes += num_bytes
+        bucket = int(latency_s * 1e6).bit_length()
+        self.latency_buckets[min(bucket,
+                                 ChannelMetrics.NUM_LATENCY_BUCKETS - 1)] += 1
+
+    def latency_percentile(self, q):
+        """Returns an upper bound of the q-th percentile of write latencies
+         in microseconds, or None if nothing has been written"""
+        total = sum(self.latency_buckets)
+        if total == 0:
+            return None
+        threshold = q / 100 * total
+        count = 0
+        for bucket, bucket_count in enumerate(self.latency_buckets):
+            count += bucket_count
+            if count >= threshold:
+                return (1 << bucket) - 1 if bucket > 0 else 0
+        return (1 << (ChannelMetrics.NUM_LATENCY_BUCKETS - 1)) - 1
+
+    def merge(self, other):
+        self.records += other.records
+        self.bytes += other.bytes
+        self.queue_depth += other.queue_depth
+        self.queue_capacity += other.queue_capacity
+        self.backpressure_count += other.backpressure_count
+        self.backpressure_time += other.backpressure_time
+        self.latency_buckets = [
+            a + b for a, b in zip(self.latency_buckets, other.latency_buckets)
+        ]
+        return self
+
+    def to_dict(self):
+        return {
+            "records": self.records,
+            "bytes": self.bytes,
+            "queue_depth": self.queue_depth,
+            "queue_capacity": self.queue_capacity,
+            "backpressure_count": self.backpressure_count,
+            "backpressure_time_s": self.backpressure_time,
+            "write_latency_p50_us": self.latency_percentile(50),
+            "write_latency_p99_us": self.latency_percentile(99),
+        }
+
+
 class DataWriter:
     """Data Writer is a wrapper of streaming c++ DataWriter, which sends data
      to downstream workers
@@ -171,6 +235,7 @@ class DataWriter:
         self.writer = _streaming.DataWriter.create(
             py_output_channels, output_actor_ids, channel_size, py_msg_ids,
             config_bytes, is_mock)
+        self.metrics = {qid: ChannelMetrics() for qid in output_channels}
 
         logger.info("create DataWriter succeed")
 
@@ -183,9 +248,33 @@ class DataWriter:
             msg_id
         """
         assert type(item) == bytes
+        start = time.time()
         msg_id = self.writer.write(channel_id.object_qid, item)
+        self.metrics[channel_id.channel_id_str].record(
+            len(item),
+            time.time() - start)
         return msg_id
 
+    def buffer_usage(self, channel_id: ChannelID):
+        """Get the fill level of the ring buffer of a channel
+        Args:
+            channel_id: channel id
+        Returns:
+            (number of buffered messages, capacity of the buffer)
+        """
+        size, capacity = self.writer.buffer_usage(channel_id.object_qid)
+        metrics = self.metrics[channel_id.channel_id_str]
+        metrics.queue_depth = size
+        metrics.queue_capacity = capacity
+        return size, capacity
+
+    def get_metrics(self):
+        """Get metrics of all output channels
+        Returns:
+            dict of channel id string -> ChannelMetrics
+        """
+        return self.metrics
+
     def stop(self):
         logger.info("stopping channel writer.")
         self.writer.stop()
@@ -227,6 +316,7 @@ class DataReader:
         self.reader = _streaming.DataReader.create(
             py_input_channels, input_actor_ids, py_seq_ids, py_msg_ids,
             timer_interval, is_recreate, config_bytes, is_mock)
+        self.metrics = {}
         logger.info("create DataReader succeed")
 
     def read(self, timeout_millis):
@@ -246,7 +336,22 @@ class DataReader:
                 self.__queue.put(data_msg)
         if self.__queue.empty():
             return None
-        return self.__queue.get()
+        data_msg = self.__queue.get()
+        metrics = self.metrics.get(data_msg.channel_id())
+        if metrics is None:
+            metrics = self.metrics.setdefault(data_msg.channel_id(),
+                                              ChannelMetrics())
+        metrics.records += 1
+        metrics.bytes += len(data_msg)
+        metrics.queue_depth = self.__queue.qsize()
+        return data_msg
+
+    def get_metrics(self):
+        """Get metrics of all input channels
+        Returns:
+            dict of channel id string -> ChannelMetrics
+        """
+        return self.metrics
 
     def stop(self):
         logger.info("stopping Data Reader.")
@@ -0,0 +1,465 @@
+import logging
+import os
+import pickle
+import shutil
+import sqlite3
+
+from ray.streaming.config import Config
+
+logger = logging.getLogger(__name__)
+logger.setLevel("INFO")
+
+
+class StateBackend:
+    """The keyed state of an operator instance.
+
+    A backend behaves like a dictionary from keys to values. Modifications
+    become durable when `snapshot()` is called, which happens every time
+    a checkpoint barrier reaches the operator instance. A backend that is
+    created on a path that already holds snapshots restores the state of
+    the given checkpoint, or of its latest snapshot if no checkpoint is
+    given. Snapshots of later checkpoints are discarded. A checkpoint id
+    of 0 restores the empty state.
+
+    Attributes:
+         checkpoint_id (int): The id of the latest snapshot, or None if no
+         snapshot has been taken (or restored) yet.
+    """
+
+    def __init__(self):
+        self.checkpoint_id = None
+
+    def __getitem__(self, key):
+        raise NotImplementedError
+
+    def __setitem__(self, key, value):
+        raise NotImplementedError
+
+    def __delitem__(self, key):
+        raise NotImplementedError
+
+    def __contains__(self, key):
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self):
+        """Returns an iterator over all (key, value) pairs."""
+        raise NotImplementedError
+
+    def snapshot(self, checkpoint_id):
+        """Persists all modifications since the previous snapshot."""
+        raise NotImplementedError
+
+    def release(self, checkpoint_id):
+        """Called once `checkpoint_id` is complete on all instances of the
+        job. The backend never has to restore an older checkpoint again."""
+        pass
+
+    def close(self):
+        pass
+
+
+class MemoryStateBackend(StateBackend):
+    """A state backend that keeps all state in a dictionary.
+
+    If a checkpoint path is given, each snapshot writes only the entries
+    that changed since the previous snapshot to a new delta file. Every
+    `compaction_interval` snapshots, the full state is written to a single
+    file. Files are removed only once a newer full snapshot of a released
+    checkpoint exists, so that the latest complete checkpoint can always
+    be restored.
+
+    Attributes:
+         path (str): The directory of the snapshot files, or None if the
+         state is not persisted.
+         compaction_interval (int): The number of delta files after which
+         a full snapshot is written.
+    """
+
+    def __init__(self, path=None, compaction_interval=10,
+                 checkpoint_id=None):
+        super(MemoryStateBackend, self).__init__()
+        self.path = path
+        self.compaction_interval = compaction_interval
+        self.state = {}
+        self.dirty = set()  # Keys updated since the last snapshot
+        self.deleted = set()  # Keys deleted since the last snapshot
+        self.sequence = 0  # Sequence number of the last snapshot file
+        self.num_deltas = 0  # Delta files since the last full snapshot
+        self.released_checkpoint_id = 0
+        # (sequence, checkpoint id) of the full snapshot files
+        self.full_snapshots = []
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self._restore(checkpoint_id)
+
+    def __getitem__(self, key):
+        return self.state[key]
+
+    def __setitem__(self, key, value):
+        self.state[key] = value
+        if self.path is not None:
+            self.dirty.add(key)
+            self.deleted.discard(key)
+
+    def __delitem__(self, key):
+        del self.state[key]
+        if self.path is not None:
+            self.dirty.discard(key)
+            self.deleted.add(key)
+
+    def __contains__(self, key):
+        return key in self.state
+
+    def __len__(self):
+        return len(self.state)
+
+    def items(self):
+        return self.state.items()
+
+    def snapshot(self, checkpoint_id):
+        self.checkpoint_id = checkpoint_id
+        if self.path is None:
+            return
+        self.sequence += 1
+        if self.num_deltas + 1 >= self.compaction_interval:
+            self._write("snapshot", (checkpoint_id, self.state, ()))
+            self.full_snapshots.append((self.sequence, checkpoint_id))
+            self._compact()
+            self.num_deltas = 0
+        else:
+            updated = {key: self.state[key] for key in self.dirty}
+            self._write("delta", (checkpoint_id, updated, self.deleted))
+            self.num_deltas += 1
+        self.dirty = set()
+        self.deleted = set()
+
+    # Files are written to a temporary path and renamed, so that a crash
+    # never leaves a partially written snapshot behind
+    def _write(self, kind, content):
+        filename = os.path.join(self.path, "{:020d}.{}".format(
+            self.sequence, kind))
+        with open(filename + ".tmp", "wb") as f:
+            pickle.dump(content, f)
+        os.rename(filename + ".tmp", filename)
+
+    def _files(self):
+        files = []
+        for name in os.listdir(self.path):
+            sequence, _, kind = name.partition(".")
+            if kind in ("snapshot", "delta"):
+                files.append((int(sequence), kind, name))
+        return sorted(files)
+
+    def release(self, checkpoint_id):
+        self.released_checkpoint_id = checkpoint_id
+        if self.path is not None:
+            self._compact()
+
+    # Removes the files before the latest full snapshot of a released
+    # checkpoint, which are no longer needed to restore any checkpoint
+    def _compact(self):
+        kept = [(sequence, checkpoint_id)
+                for sequence, checkpoint_id in self.full_snapshots
+                if checkpoint_id <= self.released_checkpoint_id]
+        if not kept:
+            return
+        sequence = kept[-1][0]
+        for file_sequence, _, name in self._files():
+            if file_sequence < sequence:
+                os.remove(os.path.join(self.path, name))
+        self.full_snapshots = [
+            snapshot for snapshot in self.full_snapshots
+            if snapshot[0] >= sequence
+        ]
+
+    # Replays the full snapshots and delta files up to the given checkpoint
+    # and removes the files of later checkpoints
+    def _restore(self, max_checkpoint_id):
+        for sequence, kind, name in self._files():
+            filename = os.path.join(self.path, name)
+            with open(filename, "rb") as f:
+                checkpoint_id, updated, deleted = pickle.load(f)
+            if max_checkpoint_id is not None and \
+                    checkpoint_id > max_checkpoint_id:
+                os.remove(filename)
+                continue
+            if kind == "snapshot":
+                self.state = dict(updated)
+                self.full_snapshots.append((sequence, checkpoint_id))
+                self.num_deltas = 0
+            else:
+                self.state.update(updated)
+                for key in deleted:
+                    self.state.pop(key, None)
+                self.num_deltas += 1
+            self.checkpoint_id = checkpoint_id
+            self.sequence = sequence
+        if self.checkpoint_id is not None:
+            logger.info("Restored {} keys of checkpoint {} from {}".format(
+                len(self.state), self.checkpoint_id, self.path))
+
+
+class SQLiteStateBackend(StateBackend):
+    """A state backend that keeps state in a local SQLite database.
+
+    Updates are buffered in memory and written to the database in a single
+    transaction when a snapshot is taken, so the database always holds the
+    state of the latest complete snapshot. Reads are served from a bounded
+    cache. If the number of buffered updates exceeds `max_cached_entries`,
+    they are written to the database within the open transaction so that
+    the key space is not bounded by memory.
+
+    Before a key is first overwritten after a snapshot, its previous value
+    is saved in an undo table, so that the state of any checkpoint that has
+    not been released can be restored.
+
+    Attributes:
+         path (str): The path of the database file.
+         max_cached_entries (int): The maximum number of entries that are
+         kept in memory.
+    """
+
+    def __init__(self, path, max_cached_entries=100000, checkpoint_id=None):
+        super(SQLiteStateBackend, self).__init__()
+        self.path = path
+        self.max_cached_entries = max_cached_entries
+        # The processor may run in a different thread than the constructor
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS state "
+                                "(key BLOB PRIMARY KEY, value BLOB)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta "
+                                "(name TEXT PRIMARY KEY, value INTEGER)")
+        # The value of a key at a checkpoint, or NULL if the key was absent
+        self.connection.execute("CREATE TABLE IF NOT EXISTS undo "
+                                "(checkpoint_id INTEGER, key BLOB, value "
+                                "BLOB, PRIMARY KEY (checkpoint_id, key))")
+        self.connection.commit()
+        self.cache = {}  # key -> value
+        self.dirty = set()  # Keys updated since they were last written
+        self.deleted = set()  # Keys deleted since the last write
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE name = 'checkpoint_id'").fetchone()
+        if row is not None:
+            self.checkpoint_id = row[0]
+        if checkpoint_id is not None and \
+                (self.checkpoint_id or 0) > checkpoint_id:
+            self._rollback(checkpoint_id)
+        if self.checkpoint_id is not None:
+            logger.info("Restored checkpoint {} from {}".format(
+                self.checkpoint_id, self.path))
+
+    def __getitem__(self, key):
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+        if key in self.deleted:
+            raise KeyError(key)
+        row = self.connection.execute(
+            "SELECT value FROM state WHERE key = ?",
+            (pickle.dumps(key), )).fetchone()
+        if row is None:
+            raise KeyError(key)
+        value = pickle.loads(row[0])
+        self._cache(key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        self._cache(key, value)
+        self.dirty.add(key)
+        self.deleted.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.cache.pop(key, None)
+        self.dirty.discard(key)
+        self.deleted.add(key)
+
+    def __len__(self):
+        self._write()
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM state").fetchone()[0]
+
+    def items(self):
+        self._write()
+        for key, value in self.connection.execute(
+                "SELECT key, value FROM state"):
+            yield pickle.loads(key), pickle.loads(value)
+
+    def _cache(self, key, value):
+        if len(self.cache) >= self.max_cached_entries:
+            self._write()
+            self.cache.clear()
+        self.cache[key] = value
+
+    # Writes buffered updates to the database without committing them
+    def _write(self):
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO undo VALUES "
+            "(?, ?, (SELECT value FROM state WHERE key = ?))",
+            [(self.checkpoint_id or 0, pickle.dumps(key), pickle.dumps(key))
+             for key in self.dirty | self.deleted])
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO state VALUES (?, ?)",
+            [(pickle.dumps(key), pickle.dumps(self.cache[key]))
+             for key in self.dirty])
+        self.connection.executemany(
+            "DELETE FROM state WHERE key = ?",
+            [(pickle.dumps(key), ) for key in self.deleted])
+        self.dirty = set()
+        self.deleted = set()
+
+    def snapshot(self, checkpoint_id):
+        self._write()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta VALUES ('checkpoint_id', ?)",
+            (checkpoint_id, ))
+        self.connection.commit()
+        self.checkpoint_id = checkpoint_id
+
+    # The undo entries are deleted with the next snapshot's transaction
+    def release(self, checkpoint_id):
+        self.connection.execute("DELETE FROM undo WHERE checkpoint_id < ?",
+                                (checkpoint_id, ))
+
+    # Restores the values of all keys written after the given checkpoint,
+    # the latest undo entries first
+    def _rollback(self, checkpoint_id):
+        rows = self.connection.execute(
+            "SELECT key, value FROM undo WHERE checkpoint_id >= ? "
+            "ORDER BY checkpoint_id DESC", (checkpoint_id, )).fetchall()
+        for key, value in rows:
+            if value is None:
+                self.connection.execute("DELETE FROM state WHERE key = ?",
+                                        (key, ))
+            else:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO state VALUES (?, ?)",
+                    (key, value))
+        self.connection.execute("DELETE FROM undo WHERE checkpoint_id >= ?",
+                                (checkpoint_id, ))
+        if checkpoint_id > 0:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('checkpoint_id', ?)",
+                (checkpoint_id, ))
+            self.checkpoint_id = checkpoint_id
+        else:
+            self.connection.execute(
+                "DELETE FROM meta WHERE name = 'checkpoint_id'")
+            self.checkpoint_id = None
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+class CheckpointLog:
+    """Records which operator instances of a job have snapshotted each
+    checkpoint.
+
+    Each instance writes an empty file to the directory of a checkpoint
+    once all of its state backends have taken the snapshot. A checkpoint is
+    complete when all instances of the job have written their file, and
+    only complete checkpoints are restored.
+
+    Attributes:
+         path (str): The directory of the checkpoint files.
+         num_instances (int): The number of operator instances in the job.
+    """
+
+    def __init__(self, path, num_instances):
+        self.path = path
+        self.num_instances = num_instances
+        os.makedirs(path, exist_ok=True)
+
+    def _checkpoints(self):
+        return sorted(int(name) for name in os.listdir(self.path))
+
+    def _checkpoint_dir(self, checkpoint_id):
+        return os.path.join(self.path, "{:020d}".format(checkpoint_id))
+
+    def latest_complete(self):
+        """Returns the id of the latest complete checkpoint, or 0 if no
+        checkpoint is complete yet."""
+        for checkpoint_id in reversed(self._checkpoints()):
+            try:
+                instances = os.listdir(self._checkpoint_dir(checkpoint_id))
+            except FileNotFoundError:  # Removed by another instance
+                continue
+            if len(instances) >= self.num_instances:
+                return checkpoint_id
+        return 0
+
+    def ack(self, instance, checkpoint_id):
+        """Records that the instance has snapshotted the checkpoint, and
+        returns the id of the latest complete checkpoint."""
+        path = self._checkpoint_dir(checkpoint_id)
+        os.makedirs(path, exist_ok=True)
+        open(os.path.join(path, instance), "w").close()
+        complete = self.latest_complete()
+        for older in self._checkpoints():
+            if older < complete:
+                shutil.rmtree(self._checkpoint_dir(older), ignore_errors=True)
+        return complete
+
+    def discard_after(self, instance, checkpoint_id):
+        """Removes the records of the instance for checkpoints after the
+        given one, which were never completed and will be taken again."""
+        for later in self._checkpoints():
+            if later > checkpoint_id:
+                try:
+                    os.remove(
+                        os.path.join(self._checkpoint_dir(later), instance))
+                except FileNotFoundError:
+                    pass
+
+
+def create_checkpoint_log(config, job_id, num_instances):
+    """Creates the checkpoint log of a job, or returns None if the
+    environment has no checkpoint directory."""
+    if config.checkpoint_dir is None:
+        return None
+    return CheckpointLog(
+        os.path.join(config.checkpoint_dir, job_id, "checkpoints"),
+        num_instances)
+
+
+def create_state_backend(config,
+                         job_id,
+                         operator_id,
+                         instance_index,
+                         checkpoint_id=None):
+    """Creates the state backend of an operator instance according to the
+    environment's configuration (see: Conf in streaming.py).
+
+    The state of each job is kept in its own subdirectory of the checkpoint
+    directory, so that jobs never restore each other's state. The backend
+    restores the state of `checkpoint_id` (see: StateBackend)."""
+    path = None
+    if config.checkpoint_dir is not None:
+        job_dir = os.path.join(config.checkpoint_dir, job_id)
+        path = os.path.join(job_dir, "{}-{}".format(operator_id,
+                                                    instance_index))
+    if config.state_backend == Config.MEMORY_STATE_BACKEND:
+        return MemoryStateBackend(path, checkpoint_id=checkpoint_id)
+    elif config.state_backend == Config.SQLITE_STATE_BACKEND:
+        if path is None:
+            raise ValueError("The SQLite state backend requires a "
+                             "checkpoint directory.")
+        os.makedirs(job_dir, exist_ok=True)
+        return SQLiteStateBackend(path + ".db", checkpoint_id=checkpoint_id)
+    raise ValueError("Unknown state backend: {}".format(config.state_backend))
@@ -2,6 +2,7 @@ import logging
 import pickle
 import sys
 import time
+import uuid
 
 import networkx as nx
 import ray
@@ -12,6 +13,7 @@ from ray.streaming.config import Config
 from ray.streaming.jobworker import JobWorker
 from ray.streaming.operator import Operator, OpType
 from ray.streaming.operator import PScheme, PStrategy
+from ray.streaming.window import TumblingWindows
 
 logger = logging.getLogger(__name__)
 logger.setLevel("INFO")
@@ -35,13 +37,67 @@ class Conf:
 
     This class includes all information about the configuration of the
     streaming environment.
+
+    Attributes:
+         parallelism (int): The default number of instances per operator.
+         channel_type (str): The type of the data channels (see: Config).
+         batch_max_records (int): The maximum number of records that are
+         accumulated per output channel before they are written as a single
+         frame. A value of 1 disables batching.
+         batch_max_bytes (int): The maximum size in bytes of a frame.
+         batch_linger_ms (int): The maximum time in ms a record may wait in
+         an output buffer before the buffer is flushed. Buffers are also
+         flushed while the operator instance waits for input, so an idle
+         upstream does not hold records back.
+         chaining (bool): Denotes whether consecutive operators connected
+         with forward partitioning and the same parallelism are executed
+         by the same actor (True) or not (False).
+         state_backend (str): The backend of keyed operator state
+         (Config.MEMORY_STATE_BACKEND or Config.SQLITE_STATE_BACKEND).
+         checkpoint_dir (str): The local directory where operator state is
+         persisted, or None to keep state in memory only.
+         job_id (str): Identifies the state of the job in checkpoint_dir.
+         A job restores the state persisted by jobs with the same id, e.g.
+         to resume after a restart of the driver. If None, a unique id is
+         generated for each environment.
+         checkpoint_interval (int): The number of records a source emits
+         between two checkpoint barriers. A value of 0 disables
+         checkpointing.
+         backpressure_threshold (float): The fill level of an output
+         channel (as a fraction of its capacity) above which an operator
+         waits before writing to the channel. None (the default) disables
+         backpressure, which saves polling the channel on every write.
     """
 
-    def __init__(self, parallelism=1, channel_type=Config.MEMORY_CHANNEL):
+    def __init__(self,
+                 parallelism=1,
+                 channel_type=Config.MEMORY_CHANNEL,
+                 batch_max_records=1,
+                 batch_max_bytes=Config.BATCH_MAX_BYTES_DEFAULT,
+                 batch_linger_ms=Config.BATCH_LINGER_MS_DEFAULT,
+                 chaining=True,
+                 state_backend=Config.MEMORY_STATE_BACKEND,
+                 checkpoint_dir=None,
+                 job_id=None,
+                 checkpoint_interval=0,
+                 backpressure_threshold=None):
         self.parallelism = parallelism
         self.channel_type = channel_type
+        self.batch_max_records = batch_max_records
+        self.batch_max_bytes = batch_max_bytes
+        self.batch_linger_ms = batch_linger_ms
+        self.chaining = chaining
+        self.state_backend = state_backend
+        self.checkpoint_dir = checkpoint_dir
+        self.job_id = job_id
+        self.checkpoint_interval = checkpoint_interval
+        self.backpressure_threshold = backpressure_threshold
         # ...
 
+    def batching_enabled(self):
+        """Returns True if records are transferred in batched frames."""
+        return self.batch_max_records > 1
+
 
 class ExecutionGraph:
     def __init__(self, env):
@@ -57,6 +113,9 @@ class ExecutionGraph:
         self.task_ids = {}
         self.input_channels = {}  # operator id -> input channels
         self.output_channels = {}  # operator id -> output channels
+        # chain head operator id -> ids of the chained operators
+        self.chains = {}
+        self.chain_heads = {}  # operator id -> chain head operator id
 
     # Constructs and deploys a Ray actor of a specific type
     # TODO (john): Actor placement information should be specified in
@@ -108,9 +167,61 @@ class ExecutionGraph:
             handle = self.__generate_actor(i, operator, ip, op)
             if handle:
                 handles.append(handle)
-                self.actors_map[(operator.id, i)] = handle
+                for op_id in self.chains.get(operator.id, [operator.id]):
+                    self.actors_map[(op_id, i)] = handle
         return handles
 
+    # Checks whether an operator can be executed by the same actor
+    # as its upstream operator
+    def _is_chainable(self, upstream, downstream):
+        topo = self.env.logical_topo
+        if topo.out_degree(upstream.id) != 1:
+            return False
+        if topo.in_degree(downstream.id) != 1:
+            return False
+        p_scheme = upstream.partitioning_strategies[downstream.id]
+        return (p_scheme.strategy == PStrategy.Forward
+                and upstream.num_instances == downstream.num_instances
+                and hasattr(downstream.processor_class, "process"))
+
+    # Groups consecutive chainable operators
+    def _build_chains(self):
+        self.chains = {}
+        self.chain_heads = {}
+        for node in nx.topological_sort(self.env.logical_topo):
+            head = node
+            if self.env.config.chaining:
+                upstream = list(self.env.logical_topo.predecessors(node))
+                if len(upstream) == 1 and self._is_chainable(
+                        self.env.operators[upstream[0]],
+                        self.env.operators[node]):
+                    head = self.chain_heads[upstream[0]]
+            self.chain_heads[node] = head
+            self.chains.setdefault(head, []).append(node)
+
+    # Returns the operator that is deployed for the chain with the given head
+    def _chain_operator(self, head):
+        chain = self.chains[head]
+        operator = self.env.operators[head]
+        if len(chain) == 1:
+            return operator
+        operators = [self.env.operators[op_id] for op_id in chain]
+        chained = Operator(
+            head,
+            OpType.Chain,
+            processor.Chain,
+            self._chain_name(head),
+            other=operators,
+            num_instances=operator.num_instances)
+        chained.partitioning_strategies = operators[-1].partitioning_strategies
+        return chained
+
+    # Returns the names of the operators in a chain, e.g. "Map -> Filter"
+    def _chain_name(self, head):
+        return " -> ".join(
+            self.env.operators[op_id].name
+            for op_id in self.chains.get(head, [head]))
+
     # Adds a channel/edge to the physical dataflow graph
     def __add_channel(self, actor_id, output_channels):
         for c in output_channels:
@@ -135,6 +246,9 @@ class ExecutionGraph:
         channels = {}  # destination operator id -> channels
         strategies = operator.partitioning_strategies
         for dst_operator, p_scheme in strategies.items():
+            if self.chain_heads.get(dst_operator, dst_operator) != \
+                    dst_operator:
+                continue  # Records are passed within the chain
             num_dest_instances = self.env.operators[dst_operator].num_instances
             entry = channels.setdefault(dst_operator, [])
             if p_scheme.strategy == PStrategy.Forward:
@@ -191,9 +305,14 @@ class ExecutionGraph:
             src_operator_id, src_instance_index = src_actor_id
             dst_operator_id, dst_instance_index = dst_actor_id
             logger.info("({},{},{}) --> ({},{},{})".format(
-                src_operator_id, self.env.operators[src_operator_id].name,
+                src_operator_id, self._chain_name(src_operator_id),
                 src_instance_index, dst_operator_id,
-                self.env.operators[dst_operator_id].name, dst_instance_index))
+                self._chain_name(dst_operator_id), dst_instance_index))
+        # Print all chains of fused operators
+        for head, chain in self.chains.items():
+            if len(chain) > 1:
+                logger.info("Chain {}: {}".format(head,
+                                                  self._chain_name(head)))
 
     def build_graph(self):
         self.build_channels()
@@ -208,20 +327,24 @@ class ExecutionGraph:
             # local mode can't use pickle
             pass
 
-        # Each operator instance is implemented as a Ray actor
+        # Each instance of an operator chain is implemented as a Ray actor
         # Actors are deployed in topological order, as we traverse the
         # logical dataflow from sources to sinks.
         for node in nx.topological_sort(self.env.logical_topo):
-            operator = self.env.operators[node]
+            if node not in self.chains:
+                continue  # Deployed with the head of its chain
+            operator = self._chain_operator(node)
+            tail = self.chains[node][-1]
             # Instantiate Ray actors
             handles = self.__generate_actors(
                 operator, self.input_channels.get(node, []),
-                self.output_channels.get(node, []))
+                self.output_channels.get(tail, []))
             if handles:
                 self.actor_handles.extend(handles)
 
     def build_channels(self):
         self.build_time = int(time.time() * 1000)
+        self._build_chains()
         # gen auto-incremented unique task id for every operator instance
         for node in nx.topological_sort(self.env.logical_topo):
             operator = self.env.operators[node]
@@ -269,12 +392,14 @@ class Environment:
          topology is garbage collected (True) or not (False).
          actor_handles (list): A list of all Ray actor handles that execute
          the streaming dataflow.
+         job_id (str): The id of the job's state (see: Conf).
     """
 
     def __init__(self, config=Conf()):
         self.logical_topo = nx.DiGraph()  # DAG
         self.operators = {}  # operator id --> operator object
         self.config = config  # Environment's configuration
+        self.job_id = config.job_id or uuid.uuid4().hex
         self.topo_cleaned = False
         self.operator_id_counter = 0
         self.execution_graph = None  # set when executed
@@ -312,6 +437,13 @@ class Environment:
     # reading from Kafka, text files, etc.
     # TODO (john): Handle case where environment parallelism is set
     def source(self, source):
+        """Creates a source that calls `source.get_next()` until it returns
+        a falsy value.
+
+        To be restored from a checkpoint, the source must also implement
+        `get_state()`, which returns its current position, and
+        `set_state(state)`, which resumes reading from the position.
+        """
         source_id = self.gen_operator_id()
         source_stream = DataStream(self, source_id)
         self.operators[source_id] = Operator(
@@ -361,6 +493,41 @@ class Environment:
 
         return exec_handles
 
+    def get_metrics(self):
+        """Collects the channel metrics of all running actors.
+
+        Returns:
+            A mapping from operator chain names (e.g. "Source -> Map") to
+            a dict with the aggregated "input" and "output" channel metrics
+            of all instances of the chain (see: ChannelMetrics in
+            transfer.py). Operators with high backpressure time on their
+            output channels are upstream of the bottleneck.
+        """
+        graph = self.execution_graph
+        handles = {}  # chain name -> handles of its instances
+        for (op_id, _), handle in graph.actors_map.items():
+            if graph.chain_heads.get(op_id, op_id) == op_id:
+                handles.setdefault(graph._chain_name(op_id), []).append(handle)
+        pending = {
+            name: [handle.get_metrics.remote() for handle in instances]
+            for name, instances in handles.items()
+        }
+        metrics = {}
+        for name, object_ids in pending.items():
+            aggregated = {
+                "input": transfer.ChannelMetrics(),
+                "output": transfer.ChannelMetrics()
+            }
+            for instance_metrics in ray.get(object_ids):
+                for direction, channels in instance_metrics.items():
+                    for channel_metrics in channels.values():
+                        aggregated[direction].merge(channel_metrics)
+            metrics[name] = {
+                direction: channel_metrics.to_dict()
+                for direction, channel_metrics in aggregated.items()
+            }
+        return metrics
+
     def wait_finish(self):
         for actor_handle in self.execution_graph.actor_handles:
             while not ray.get(actor_handle.is_finished.remote()):
@@ -490,6 +657,11 @@ class DataStream:
              operator of the stream.
         """
         assert (num_instances > 0)
+        operator = self.env.operators[self.src_operator_id]
+        if operator.type == OpType.TimeWindow and not operator.other_args[-1]:
+            # Instances would emit partial results of the same windows
+            assert num_instances == 1, \
+                "Windows of non-keyed streams must run in a single instance"
         self.env._set_parallelism(self.src_operator_id, num_instances)
         return self
 
@@ -532,8 +704,6 @@ class DataStream:
 
     #   Data Trasnformations   #
     # TODO (john): Expand set of supported operators.
-    # TODO (john): To support event-time windows we need a mechanism for
-    # generating and processing watermarks
 
     # Registers map operator to the environment
     def map(self, map_fn, name="Map"):
@@ -622,16 +792,62 @@ class DataStream:
             num_instances=self.env.config.parallelism)
         return self.__register(op)
 
-    # Registers window operator to the environment.
-    # This is a system time window
+    # Registers window operator to the environment
     # TODO (john): This should return a WindowedDataStream
-    def time_window(self, window_width_ms):
-        """Applies a system time window to the stream.
+    def window(self,
+               assigner,
+               reduce_fn=None,
+               timestamp_fn=None,
+               max_out_of_orderness_ms=0):
+        """Applies a window to the stream and aggregates the records of
+        each window with a user-defined reduce function.
+
+        If the stream is keyed (i.e. it is the output of a key_by), each key
+        has its own windows and the windows are computed in parallel.
+        Otherwise, all records share the same windows, which are computed by
+        a single operator instance.
+
+        Attributes:
+             assigner: The window assigner (see: TumblingWindows,
+             SlidingWindows and SessionWindows in window.py).
+             reduce_fn (function): The user-defined logic that combines two
+             values of the same window. If None, the values of a window are
+             collected in a list.
+             timestamp_fn (function): Extracts the event time of a record in
+             ms. If None, the system time is used.
+             max_out_of_orderness_ms (int): The maximum delay of a record
+             with respect to the largest timestamp seen so far. Records that
+             arrive later are dropped.
+        """
+        src_operator = self.env.operators[self.src_operator_id]
+        keyed = src_operator.type == OpType.KeyBy
+        op = Operator(
+            self.env.gen_operator_id(),
+            OpType.TimeWindow,
+            processor.Window,
+            "Window",
+            reduce_fn,
+            other=(assigner, timestamp_fn, max_out_of_orderness_ms, keyed),
+            num_instances=self.env.config.parallelism if keyed else 1)
+        return self.__register(op)
+
+    # Registers a tumbling window operator to the environment
+    def time_window(self,
+                    window_width_ms,
+                    reduce_fn=None,
+                    timestamp_fn=None,
+                    max_out_of_orderness_ms=0):
+        """Applies a tumbling time window to the stream.
+
+        Uses system time unless a timestamp function is given
+        (see: window()).
 
         Attributes:
              window_width_ms (int): The length of the window in ms.
         """
-        raise Exception("time_window is unsupported")
+        return self.window(
+            TumblingWindows(window_width_ms), reduce_fn, timestamp_fn,
+            max_out_of_orderness_ms)
 
     # Registers filter operator to the environment
     def filter(self, filter_fn):
@@ -0,0 +1,167 @@
+import numpy as np
+
+import time
+
+from ray.streaming.communication import DataChannel, DataInput, DataOutput
+from ray.streaming.communication import _CLOSE_FLAG, _hash, _hash_batch
+from ray.streaming.communication import _pack_frame, _unpack_frame
+from ray.streaming.operator import PScheme, PStrategy
+from ray.streaming.runtime.transfer import ChannelID, ChannelMetrics
+from ray.streaming.streaming import Conf, Environment
+import pickle
+
+
+class MockWriter:
+    def __init__(self, queue_depths=()):
+        self.messages = []
+        self.queue_depths = list(queue_depths)
+        self.metrics = {}
+
+    def write(self, qid, msg_data):
+        self.messages.append((qid, msg_data))
+
+    def buffer_usage(self, qid):
+        if self.queue_depths:
+            return self.queue_depths.pop(0), 10
+        return 0, 10
+
+    def get_metrics(self):
+        return self.metrics
+
+    def stop(self):
+        pass
+
+
+class MockItem:
+    def __init__(self, channel_id, body):
+        self._channel_id = channel_id
+        self._body = body
+
+    def channel_id(self):
+        return self._channel_id
+
+    def body(self):
+        return self._body
+
+
+class MockReader:
+    def __init__(self, items):
+        self.items = list(items)
+
+    def read(self, timeout_millis):
+        item = self.items.pop(0)
+        if callable(item):  # Delays the next message
+            return item()
+        return item
+
+
+def _make_output(conf, strategy=PStrategy.Forward, num_channels=1):
+    env = Environment(config=conf)
+    channels = []
+    for i in range(num_channels):
+        qid = ChannelID.gen_id(0, i + 1, 0)
+        channels.append(DataChannel(0, 0, 1, i, qid))
+    output = DataOutput(env, channels, {1: PScheme(strategy)})
+    output.writer = MockWriter()
+    return output
+
+
+def test_frame_roundtrip():
+    records = [1, "a", ("key", 2.0), None, {"x": [1, 2]}]
+    frame = _pack_frame([pickle.dumps(r) for r in records])
+    assert _unpack_frame(frame) == records
+
+
+def test_batched_push():
+    output = _make_output(
+        Conf(batch_max_records=3, batch_linger_ms=10**6))
+    output.push_all(range(7))
+    # Two full frames have been written, one record is still buffered
+    frames = [msg for _, msg in output.writer.messages]
+    assert [_unpack_frame(f) for f in frames] == [[0, 1, 2], [3, 4, 5]]
+    output.close()
+    frames = [msg for _, msg in output.writer.messages]
+    assert _unpack_frame(frames[2]) == [6]
+    assert frames[3] == _CLOSE_FLAG
+
+
+def test_unbatched_push():
+    output = _make_output(Conf())
+    output.push_all(range(3))
+    frames = [msg for _, msg in output.writer.messages]
+    assert [pickle.loads(f) for f in frames] == [0, 1, 2]
+
+
+def test_linger_flush_when_idle():
+    output = _make_output(Conf(batch_max_records=10, batch_linger_ms=1))
+    output.push("a")
+    assert output.writer.messages == []
+    # The upstream instance goes idle before the next message
+    idle = [lambda: time.sleep(0.002)] * 3
+    channel = DataChannel(0, 0, 1, 0, ChannelID.gen_id(0, 1, 0))
+    input_gate = DataInput(Environment(config=Conf()), [channel])
+    input_gate.reader = MockReader(idle + [MockItem("q", _CLOSE_FLAG)])
+    input_gate.on_idle = output.flush_expired
+    assert input_gate.pull() is None
+    frames = [msg for _, msg in output.writer.messages]
+    assert [_unpack_frame(f) for f in frames] == [["a"]]
+
+
+def test_hash_batch():
+    keys = ["a", "b", b"c", 7, -3]
+    assert list(_hash_batch(keys)) == [_hash(key) for key in keys]
+    array = np.arange(10)
+    assert _hash_batch(array) is array
+
+
+def _by_channel(writer):
+    messages = {}
+    for qid, msg_data in writer.messages:
+        messages.setdefault(qid, []).append(pickle.loads(msg_data))
+    return messages
+
+
+def test_keyed_batch_push():
+    records = [(word, 1) for word in "a b c a d e b f a".split()]
+    single = _make_output(Conf(), PStrategy.ShuffleByKey, 3)
+    for record in records:
+        single.push(record)
+    batched = _make_output(Conf(), PStrategy.ShuffleByKey, 3)
+    batched.push_all(records)
+    # Records are grouped by channel but keep their order within a channel
+    assert _by_channel(batched.writer) == _by_channel(single.writer)
+
+
+def test_backpressure():
+    output = _make_output(Conf(backpressure_threshold=0.5))
+    qid = output.channels[0].qid
+    output.writer = MockWriter(queue_depths=[9, 7, 5, 2])
+    output.writer.metrics[qid.channel_id_str] = ChannelMetrics()
+    output.push("a")
+    # The write waited until the queue depth dropped below the threshold
+    assert output.writer.queue_depths == []
+    assert len(output.writer.messages) == 1
+    assert output.writer.metrics[qid.channel_id_str].backpressure_count == 1
+
+
+def test_channel_metrics():
+    metrics = ChannelMetrics()
+    assert metrics.latency_percentile(50) is None
+    for latency_us in [1, 2, 3, 100, 1000]:
+        metrics.record(10, latency_us / 1e6)
+    assert metrics.records == 5 and metrics.bytes == 50
+    assert metrics.latency_percentile(50) == 3
+    assert metrics.latency_percentile(100) == 1023
+    merged = ChannelMetrics().merge(metrics).merge(metrics)
+    assert merged.to_dict()["records"] == 10
+
+
+if __name__ == "__main__":
+    test_frame_roundtrip()
+    test_batched_push()
+    test_unbatched_push()
+    test_linger_flush_when_idle()
+    test_hash_batch()
+    test_keyed_batch_push()
+    test_backpressure()
+    test_channel_metrics()
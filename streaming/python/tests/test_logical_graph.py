@@ -1,4 +1,4 @@
-from ray.streaming.streaming import Environment, ExecutionGraph
+from ray.streaming.streaming import Conf, Environment, ExecutionGraph
 from ray.streaming.operator import OpType, PStrategy
 
 
@@ -196,6 +196,30 @@ def test_channel_generation():
     _test_forward_channels()
 
 
+def test_operator_chaining():
+    """Tests fusion of forward-partitioned operators."""
+    env = Environment()
+    env.set_parallelism(2)
+    _ = env.source(None).set_parallelism(2).map(None).filter(
+        None).key_by(0).sum(1).set_parallelism(3).map(None, "Map2")
+    env._collect_garbage()
+    env.execution_graph = ExecutionGraph(env)
+    env.execution_graph.build_channels()
+    chains = [[env.operators[op_id].type for op_id in chain]
+              for chain in env.execution_graph.chains.values()]
+    # The sum is shuffled by key and has a different parallelism than Map2
+    assert chains == [[OpType.Source, OpType.Map, OpType.Filter, OpType.KeyBy],
+                      [OpType.Sum], [OpType.Map]], chains
+    # No channels are generated within a chain
+    channels = env.execution_graph.output_channels
+    assert set(channels.keys()) == {3, 4}, channels.keys()
+    # Chaining can be disabled
+    env.config = Conf(parallelism=2, chaining=False)
+    env.execution_graph = ExecutionGraph(env)
+    env.execution_graph.build_channels()
+    assert len(env.execution_graph.chains) == len(env.operators)
+
+
 # TODO (john): Add simple wordcount test
 def test_wordcount():
     """Tests a simple streaming wordcount."""
@@ -204,3 +228,4 @@ def test_wordcount():
 
 if __name__ == "__main__":
     test_channel_generation()
+    test_operator_chaining()
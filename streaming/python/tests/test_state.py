@@ -0,0 +1,221 @@
+import os
+import pickle
+import tempfile
+import types
+
+from ray.streaming.communication import DataChannel, DataInput
+from ray.streaming.communication import _CLOSE_FLAG, _pack_barrier
+from ray.streaming.processor import ReadTextFile
+from ray.streaming.state import MemoryStateBackend, SQLiteStateBackend
+from ray.streaming.state import CheckpointLog, create_state_backend
+from ray.streaming.streaming import Conf, Environment
+
+
+def _check_backend(create_backend):
+    backend = create_backend()
+    backend["a"] = 1
+    backend["b"] = 2
+    backend.snapshot(1)
+    backend["a"] = 3
+    del backend["b"]
+    backend["c"] = 4
+    backend.snapshot(2)
+    # Updates after the last snapshot are lost on restart
+    backend["d"] = 5
+    backend.close()
+    backend = create_backend()
+    assert backend.checkpoint_id == 2
+    assert dict(backend.items()) == {"a": 3, "c": 4}
+    assert "b" not in backend
+    assert len(backend) == 2
+    backend.close()
+
+
+def test_memory_state_backend():
+    path = tempfile.mkdtemp()
+    _check_backend(lambda: MemoryStateBackend(path, compaction_interval=3))
+    # Deltas are compacted into a full snapshot
+    backend = MemoryStateBackend(path, compaction_interval=3)
+    backend["e"] = 6
+    backend.snapshot(3)
+    # Older files are only removed once the checkpoint is released
+    assert sorted(os.listdir(path))[0].endswith(".delta")
+    backend.release(3)
+    assert sorted(os.listdir(path))[0].endswith(".snapshot")
+    assert dict(MemoryStateBackend(path).items()) == {
+        "a": 3,
+        "c": 4,
+        "e": 6
+    }
+
+
+def test_sqlite_state_backend():
+    path = os.path.join(tempfile.mkdtemp(), "state.db")
+    _check_backend(lambda: SQLiteStateBackend(path, max_cached_entries=2))
+
+
+def _check_restore_checkpoint(create_backend):
+    backend = create_backend(None)
+    backend["a"] = 1
+    backend.snapshot(1)
+    backend["a"] = 2
+    backend["b"] = 3
+    backend.snapshot(2)
+    del backend["a"]
+    backend.snapshot(3)
+    backend.close()
+    # Later snapshots are discarded, and the checkpoint is taken again
+    backend = create_backend(2)
+    assert backend.checkpoint_id == 2
+    assert dict(backend.items()) == {"a": 2, "b": 3}
+    backend["c"] = 4
+    backend.snapshot(3)
+    backend.close()
+    backend = create_backend(None)
+    assert backend.checkpoint_id == 3
+    assert dict(backend.items()) == {"a": 2, "b": 3, "c": 4}
+    backend.close()
+    backend = create_backend(1)
+    assert dict(backend.items()) == {"a": 1}
+    backend.close()
+    backend = create_backend(0)
+    assert backend.checkpoint_id is None
+    assert len(backend) == 0
+    backend.close()
+
+
+def test_restore_checkpoint():
+    path = tempfile.mkdtemp()
+    _check_restore_checkpoint(lambda checkpoint_id: MemoryStateBackend(
+        path, compaction_interval=2, checkpoint_id=checkpoint_id))
+    path = os.path.join(tempfile.mkdtemp(), "state.db")
+    _check_restore_checkpoint(lambda checkpoint_id: SQLiteStateBackend(
+        path, max_cached_entries=1, checkpoint_id=checkpoint_id))
+
+
+def test_release_keeps_complete_checkpoint():
+    path = tempfile.mkdtemp()
+    backend = MemoryStateBackend(path, compaction_interval=2)
+    for checkpoint_id in range(1, 6):
+        backend["a"] = checkpoint_id
+        backend.snapshot(checkpoint_id)
+        backend.release(2)
+    assert MemoryStateBackend(path, checkpoint_id=2)["a"] == 2
+    path = os.path.join(tempfile.mkdtemp(), "state.db")
+    backend = SQLiteStateBackend(path)
+    for checkpoint_id in range(1, 6):
+        backend["a"] = checkpoint_id
+        backend.release(2)
+        backend.snapshot(checkpoint_id)
+    backend.close()
+    assert SQLiteStateBackend(path, checkpoint_id=2)["a"] == 2
+
+
+def test_checkpoint_log():
+    log = CheckpointLog(tempfile.mkdtemp(), num_instances=2)
+    assert log.latest_complete() == 0
+    assert log.ack("1-0", 1) == 0
+    assert log.ack("2-0", 1) == 1
+    assert log.ack("1-0", 2) == 1
+    # A checkpoint of a failed run does not complete with a single ack
+    log.discard_after("1-0", 1)
+    assert log.ack("2-0", 2) == 1
+    assert log.ack("1-0", 2) == 2
+    assert os.listdir(log.path) == ["{:020d}".format(2)]
+
+
+class MockItem:
+    def __init__(self, channel_id, body):
+        self._channel_id = channel_id
+        self._body = body
+
+    def channel_id(self):
+        return self._channel_id
+
+    def body(self):
+        return self._body
+
+
+class MockReader:
+    def __init__(self, messages):
+        self.messages = [MockItem(c, body) for c, body in messages]
+
+    def read(self, timeout):
+        return self.messages.pop(0) if self.messages else None
+
+
+def test_barrier_alignment():
+    channels = [DataChannel(0, i, 1, 0, "{:040d}".format(i)) for i in [0, 1]]
+    input_gate = DataInput(Environment(config=Conf()), channels)
+    checkpoints = []
+    input_gate.on_barrier = lambda checkpoint_id: checkpoints.append(
+        (checkpoint_id, list(records)))
+    input_gate.reader = MockReader([
+        (0, pickle.dumps("a")),
+        (0, _pack_barrier(1)),
+        (0, pickle.dumps("c")),  # Held until the barrier is aligned
+        (1, pickle.dumps("b")),
+        (1, _pack_barrier(1)),
+        (1, pickle.dumps("d")),
+        (0, _CLOSE_FLAG),
+        (1, _CLOSE_FLAG),
+    ])
+    records = []
+    record = input_gate.pull()
+    while record is not None:
+        records.append(record)
+        record = input_gate.pull()
+    assert records == ["a", "b", "c", "d"]
+    assert checkpoints == [(1, ["a", "b"])]
+
+
+def test_state_path_per_job():
+    config = Conf(checkpoint_dir=tempfile.mkdtemp(), job_id="job")
+    backend = create_state_backend(config, "job", 1, 0)
+    backend["a"] = 1
+    backend.snapshot(1)
+    assert os.listdir(os.path.join(config.checkpoint_dir, "job", "1-0"))
+    assert create_state_backend(config, "job", 1, 0)["a"] == 1
+    assert "a" not in create_state_backend(config, "other_job", 1, 0)
+
+
+class MockGate:
+    def __init__(self):
+        self.records = []
+
+    def push(self, record):
+        self.records.append(record)
+
+
+def test_read_text_file_restore():
+    config = Conf(checkpoint_dir=tempfile.mkdtemp())
+    filepath = os.path.join(config.checkpoint_dir, "input.txt")
+    with open(filepath, "w") as f:
+        f.write("a\nb\nc\n")
+    operator = types.SimpleNamespace(id=1, other_args=filepath)
+
+    def create_backend(operator_id):
+        return create_state_backend(config, "job", operator_id, 0)
+
+    source = ReadTextFile(operator)
+    source.init_state(create_backend)
+    source.reader.readline()
+    source.snapshot_state()
+    source.state.snapshot(1)
+    # The restored source resumes after the checkpointed line
+    source = ReadTextFile(operator)
+    source.init_state(create_backend)
+    output_gate = MockGate()
+    source.run(None, output_gate)
+    assert output_gate.records == ["b", "c"]
+
+
+if __name__ == "__main__":
+    test_memory_state_backend()
+    test_sqlite_state_backend()
+    test_restore_checkpoint()
+    test_release_keeps_complete_checkpoint()
+    test_checkpoint_log()
+    test_barrier_alignment()
+    test_state_path_per_job()
+    test_read_text_file_restore()
@@ -0,0 +1,110 @@
+import time
+import types
+
+from ray.streaming.operator import OpType
+from ray.streaming.processor import Window as WindowProcessor
+from ray.streaming.streaming import Conf, Environment
+from ray.streaming.window import SessionWindows, SlidingWindows
+from ray.streaming.window import TumblingWindows, Window, WindowState
+
+
+def test_assigners():
+    assert TumblingWindows(10).assign(25) == [Window(20, 30)]
+    assert TumblingWindows(10, offset_ms=5).assign(25) == [Window(25, 35)]
+    assert sorted(SlidingWindows(10, 5).assign(12)) == [
+        Window(5, 15), Window(10, 20)
+    ]
+    assert SessionWindows(3).assign(7) == [Window(7, 10)]
+
+
+def test_tumbling_window_state():
+    state = WindowState(TumblingWindows(10), lambda a, b: a + b)
+    state.add("a", 1, 1)
+    state.add("a", 5, 2)
+    state.add("b", 8, 10)
+    state.add("a", 12, 4)
+    assert state.advance_watermark(9) == []
+    fired = sorted(state.advance_watermark(10))
+    assert fired == [("a", Window(0, 10), 3), ("b", Window(0, 10), 10)]
+    # State of fired windows is evicted
+    assert state.num_windows() == 1
+    # Records of fired windows are dropped
+    state.add("a", 3, 100)
+    assert state.num_late_records == 1
+    assert state.flush() == [("a", Window(10, 20), 4)]
+    assert state.windows == {}
+
+
+def test_sliding_window_state():
+    state = WindowState(SlidingWindows(10, 5))
+    for timestamp in [1, 6, 11]:
+        state.add(None, timestamp, timestamp)
+    fired = state.flush()
+    assert [(w, v) for _, w, v in fired] == [
+        (Window(-5, 5), [1]),
+        (Window(0, 10), [1, 6]),
+        (Window(5, 15), [6, 11]),
+        (Window(10, 20), [11]),
+    ]
+
+
+def test_session_window_state():
+    state = WindowState(SessionWindows(5), lambda a, b: a + b)
+    state.add("a", 0, 1)
+    state.add("a", 20, 1)
+    state.add("a", 3, 1)
+    state.add("a", 7, 1)
+    assert state.num_windows() == 2
+    assert state.advance_watermark(12) == [("a", Window(0, 12), 3)]
+    assert state.flush() == [("a", Window(20, 25), 1)]
+
+
+def test_keyed_window_operator():
+    env = Environment()
+    env.source(None).key_by(0).time_window(1000)
+    env.source(None).time_window(1000)
+    env._collect_garbage()
+    windows = [
+        op for op in env.operators.values() if op.type == OpType.TimeWindow
+    ]
+    assert [op.other_args[-1] for op in windows] == [True, False]
+
+
+def test_non_keyed_window_parallelism():
+    env = Environment(config=Conf(parallelism=2))
+    env.source(None).key_by(0).time_window(1000)
+    env.source(None).time_window(1000)
+    windows = [
+        op for op in env.operators.values() if op.type == OpType.TimeWindow
+    ]
+    assert [op.num_instances for op in windows] == [2, 1]
+
+
+class MockGate:
+    def __init__(self):
+        self.records = []
+
+    def push(self, record):
+        self.records.append(record)
+
+
+def test_processing_time_window_timer():
+    operator = types.SimpleNamespace(
+        logic=None, other_args=(TumblingWindows(10), None, 0, False))
+    window = WindowProcessor(operator)
+    gate = MockGate()
+    window.process("a", gate)
+    time.sleep(0.03)
+    # The window fires without another record
+    window.on_timer(gate)
+    assert [value for _, value in gate.records] == [["a"]]
+
+
+if __name__ == "__main__":
+    test_assigners()
+    test_tumbling_window_state()
+    test_sliding_window_state()
+    test_session_window_state()
+    test_keyed_window_operator()
+    test_non_keyed_window_parallelism()
+    test_processing_time_window_timer()
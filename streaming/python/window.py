@@ -0,0 +1,200 @@
+import collections
+import heapq
+import itertools
+
+# A half-open time interval [start, end) in milliseconds
+Window = collections.namedtuple("Window", ["start", "end"])
+
+
+# Assigns a record with the given timestamp to exactly one window
+class TumblingWindows:
+    """Fixed-size, non-overlapping windows.
+
+    Attributes:
+         size_ms (int): The length of each window in ms.
+         offset_ms (int): Shifts the window boundaries by the given
+         amount of ms (e.g. to align daily windows to a timezone).
+    """
+
+    merging = False
+
+    def __init__(self, size_ms, offset_ms=0):
+        assert size_ms > 0
+        self.size_ms = size_ms
+        self.offset_ms = offset_ms
+
+    def assign(self, timestamp):
+        start = timestamp - (timestamp - self.offset_ms) % self.size_ms
+        return [Window(start, start + self.size_ms)]
+
+
+# Assigns a record with the given timestamp to all windows that contain it
+class SlidingWindows:
+    """Fixed-size windows that start every `slide_ms` and may overlap.
+
+    Attributes:
+         size_ms (int): The length of each window in ms.
+         slide_ms (int): The distance between the starts of two
+         consecutive windows in ms.
+         offset_ms (int): Shifts the window boundaries by the given
+         amount of ms.
+    """
+
+    merging = False
+
+    def __init__(self, size_ms, slide_ms, offset_ms=0):
+        assert size_ms > 0 and slide_ms > 0
+        self.size_ms = size_ms
+        self.slide_ms = slide_ms
+        self.offset_ms = offset_ms
+
+    def assign(self, timestamp):
+        windows = []
+        last_start = timestamp - (timestamp - self.offset_ms) % self.slide_ms
+        start = last_start
+        while start > timestamp - self.size_ms:
+            windows.append(Window(start, start + self.size_ms))
+            start -= self.slide_ms
+        return windows
+
+
+# Assigns a record to a window that is extended by later records
+class SessionWindows:
+    """Windows of activity that close after a gap of inactivity.
+
+    Each record opens a window [timestamp, timestamp + gap_ms) that is
+    merged with all overlapping windows of the same key.
+
+    Attributes:
+         gap_ms (int): The inactivity gap in ms.
+    """
+
+    merging = True
+
+    def __init__(self, gap_ms):
+        assert gap_ms > 0
+        self.gap_ms = gap_ms
+
+    def assign(self, timestamp):
+        return [Window(timestamp, timestamp + self.gap_ms)]
+
+
+# Collects all values of a window when no reduce function is given
+def _append(accumulator, value):
+    accumulator.append(value)
+    return accumulator
+
+
+def _extend(accumulator_1, accumulator_2):
+    accumulator_1.extend(accumulator_2)
+    return accumulator_1
+
+
+class WindowState:
+    """The per-key window state of a window operator instance.
+
+    Values are aggregated incrementally, i.e. only one accumulator is kept
+    per (key, window). A window fires once the watermark passes its end,
+    after which its state is evicted.
+
+    Attributes:
+         assigner: The window assigner (e.g. TumblingWindows).
+         reduce_fn (function): Combines two values (or accumulators) into
+         one. If None, all values of a window are collected in a list.
+         windows (dict): A mapping from keys to a mapping from open windows
+         to accumulators.
+         timers (list): A min-heap of (window end, sequence number, key,
+         window) entries used to find the windows that must fire.
+         watermark (int): All records with a timestamp lower than the
+         watermark are considered to have arrived.
+         num_late_records (int): The number of records dropped because
+         all of their windows had already fired.
+    """
+
+    def __init__(self, assigner, reduce_fn=None):
+        self.assigner = assigner
+        if reduce_fn is None:
+            self.add_fn = _append
+            self.merge_fn = _extend
+            self.init_fn = lambda value: [value]
+        else:
+            self.add_fn = reduce_fn
+            self.merge_fn = reduce_fn
+            self.init_fn = lambda value: value
+        self.windows = {}  # key -> {window -> accumulator}
+        self.timers = []
+        self.timer_sequence = itertools.count()  # Breaks ties in the heap
+        self.watermark = float("-inf")
+        self.num_late_records = 0
+
+    # Adds a value to all windows the given timestamp is assigned to
+    def add(self, key, timestamp, value):
+        key_windows = self.windows.setdefault(key, {})
+        late = True
+        for window in self.assigner.assign(timestamp):
+            if window.end <= self.watermark:
+                continue  # Window has already fired
+            late = False
+            if self.assigner.merging:
+                window = self._merge(key, key_windows, window)
+            try:
+                key_windows[window] = self.add_fn(key_windows[window], value)
+            except KeyError:  # First value of the window
+                key_windows[window] = self.init_fn(value)
+                self._register_timer(key, window)
+        if not key_windows:
+            del self.windows[key]
+        if late:
+            self.num_late_records += 1
+
+    def _register_timer(self, key, window):
+        heapq.heappush(self.timers,
+                       (window.end, next(self.timer_sequence), key, window))
+
+    # Merges the given window with all overlapping windows of the key
+    # and returns the resulting window
+    def _merge(self, key, key_windows, window):
+        overlapping = [
+            w for w in key_windows
+            if w.start <= window.end and window.start <= w.end
+        ]
+        if not overlapping:
+            return window
+        start = min([window.start] + [w.start for w in overlapping])
+        end = max([window.end] + [w.end for w in overlapping])
+        merged = Window(start, end)
+        accumulator = None
+        for w in sorted(overlapping):
+            if accumulator is None:
+                accumulator = key_windows.pop(w)
+            else:
+                accumulator = self.merge_fn(accumulator, key_windows.pop(w))
+        key_windows[merged] = accumulator
+        if merged not in overlapping:
+            self._register_timer(key, merged)
+        return merged
+
+    # Advances the watermark and returns the results of all windows that
+    # fired as a list of (key, window, accumulator) tuples
+    def advance_watermark(self, watermark):
+        if watermark <= self.watermark:
+            return []
+        self.watermark = watermark
+        fired = []
+        while self.timers and self.timers[0][0] <= watermark:
+            _, _, key, window = heapq.heappop(self.timers)
+            key_windows = self.windows.get(key)
+            if key_windows is None or window not in key_windows:
+                continue  # Stale timer of a merged session window
+            fired.append((key, window, key_windows.pop(window)))
+            if not key_windows:
+                del self.windows[key]
+        return fired
+
+    # Fires all remaining windows, e.g. at the end of the stream
+    def flush(self):
+        return self.advance_watermark(float("inf"))
+
+    # Returns the number of open windows over all keys
+    def num_windows(self):
+        return sum(len(w) for w in self.windows.values())
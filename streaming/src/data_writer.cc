@@ -296,6 +296,19 @@ bool DataWriter::CollectFromRingBuffer(ProducerChannelInfo &channel_info,
   return true;
 }
 
+StreamingStatus DataWriter::GetRingBufferUsage(const ObjectID &q_id, size_t &size,
+                                               size_t &capacity) {
+  auto it = channel_info_map_.find(q_id);
+  if (it == channel_info_map_.end()) {
+    STREAMING_LOG(WARNING) << "Usage of unknown queue [" << q_id << "]";
+    return StreamingStatus::QueueIdNotFound;
+  }
+  auto &ring_buffer_ptr = it->second.writer_ring_buffer;
+  size = ring_buffer_ptr->Size();
+  capacity = ring_buffer_ptr->Capacity();
+  return StreamingStatus::OK;
+}
+
 void DataWriter::Stop() {
   for (auto &output_queue : output_queue_ids_) {
     ProducerChannelInfo &channel_info = channel_info_map_[output_queue];
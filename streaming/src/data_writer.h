@@ -106,6 +106,16 @@ class DataWriter {
       const ObjectID &q_id, uint8_t *data, uint32_t data_size,
       StreamingMessageType message_type = StreamingMessageType::Message);
 
+  /// Get the number of messages in the ring buffer of a channel and the
+  /// capacity of the ring buffer, so that callers can apply backpressure before
+  /// writing blocks.
+  /// \param q_id
+  /// \param size number of buffered messages
+  /// \param capacity maximum number of buffered messages
+  /// \return QueueIdNotFound if the channel is not an output of this writer
+  StreamingStatus GetRingBufferUsage(const ObjectID &q_id, size_t &size,
+                                     size_t &capacity);
+
   void Run();
 
   void Stop();